@@ -0,0 +1,210 @@
+import argparse
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import db
+from migrations import migrate
+
+# --- Hot / archive split ---
+# Completed orders whose last dispatch is older than ARCHIVE_AFTER_DAYS are
+# moved, with their lines and dispatch events, from orders.db into
+# orders_archive.db, BATCH_ORDERS orders per write transaction, so the hot
+# tables hold open and recent work only. The rollups keep counting archived
+# orders (their delete triggers skip a batch's deletes, see
+# rollups.NOT_ARCHIVING), so Reports totals don't change.
+#
+# Pooled connections attach the archive as "archive" (db.py). History reads
+# call history(conn) first and select from TEMP views over both databases:
+#   all_orders, all_order_products, all_dispatch_events, all_dispatch_lines
+# (main UNION ALL archive; an order still in main wins over an archived copy).
+#
+#   python archive.py [--days 180] [--batch 500] [--dry-run]
+
+ARCHIVE_AFTER_DAYS = 180
+BATCH_ORDERS = 500
+
+# table -> primary key, in copy order
+TABLES = {
+    "orders": "order_id",
+    "order_products": "order_product_id",
+    "dispatch_events": "event_id",
+}
+
+ARCHIVE_INDEXES = [
+    ("idx_orders_order_date", "orders", "order_date, order_id"),
+    ("idx_order_products_order", "order_products", "order_id"),
+    ("idx_dispatch_events_at", "dispatch_events", "dispatched_at"),
+    ("idx_dispatch_events_order", "dispatch_events", "order_id"),
+]
+
+# Views copied into the archive (same SQL, over the archive's own tables)
+ARCHIVE_VIEWS = ["v_dispatch_lines"]
+
+HISTORY_VIEWS = {
+    "all_orders": "orders",
+    "all_order_products": "order_products",
+    "all_dispatch_events": "dispatch_events",
+    "all_dispatch_lines": "v_dispatch_lines",
+}
+
+
+def _columns(conn, schema, name):
+    return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({name})")]
+
+
+def _history_sql(conn, source, attached):
+    columns = _columns(conn, "main", source)
+    sql = f"SELECT {', '.join(columns)} FROM main.{source}"
+    archived = set(_columns(conn, "archive", source)) if attached else set()
+    if archived:
+        # columns added to main since the last archive run read as NULL
+        select = ", ".join(c if c in archived else f"NULL AS {c}" for c in columns)
+        sql += (f" UNION ALL SELECT {select} FROM archive.{source}"
+                f" WHERE order_id NOT IN (SELECT order_id FROM main.orders)")
+    return sql
+
+
+def history(conn):
+    # Brings this connection's all_* views up to date; -> True when the
+    # archive is attached. A connection opened before the first archive run
+    # attaches it here (outside a transaction).
+    databases = {row[1]: row[2] for row in conn.execute("PRAGMA database_list")}
+    attached = "archive" in databases
+    if not attached and databases.get("main") and os.path.exists(db.archive_path(databases["main"])):
+        if conn.in_transaction:
+            # reading main alone would silently leave the archive out
+            raise RuntimeError(f"{db.archive_path(databases['main'])} can't be attached inside a transaction")
+        attached = db.attach_archive(conn, databases["main"])
+
+    current = dict(conn.execute("SELECT name, sql FROM sqlite_temp_master WHERE type = 'view'"))
+    stale = {}
+    for view, source in HISTORY_VIEWS.items():
+        if not _columns(conn, "main", source):
+            continue  # not created yet (early migrations)
+        sql = _history_sql(conn, source, attached)
+        if not (current.get(view) or "").endswith(sql):
+            stale[view] = sql
+    if stale:
+        # TEMP views only touch this connection, but query_only (pooled
+        # readers) refuses any CREATE
+        query_only = conn.execute("PRAGMA query_only").fetchone()[0]
+        conn.execute("PRAGMA query_only = OFF")
+        try:
+            for view, sql in stale.items():
+                conn.execute(f"DROP VIEW IF EXISTS temp.{view}")
+                conn.execute(f"CREATE TEMP VIEW {view} AS {sql}")
+        finally:
+            conn.execute(f"PRAGMA query_only = {query_only}")
+    return attached
+
+
+def _connect(path):
+    # The job's own connection: the pool's may predate the archive file
+    conn = sqlite3.connect(path, timeout=db.BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+    for pragma in db.PRAGMAS:
+        conn.execute(pragma)
+    conn.execute("ATTACH DATABASE ? AS archive", (db.archive_path(path),))
+    conn.execute("PRAGMA archive.journal_mode = WAL")
+    return conn
+
+
+def sync_schema(conn):
+    # Archive tables with main's columns (no triggers or foreign keys: rows
+    # only arrive from main), their read indexes, and the copied views
+    for table, key in TABLES.items():
+        info = list(conn.execute(f"PRAGMA main.table_info({table})"))
+        archived = set(_columns(conn, "archive", table))
+        if not archived:
+            columns = ", ".join(
+                f"{name} {decl}{' PRIMARY KEY' if name == key else ''}" for _, name, decl, *_ in info)
+            conn.execute(f"CREATE TABLE archive.{table} ({columns})")
+        else:
+            for _, name, decl, *_ in info:
+                if name not in archived:
+                    conn.execute(f"ALTER TABLE archive.{table} ADD COLUMN {name} {decl}")
+    for name, table, columns in ARCHIVE_INDEXES:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS archive.{name} ON {table}({columns})")
+    for view in ARCHIVE_VIEWS:
+        sql = conn.execute("SELECT sql FROM main.sqlite_master WHERE type = 'view' AND name = ?",
+                           (view,)).fetchone()[0]
+        body = re.sub(r"^\s*CREATE\s+VIEW\s+\S+\s+AS\s+", "", sql, flags=re.IGNORECASE)
+        conn.execute(f"DROP VIEW IF EXISTS archive.{view}")
+        conn.execute(f"CREATE VIEW archive.{view} AS {body}")
+
+
+def candidates(conn, days):
+    # Fully dispatched orders with no dispatch (or, without any, no order
+    # date) in the last `days` days
+    cutoff = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+    return [order_id for (order_id,) in conn.execute('''
+        SELECT order_id FROM main.orders
+        WHERE fulfilment_status = 'complete' AND IFNULL(last_dispatch_at, order_date) < ?
+        ORDER BY order_id
+    ''', (cutoff,))]
+
+
+def move(conn, order_ids):
+    # One batch in one write transaction covering both databases. Copies
+    # are INSERT OR REPLACE, so a batch interrupted after the archive side
+    # committed is simply redone on the next run. The archive_in_progress
+    # row only lives inside the transaction: no schema change on main, so
+    # the app's pooled connections keep their prepared statements.
+    marks = ", ".join("?" * len(order_ids))
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("INSERT INTO main.archive_in_progress (started_at) VALUES (?)",
+                     (datetime.now().isoformat(timespec="seconds"),))
+        for table in TABLES:
+            columns = ", ".join(_columns(conn, "main", table))
+            conn.execute(f'''
+                INSERT OR REPLACE INTO archive.{table} ({columns})
+                SELECT {columns} FROM main.{table} WHERE order_id IN ({marks})
+            ''', order_ids)
+        for table in reversed(list(TABLES)):
+            conn.execute(f"DELETE FROM main.{table} WHERE order_id IN ({marks})", order_ids)
+        conn.execute("DELETE FROM main.archive_in_progress")
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def run(days=ARCHIVE_AFTER_DAYS, batch=BATCH_ORDERS, dry_run=False, path=db.ORDERS_DB):
+    # -> number of orders archived (or, with dry_run, due for archiving)
+    migrate(path)
+    conn = _connect(path)
+    try:
+        order_ids = candidates(conn, days)
+        if dry_run:
+            print(f"📦 {len(order_ids)} completed orders older than {days} days would be archived.")
+            return len(order_ids)
+        sync_schema(conn)
+        start = time.perf_counter()
+        for i in range(0, len(order_ids), batch):
+            move(conn, order_ids[i:i + batch])
+        elapsed = time.perf_counter() - start
+        total = conn.execute("SELECT COUNT(*) FROM archive.orders").fetchone()[0]
+    finally:
+        conn.close()
+    print(f"✅ Archived {len(order_ids)} orders in {elapsed:.1f}s "
+          f"({total} in {db.archive_path(path)}); rollups unchanged.")
+    return len(order_ids)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move old completed orders to the archive database")
+    parser.add_argument("--db", default=db.ORDERS_DB, help="database file (default: orders.db)")
+    parser.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS,
+                        help=f"archive orders last dispatched more than this many days ago (default: {ARCHIVE_AFTER_DAYS})")
+    parser.add_argument("--batch", type=int, default=BATCH_ORDERS,
+                        help=f"orders per transaction (default: {BATCH_ORDERS})")
+    parser.add_argument("--dry-run", action="store_true", help="only count the orders due")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print("❌ Database file not found.")
+    else:
+        run(args.days, args.batch, args.dry_run, args.db)
@@ -0,0 +1,101 @@
+import argparse
+import glob
+import io
+import os
+
+# --- Pre-rendered images for the pages ---
+# The logo, login banners and user photos are resized to the size they are
+# shown at (2x for high-DPI screens) and recompressed once. Results are kept
+# in .cache/assets, named after the source file's mtime so an edited or
+# replaced image is rebuilt, and held in memory for the life of the server
+# process. Pages look images up by name instead of opening files.
+#
+#   python assets.py     # build the cache and print sizes
+
+ASSET_DIR = "assets"
+USER_PHOTO_DIR = os.path.join(ASSET_DIR, "users")
+CACHE_DIR = os.path.join(".cache", "assets")
+PHOTO_EXTENSIONS = ["jpg", "png", "jpeg"]
+JPEG_QUALITY = 85
+
+# name -> (source, max (width, height))
+IMAGES = {
+    "logo": (os.path.join(ASSET_DIR, "logo.jpg"), (280, 280)),                 # shown at width=140
+    "home_banner": (os.path.join(ASSET_DIR, "home_banner.jpg"), (400, 300)),
+    "home_banner1": (os.path.join(ASSET_DIR, "home_banner1.jpg"), (400, 300)),
+    "default_user": (os.path.join(USER_PHOTO_DIR, "default.jpg"), (200, 300)),
+}
+USER_PHOTO_SIZE = (200, 300)                                                   # shown at width=100
+
+_images = {}
+_user_photos = {}
+
+
+def _render(source, size):
+    # -> compressed bytes of `source` fitted into `size`, via the disk cache
+    stat = os.stat(source)
+    stem = os.path.splitext(os.path.relpath(source, ASSET_DIR))[0].replace(os.sep, "__")
+    prefix = f"{stem}-{stat.st_mtime_ns}-{size[0]}x{size[1]}"
+    # A cache hit needs no image decoding, so PIL is only imported to build
+    for cached in glob.glob(os.path.join(CACHE_DIR, f"{glob.escape(prefix)}.*")):
+        with open(cached, "rb") as f:
+            return f.read()
+
+    from PIL import Image
+
+    with Image.open(source) as img:
+        keep_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        cached = os.path.join(CACHE_DIR, f"{prefix}.{'png' if keep_alpha else 'jpg'}")
+        img.thumbnail(size)
+        out = io.BytesIO()
+        if keep_alpha:
+            img.save(out, "PNG", optimize=True)
+        else:
+            img.convert("RGB").save(out, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    data = out.getvalue()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    for old in glob.glob(os.path.join(CACHE_DIR, f"{glob.escape(stem)}-*")):
+        os.remove(old)
+    tmp = cached + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, cached)
+    return data
+
+
+def build():
+    # Render every known image into memory; returns the number loaded
+    images = {}
+    for name, (source, size) in IMAGES.items():
+        if os.path.exists(source):
+            images[name] = _render(source, size)
+    photos = {}
+    # Same precedence as the old per-page probe: .jpg, then .png, then .jpeg
+    for ext in reversed(PHOTO_EXTENSIONS):
+        for source in glob.glob(os.path.join(USER_PHOTO_DIR, f"*.{ext}")):
+            user = os.path.splitext(os.path.basename(source))[0].lower()
+            if user != "default":
+                photos[user] = _render(source, USER_PHOTO_SIZE)
+    _images.clear()
+    _images.update(images)
+    _user_photos.clear()
+    _user_photos.update(photos)
+    return len(images) + len(photos)
+
+
+def image(name):
+    # Bytes for one of IMAGES, or None if its source file is missing
+    return _images.get(name)
+
+
+def user_photo(username):
+    return _user_photos.get((username or "").lower())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the resized image cache")
+    parser.parse_args()
+    build()
+    for name, data in list(_images.items()) + list(_user_photos.items()):
+        print(f"  {name:<14} {len(data) / 1024:8.1f} KB")
+    print(f"✅ Cached {len(_images) + len(_user_photos)} images in {CACHE_DIR}")
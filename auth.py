@@ -0,0 +1,219 @@
+import argparse
+import functools
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import db
+
+# --- Passwords and login sessions (data/users.db) ---
+# bcrypt runs once per login. The login creates a row in `sessions` and
+# hands the browser a signed token (kept in the SESSION_COOKIE cookie, see
+# ui.py), so a page reload restores the user with one HMAC check and one
+# indexed lookup instead of another password prompt and bcrypt verification.
+#
+#   python auth.py --benchmark [--target-ms 250]   # pick BCRYPT_ROUNDS
+#   python auth.py --purge                         # drop expired sessions
+
+# bcrypt work factor for new and changed passwords (bcrypt default: 12).
+# Existing hashes keep working at their own cost and are upgraded on login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+SESSION_HOURS = 12           # one shift
+SESSION_SECRET_FILE = os.path.join("data", "session_secret")
+SESSION_COOKIE = "oms_session"
+# Older builds put the token in the URL (?session=); such links are revoked
+# and stripped on sight, never used to log in
+LEGACY_SESSION_PARAM = "session"
+
+# Password hashing for the Admin page runs here, not on the page script thread.
+# bcrypt itself is imported on first use: restoring a session never needs it.
+_hasher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="bcrypt")
+
+
+def ensure_tables(path=db.USERS_DB):
+    with db.write_conn(path) as conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                username TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                expires_at TEXT NOT NULL,
+                remember INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_username ON sessions(username)")
+        # 30-day "Remember this device" tokens were handed out in URLs; end them
+        conn.execute("DELETE FROM sessions WHERE remember = 1")
+
+
+# --- Passwords ---
+
+def hash_password(password, rounds=None):
+    import bcrypt
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds or BCRYPT_ROUNDS))
+
+
+def check_password(password, stored_hash):
+    import bcrypt
+    if isinstance(stored_hash, memoryview):  # SQLite BLOB
+        stored_hash = stored_hash.tobytes()
+    if isinstance(stored_hash, str):
+        stored_hash = stored_hash.encode()
+    return bcrypt.checkpw(password.encode(), stored_hash)
+
+
+def hash_rounds(stored_hash):
+    # $2b$12$... -> 12
+    if isinstance(stored_hash, memoryview):
+        stored_hash = stored_hash.tobytes()
+    if isinstance(stored_hash, bytes):
+        stored_hash = stored_hash.decode()
+    return int(stored_hash.split("$")[2])
+
+
+def set_password_async(username, password, path=db.USERS_DB, end_sessions=True):
+    # Future resolving once the hash is computed and stored. A password
+    # reset also logs the user out everywhere.
+    def job():
+        hashed = hash_password(password)
+        with db.write_conn(path) as conn:
+            conn.execute("UPDATE users SET password_hash = ? WHERE username = ?", (hashed, username))
+            if end_sessions:
+                conn.execute("DELETE FROM sessions WHERE username = ?", (username,))
+    return _hasher.submit(job)
+
+
+def create_user_async(username, password, role, full_name, path=db.USERS_DB):
+    # Future resolving once the user is stored; raises sqlite3.IntegrityError
+    # from .result() if the username is taken
+    def job():
+        hashed = hash_password(password)
+        with db.write_conn(path) as conn:
+            conn.execute('''
+                INSERT INTO users (username, password_hash, role, full_name)
+                VALUES (?, ?, ?, ?)
+            ''', (username, hashed, role, full_name))
+    return _hasher.submit(job)
+
+
+def authenticate(username, password, path=db.USERS_DB):
+    # -> (user row, None) or (None, error message)
+    with db.read_conn(path) as conn:
+        user = conn.execute(
+            "SELECT username, password_hash, role FROM users WHERE username = ?", (username.strip(),)
+        ).fetchone()
+    if not user:
+        return None, "❌ Username not found."
+    if not check_password(password, user[1]):
+        return None, "❌ Incorrect password."
+    if hash_rounds(user[1]) != BCRYPT_ROUNDS:
+        # rehash at the configured cost, in the background
+        set_password_async(user[0], password, path, end_sessions=False)
+    return user, None
+
+
+# --- Session tokens ---
+# token = "<session id>.<HMAC-SHA256 of the id>". The signature rejects
+# made-up or altered tokens before touching the database; the sessions row
+# makes tokens revocable (logout, password reset, user deleted).
+
+@functools.lru_cache(maxsize=1)
+def _secret():
+    # SESSION_SECRET from the environment, else a random key generated once
+    # into data/session_secret
+    secret = os.getenv("SESSION_SECRET")
+    if secret:
+        return secret.encode()
+    if not os.path.exists(SESSION_SECRET_FILE):
+        os.makedirs(os.path.dirname(SESSION_SECRET_FILE), exist_ok=True)
+        fd = os.open(SESSION_SECRET_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(secrets.token_hex(32))
+    with open(SESSION_SECRET_FILE) as f:
+        return f.read().strip().encode()
+
+
+def _sign(session_id):
+    return hmac.new(_secret(), session_id.encode(), hashlib.sha256).hexdigest()
+
+
+def create_session(username, path=db.USERS_DB):
+    session_id = secrets.token_urlsafe(24)
+    now = datetime.now()
+    expires = now + timedelta(hours=SESSION_HOURS)
+    with db.write_conn(path) as conn:
+        conn.execute('''
+            INSERT INTO sessions (session_id, username, created_at, expires_at)
+            VALUES (?, ?, ?, ?)
+        ''', (session_id, username, now.isoformat(timespec="seconds"), expires.isoformat(timespec="seconds")))
+    return f"{session_id}.{_sign(session_id)}"
+
+
+def restore_session(token, path=db.USERS_DB):
+    # -> (username, role) for a valid unexpired token, else None
+    session_id, _, signature = (token or "").partition(".")
+    if not session_id or not hmac.compare_digest(signature, _sign(session_id)):
+        return None
+    with db.read_conn(path) as conn:
+        row = conn.execute('''
+            SELECT u.username, u.role
+            FROM sessions s
+            JOIN users u ON u.username = s.username
+            WHERE s.session_id = ? AND s.expires_at > ?
+        ''', (session_id, datetime.now().isoformat(timespec="seconds"))).fetchone()
+    return tuple(row) if row else None
+
+
+def end_session(token, path=db.USERS_DB):
+    session_id = (token or "").partition(".")[0]
+    if session_id:
+        with db.write_conn(path) as conn:
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+
+def end_user_sessions(username, path=db.USERS_DB):
+    with db.write_conn(path) as conn:
+        conn.execute("DELETE FROM sessions WHERE username = ?", (username,))
+
+
+def purge_expired(path=db.USERS_DB):
+    with db.write_conn(path) as conn:
+        return conn.execute(
+            "DELETE FROM sessions WHERE expires_at <= ?", (datetime.now().isoformat(timespec="seconds"),)
+        ).rowcount
+
+
+# --- Work factor benchmark ---
+
+def benchmark_rounds(target_ms, low=8, high=16):
+    # Highest cost whose hash time stays within target_ms on this machine
+    best = low
+    for rounds in range(low, high + 1):
+        start = time.perf_counter()
+        hash_password("benchmark-password", rounds)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"  rounds {rounds:2d}: {elapsed:8.1f} ms")
+        if elapsed > target_ms:
+            break
+        best = rounds
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Password and session utilities")
+    parser.add_argument("--benchmark", action="store_true", help="time bcrypt costs and recommend BCRYPT_ROUNDS")
+    parser.add_argument("--target-ms", type=float, default=250, help="login hash budget (default: 250 ms)")
+    parser.add_argument("--purge", action="store_true", help="delete expired sessions")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        rounds = benchmark_rounds(args.target_ms)
+        print(f"✅ Recommended: BCRYPT_ROUNDS={rounds} (current: {BCRYPT_ROUNDS})")
+    if args.purge:
+        ensure_tables()
+        print(f"✅ Removed {purge_expired()} expired sessions.")
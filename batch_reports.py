@@ -0,0 +1,190 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import archive
+import db
+import dispatch_report_pdf
+from migrations import migrate
+
+# --- Batch dispatch reports ---
+# One dispatch PDF per customer per day over a date range (default: today),
+# for daily customer notes and month backfills:
+#
+#   reports/2025-01-02/acme_salts-3f2a1c.pdf
+#   reports/manifest.json
+#
+# The work units are planned from a single pass over all_dispatch_lines that
+# also fingerprints the lines of each unit. Units whose fingerprint matches
+# the manifest (and whose PDF is still there) are skipped; the rest are
+# rendered in a process pool, one worker per core, each worker keeping its
+# own pooled connection to orders.db for all of its units.
+#
+#   python batch_reports.py [--from 2025-01-01] [--to 2025-01-31] [--customer "Name"]
+#                           [--out reports] [--workers 4] [--force]
+
+OUTPUT_DIR = "reports"
+MANIFEST = "manifest.json"
+
+PLAN_SQL = '''
+    SELECT customer_name, SUBSTR(dispatched_at, 1, 10) AS day,
+           event_id, order_no, product_name, quantity, unit, amount_inr, dispatched_by, dispatched_at
+    FROM all_dispatch_lines
+    WHERE {where} AND customer_name IS NOT NULL
+    ORDER BY customer_name, day, event_id
+'''
+
+
+def _renderer_version():
+    # Layout changes in dispatch_report_pdf.py re-render every unit
+    with open(dispatch_report_pdf.__file__, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def unit_file(day, customer):
+    # reports/<day>/<customer slug>-<hash>.pdf; the hash keeps names that
+    # slug the same ("A&B", "A B") apart
+    slug = re.sub(r"[^a-z0-9]+", "_", customer.lower()).strip("_")[:60] or "customer"
+    return os.path.join(day, f"{slug}-{hashlib.sha1(customer.encode()).hexdigest()[:6]}.pdf")
+
+
+def plan(date_from, date_to, customer=None, path=db.ORDERS_DB):
+    # -> {(day, customer): fingerprint} for every unit with dispatches
+    where, params = dispatch_report_pdf.line_filters(date_from, date_to, customer, None)
+    version = _renderer_version()
+    units = {}
+    key = digest = None
+    with db.read_conn(path) as conn:
+        archive.history(conn)
+        cursor = conn.execute(PLAN_SQL.format(where=where), params)
+        while True:
+            chunk = cursor.fetchmany(dispatch_report_pdf.CHUNK_ROWS)
+            if not chunk:
+                break
+            for row in chunk:
+                if (row[1], row[0]) != key:
+                    if key is not None:
+                        units[key] = digest.hexdigest()
+                    key = (row[1], row[0])
+                    digest = hashlib.sha1(version.encode())
+                digest.update(repr(row[2:]).encode())
+    if key is not None:
+        units[key] = digest.hexdigest()
+    return units
+
+
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"units": {}}
+
+
+def save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def _render(job):
+    # Worker: one (day, customer) unit -> (job, rows, pages, seconds)
+    out_dir, day, customer, path = job
+    filename = os.path.join(out_dir, unit_file(day, customer))
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    start = time.perf_counter()
+    result = dispatch_report_pdf.render_pdf(filename, day, day, customer, path=path)
+    rows, pages = result or (0, 0)
+    return job, rows, pages, time.perf_counter() - start
+
+
+def run(date_from=None, date_to=None, customer=None, out_dir=OUTPUT_DIR, workers=None,
+        force=False, path=db.ORDERS_DB):
+    # -> (rendered, skipped, removed)
+    date_from = dispatch_report_pdf.parse_day(date_from)
+    date_to = dispatch_report_pdf.parse_day(date_to) if date_to is not None else date_from
+    migrate(path)
+    units = plan(date_from, date_to, customer, path)
+
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = load_manifest(out_dir)
+    entries = manifest["units"]
+
+    todo = []
+    skipped = 0
+    for (day, name), fingerprint in units.items():
+        entry = entries.get(f"{day}/{name}")
+        if (not force and entry and entry["fingerprint"] == fingerprint
+                and os.path.exists(os.path.join(out_dir, entry["file"]))):
+            skipped += 1
+        else:
+            todo.append((out_dir, day, name, path))
+
+    # Units in the range that no longer have any dispatches
+    removed = 0
+    for key, entry in list(entries.items()):
+        day, _, name = key.partition("/")
+        if (date_from.isoformat() <= day <= date_to.isoformat() and (not customer or name == customer)
+                and (day, name) not in units):
+            stale = os.path.join(out_dir, entry["file"])
+            if os.path.exists(stale):
+                os.remove(stale)
+            del entries[key]
+            removed += 1
+
+    start = time.perf_counter()
+    rendered = pages_total = 0
+    if todo:
+        workers = workers or os.cpu_count() or 1
+        # spawn, not fork: a forked worker would inherit this process's
+        # SQLite connections
+        with ProcessPoolExecutor(max_workers=min(workers, len(todo)),
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            chunksize = max(1, len(todo) // (workers * 4))
+            for (_, day, name, _), rows, pages, seconds in pool.map(_render, todo, chunksize=chunksize):
+                if not rows:  # dispatches removed since planning
+                    entries.pop(f"{day}/{name}", None)
+                    continue
+                entries[f"{day}/{name}"] = {
+                    "file": unit_file(day, name),
+                    "customer": name,
+                    "day": day,
+                    "fingerprint": units[(day, name)],
+                    "lines": rows,
+                    "pages": pages,
+                    "seconds": round(seconds, 3),
+                    "generated_at": datetime.now().isoformat(timespec="seconds"),
+                }
+                rendered += 1
+                pages_total += pages
+    manifest["updated_at"] = datetime.now().isoformat(timespec="seconds")
+    save_manifest(out_dir, manifest)
+
+    elapsed = time.perf_counter() - start
+    rate = f", {pages_total / elapsed:.0f} pages/s" if rendered and elapsed > 0 else ""
+    print(f"✅ {rendered} rendered ({pages_total:,} pages in {elapsed:.1f}s{rate}), "
+          f"{skipped} unchanged, {removed} removed -> {out_dir}")
+    return rendered, skipped, removed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-customer, per-day dispatch PDFs")
+    parser.add_argument("--from", dest="date_from", help="first day, YYYY-MM-DD (default: today)")
+    parser.add_argument("--to", dest="date_to", help="last day, YYYY-MM-DD (default: --from)")
+    parser.add_argument("--customer", help="only this customer")
+    parser.add_argument("--out", default=OUTPUT_DIR, help=f"output directory (default: {OUTPUT_DIR})")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--force", action="store_true", help="render every unit, changed or not")
+    args = parser.parse_args()
+
+    if not os.path.exists(db.ORDERS_DB):
+        print("❌ Database file not found.")
+    else:
+        run(args.date_from, args.date_to, args.customer, args.out, args.workers, args.force)
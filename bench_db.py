@@ -0,0 +1,152 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import db
+
+# Compares the old "connect on every rerun" access pattern against the
+# pooled WAL connections from db.py.
+#
+#   python bench_db.py
+
+SCHEMA = [
+    '''
+    CREATE TABLE orders (
+        order_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_by TEXT,
+        customer_name TEXT,
+        order_no TEXT,
+        order_date TEXT,
+        urgent_flag INTEGER,
+        address TEXT,
+        gstin TEXT
+    )
+    ''',
+    '''
+    CREATE TABLE order_products (
+        order_product_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        order_id INTEGER,
+        product_name TEXT,
+        quantity INTEGER,
+        unit TEXT,
+        price_inr REAL,
+        price_usd REAL,
+        status TEXT,
+        modified_by TEXT,
+        modified_date TEXT,
+        FOREIGN KEY(order_id) REFERENCES orders(order_id)
+    )
+    ''',
+]
+
+N_ORDERS = 2000
+RERUNS = 300
+WRITERS = 4
+WRITES_PER_WRITER = 200
+
+
+def build_db(path):
+    conn = sqlite3.connect(path)
+    for stmt in SCHEMA:
+        conn.execute(stmt)
+    for i in range(1, N_ORDERS + 1):
+        cur = conn.execute(
+            "INSERT INTO orders (created_by, customer_name, order_no, order_date, urgent_flag) VALUES (?, ?, ?, ?, ?)",
+            (f"sales{i % 5}", f"Customer {i % 300}", f"ORD-{i:04d}", f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}", i % 7 == 0))
+        conn.executemany(
+            "INSERT INTO order_products (order_id, product_name, quantity, unit, price_inr, price_usd, status) VALUES (?, ?, ?, 'KG', 10, 0, 'Original')",
+            [(cur.lastrowid, f"Product {p}", 100) for p in range(3)])
+    conn.commit()
+    conn.close()
+
+
+# A rerun of a page: order-number lookup plus a listing query.
+RERUN_QUERIES = [
+    ("SELECT order_no FROM orders ORDER BY order_id DESC LIMIT 1", ()),
+    ("SELECT order_id, customer_name, order_no FROM orders WHERE created_by = ? ORDER BY order_date DESC LIMIT 20", ("sales1",)),
+]
+
+
+def rerun_unpooled(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    for sql, params in RERUN_QUERIES:
+        conn.execute(sql, params).fetchall()
+    conn.close()
+
+
+def rerun_pooled(path):
+    with db.read_conn(path) as conn:
+        for sql, params in RERUN_QUERIES:
+            conn.execute(sql, params).fetchall()
+
+
+def time_reruns(fn, path):
+    start = time.perf_counter()
+    for _ in range(RERUNS):
+        fn(path)
+    return (time.perf_counter() - start) / RERUNS * 1000
+
+
+def insert_order(conn, n):
+    cur = conn.execute(
+        "INSERT INTO orders (created_by, customer_name, order_no, order_date, urgent_flag) VALUES ('bench', 'Bench', ?, '2025-01-01', 0)",
+        (f"B-{n}",))
+    conn.execute(
+        "INSERT INTO order_products (order_id, product_name, quantity, unit, price_inr, price_usd, status) VALUES (?, 'Product 0', 1, 'KG', 1, 0, 'Original')",
+        (cur.lastrowid,))
+
+
+def writer_unpooled(path, worker, errors):
+    for i in range(WRITES_PER_WRITER):
+        try:
+            conn = sqlite3.connect(path, timeout=0.1)
+            insert_order(conn, worker * WRITES_PER_WRITER + i)
+            conn.commit()
+            conn.close()
+        except sqlite3.OperationalError:
+            errors.append(1)
+
+
+def writer_pooled(path, worker, errors):
+    for i in range(WRITES_PER_WRITER):
+        try:
+            with db.write_conn(path) as conn:
+                insert_order(conn, worker * WRITES_PER_WRITER + i)
+        except sqlite3.OperationalError:
+            errors.append(1)
+
+
+def time_writers(fn, path):
+    errors = []
+    threads = [threading.Thread(target=fn, args=(path, w, errors)) for w in range(WRITERS)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    done = WRITERS * WRITES_PER_WRITER - len(errors)
+    return done / elapsed, len(errors)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = os.path.join(tmp, "plain.db")
+        pooled = os.path.join(tmp, "pooled.db")
+        build_db(plain)
+        build_db(pooled)
+
+        print(f"Rerun latency ({RERUNS} reruns, {N_ORDERS} orders)")
+        print(f"  connect per rerun : {time_reruns(rerun_unpooled, plain):.3f} ms")
+        print(f"  pooled WAL        : {time_reruns(rerun_pooled, pooled):.3f} ms")
+
+        print(f"Writer throughput ({WRITERS} threads x {WRITES_PER_WRITER} orders)")
+        rate, errors = time_writers(writer_unpooled, plain)
+        print(f"  connect per write : {rate:,.0f} orders/s, {errors} 'database is locked' errors")
+        rate, errors = time_writers(writer_pooled, pooled)
+        print(f"  pooled WAL        : {rate:,.0f} orders/s, {errors} 'database is locked' errors")
+
+        db.close_all()
@@ -0,0 +1,151 @@
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+import db
+from migrations import migrate
+
+# Dispatch Summary query strategies on a synthetic order_products table:
+#   correlated   the old per-row "latest Original price" subquery over
+#                Dispatched order_products rows (schema up to migration 010)
+#   view         v_dispatch_summary (dispatch_events ledger, migration 011)
+#   rollup       rollup_order_product (trigger-maintained, migration 006)
+# The old query is also timed on an un-migrated database (no indexes, as
+# before migration 003) at a smaller size, since it is quadratic there.
+# Between the two, migration 011 moves the dispatches into the ledger; the
+# run time of the remaining migrations is reported.
+#
+#   python bench_dispatch_summary.py [--rows 500000] [--baseline-rows 20000]
+
+CORRELATED = '''
+    SELECT o.order_id, o.customer_name, dp.product_name,
+           SUM(dp.quantity) AS dispatched_kg,
+           SUM(dp.quantity * IFNULL((
+               SELECT op.price_inr
+               FROM order_products op
+               WHERE op.order_id = dp.order_id
+                 AND op.product_name = dp.product_name
+                 AND op.status = 'Original'
+               ORDER BY op.order_product_id DESC LIMIT 1
+           ), 0)) AS total_amount
+    FROM order_products dp
+    JOIN orders o ON o.order_id = dp.order_id
+    WHERE dp.status = 'Dispatched'
+    GROUP BY dp.order_id, o.customer_name, dp.product_name
+'''
+
+VIEW = '''
+    SELECT order_id, customer_name, product_name, dispatched_kg, total_amount
+    FROM v_dispatch_summary
+'''
+
+ROLLUP = '''
+    SELECT r.order_id, o.customer_name, r.product_name, r.dispatched_qty,
+           r.dispatched_qty * IFNULL(r.original_price_inr, 0)
+    FROM rollup_order_product r
+    JOIN orders o ON o.order_id = r.order_id
+    WHERE r.dispatched_lines > 0
+'''
+
+PRODUCTS = [f"Salt Grade {i}" for i in range(12)]
+
+
+def build_db(path, rows, migrated=True):
+    # 2 Original lines + 3 dispatches per order -> 5 rows per order (every
+    # fourth order repeats its first product on a third Original line at
+    # another price), in the old single-table layout; `migrated` = True runs
+    # every migration, False none, or a version number to stop at
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE orders (
+            order_id INTEGER PRIMARY KEY AUTOINCREMENT, created_by TEXT, customer_name TEXT,
+            order_no TEXT, order_date TEXT, urgent_flag INTEGER, address TEXT, gstin TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE order_products (
+            order_product_id INTEGER PRIMARY KEY AUTOINCREMENT, order_id INTEGER, product_name TEXT,
+            quantity INTEGER, unit TEXT, price_inr REAL, price_usd REAL, status TEXT,
+            modified_by TEXT, modified_date TEXT,
+            FOREIGN KEY(order_id) REFERENCES orders(order_id)
+        )
+    ''')
+    rng = random.Random(7)
+    n_orders = rows // 5
+    conn.executemany(
+        "INSERT INTO orders (order_id, created_by, customer_name, order_no, order_date, urgent_flag) VALUES (?, 'sales', ?, ?, '2025-01-01', 0)",
+        [(i, f"Customer {rng.randrange(2000)}", f"ORD-{i:06d}") for i in range(1, n_orders + 1)])
+    lines = []
+    for i in range(1, n_orders + 1):
+        products = rng.sample(PRODUCTS, 2)
+        for p in products:
+            lines.append((i, p, rng.randrange(100, 1000), rng.choice([8.5, 9.0, 12.0]), 'Original', None))
+        if i % 4 == 0:
+            lines.append((i, products[0], rng.randrange(100, 1000), 15.0, 'Original', None))
+        for _ in range(3):
+            lines.append((i, rng.choice(products), rng.randrange(10, 100), 0, 'Dispatched', '2025-01-02 10:00:00'))
+    conn.executemany(
+        "INSERT INTO order_products (order_id, product_name, quantity, unit, price_inr, price_usd, status, modified_by, modified_date) VALUES (?, ?, ?, 'KG', ?, 0, ?, 'dispatch', ?)",
+        lines)
+    conn.commit()
+    conn.close()
+    if migrated:
+        # indexes, rollups (backfilled), views, dispatch ledger
+        migrate(path, target=None if migrated is True else migrated)
+
+
+def time_query(conn, sql, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = conn.execute(sql).fetchall()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def normalized(rows):
+    return sorted((r[0], r[2], r[3], round(r[4], 4)) for r in rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--baseline-rows", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = os.path.join(tmp, "baseline.db")
+        build_db(baseline, args.baseline_rows, migrated=False)
+        conn = sqlite3.connect(baseline)
+        elapsed, rows = time_query(conn, CORRELATED, 1)
+        conn.close()
+        print(f"Old query, no indexes, {args.baseline_rows:,} rows: {elapsed * 1000:.1f} ms ({len(rows):,} rows)")
+
+        path = os.path.join(tmp, "bench.db")
+        start = time.perf_counter()
+        build_db(path, args.rows, migrated=10)
+        print(f"Built {args.rows:,} order_products rows in {time.perf_counter() - start:.1f}s")
+
+        results = {}
+
+        def run(name, sql):
+            with db.read_conn(path) as conn:
+                elapsed, rows = time_query(conn, sql, args.repeat)
+            results[name] = normalized(rows)
+            print(f"  {name:<11} {elapsed * 1000:10.1f} ms  ({len(rows):,} rows)")
+
+        run("correlated", CORRELATED)
+        start = time.perf_counter()
+        migrate(path)
+        print(f"  Migrations 011+ (dispatch ledger onwards) in {time.perf_counter() - start:.1f}s")
+        run("view", VIEW)
+        run("rollup", ROLLUP)
+
+        same = results["correlated"] == results["view"] == results["rollup"]
+        print("✅ All strategies return the same summary." if same else "❌ Results differ!")
+        db.close_all()
@@ -0,0 +1,219 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import db
+import dispatch_report_pdf
+import queries
+from generate_fixtures import SCALES, generate, read_info
+
+# Page data paths on a generated fixture (generate_fixtures.py): the queries
+# each page runs on a render, called directly without Streamlit or
+# querycache, so every run pays the full SQLite + pandas cost.
+#   sales_page     My Orders page for the busiest salesperson + its lines
+#   dispatch_page  open queue count, queue page + balances (also filtered)
+#   reports_page   every Reports query + the demand chart frame
+#   pdf            generate_dispatch_pdf for the busiest dispatch day / week
+# Each case runs once cold (first call in this process) and then --repeat
+# times; min, median, p95 and mean are kept. Results go to a JSON file with
+# the fixture's size, scale / seed / as-of date, the git commit and the
+# Python / SQLite versions, and --compare prints the median change against
+# an earlier run (with a warning when the two fixtures differ).
+#
+#   python bench_pages.py [--scale 100k] [--seed 42] [--fixture DIR]
+#                         [--repeat 10] [--out FILE] [--compare OLD.json]
+
+PAGE_SIZE = 25
+SLOWER = 1.2  # flagged in --compare
+FIXTURE_KEYS = ["scale", "seed", "as_of", "orders", "lines", "events"]
+
+
+def context(conn):
+    # Arguments that make each case representative of a busy user
+    salesperson = conn.execute(
+        "SELECT created_by FROM orders GROUP BY created_by ORDER BY COUNT(*) DESC LIMIT 1").fetchone()[0]
+    product = conn.execute(
+        "SELECT product_name FROM rollup_product ORDER BY original_lines DESC LIMIT 1").fetchone()[0]
+    busiest_day = conn.execute('''
+        SELECT substr(dispatched_at, 1, 10) FROM dispatch_events
+        GROUP BY 1 ORDER BY COUNT(*) DESC LIMIT 1
+    ''').fetchone()[0]
+    last_day = conn.execute("SELECT substr(MAX(dispatched_at), 1, 10) FROM dispatch_events").fetchone()[0]
+    return {"salesperson": salesperson, "product": product, "busiest_day": busiest_day, "last_day": last_day}
+
+
+def _my_orders(conn, ctx):
+    orders, _ = queries.my_orders_page(conn, ctx["salesperson"], PAGE_SIZE)
+    return len(queries.original_lines(conn, orders["Order ID"].tolist()))
+
+
+def _queue(conn, ctx, **filters):
+    orders, _ = queries.dispatch_queue(conn, PAGE_SIZE, **filters)
+    return len(queries.dispatch_balances(conn, orders["Order ID"].tolist()))
+
+
+def _reports(conn, ctx):
+    queries.demand_extremes(conn)
+    daily = queries.daily_product_demand(conn)
+    rows = len(queries.dispatch_summary(conn)) + len(queries.open_orders(conn))
+    queries.demand_chart_data(daily, "Total KG", top_n=10)
+    return rows + len(daily)
+
+
+def _pdf(path, date_from, date_to):
+    out = os.path.join(tempfile.gettempdir(), f"bench_pages_{os.getpid()}.pdf")
+    with contextlib.redirect_stdout(io.StringIO()):
+        dispatch_report_pdf.generate_dispatch_pdf(out, date_from, date_to, path=path)
+    size = os.path.getsize(out)
+    os.remove(out)
+    return size
+
+
+CASES = [
+    ("sales_page", "my orders page + lines", _my_orders),
+    ("sales_page", "my orders, customer search",
+     lambda conn, ctx: len(queries.my_orders_page(conn, ctx["salesperson"], PAGE_SIZE, customer="Salt")[0])),
+    ("dispatch_page", "open queue count", lambda conn, ctx: queries.dispatch_queue_count(conn, open_only=True)),
+    ("dispatch_page", "open queue page + balances", lambda conn, ctx: _queue(conn, ctx, open_only=True)),
+    ("dispatch_page", "all orders page + balances", lambda conn, ctx: _queue(conn, ctx)),
+    ("dispatch_page", "product filter page + balances",
+     lambda conn, ctx: _queue(conn, ctx, product=ctx["product"])),
+    ("reports_page", "demand extremes", lambda conn, ctx: len(queries.demand_extremes(conn))),
+    ("reports_page", "daily product demand", lambda conn, ctx: len(queries.daily_product_demand(conn))),
+    ("reports_page", "dispatch summary", lambda conn, ctx: len(queries.dispatch_summary(conn))),
+    ("reports_page", "open orders", lambda conn, ctx: len(queries.open_orders(conn))),
+    ("reports_page", "full render", _reports),
+]
+
+PDF_CASES = [
+    ("pdf", "busiest dispatch day", lambda path, ctx: _pdf(path, ctx["busiest_day"], None)),
+    ("pdf", "last 7 days",
+     lambda path, ctx: _pdf(path, date.fromisoformat(ctx["last_day"]) - timedelta(days=6), ctx["last_day"])),
+]
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    result = fn()
+    cold = time.perf_counter() - start
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "result": result,  # row count (PDF: bytes)
+        "cold_ms": cold * 1000,
+        "min_ms": samples[0] * 1000,
+        "median_ms": statistics.median(samples) * 1000,
+        "p95_ms": samples[min(len(samples) - 1, round(0.95 * (len(samples) - 1)))] * 1000,
+        "mean_ms": statistics.fmean(samples) * 1000,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(path, repeat):
+    with db.read_conn(path) as conn:
+        ctx = context(conn)
+        sizes = dict(zip(["orders", "lines", "events"], conn.execute('''
+            SELECT (SELECT COUNT(*) FROM orders), (SELECT COUNT(*) FROM order_products),
+                   (SELECT COUNT(*) FROM dispatch_events)
+        ''').fetchone()))
+    results = []
+    for page, name, fn in CASES:
+        with db.read_conn(path) as conn:
+            results.append({"page": page, "case": name, **timed(lambda: fn(conn, ctx), repeat)})
+        print_case(results[-1])
+    for page, name, fn in PDF_CASES:
+        results.append({"page": page, "case": name, **timed(lambda: fn(path, ctx), max(1, repeat // 3))})
+        print_case(results[-1])
+    return ctx, sizes, results
+
+
+def print_case(r):
+    print(f"{r['page']:<14} {r['case']:<32} {r['cold_ms']:9.1f} {r['median_ms']:9.1f} {r['p95_ms']:9.1f}")
+
+
+def compare(old, new):
+    before = {(r["page"], r["case"]): r for r in old["results"]}
+    print(f"\nvs {old['meta'].get('git_commit')} ({old['meta'].get('timestamp')}), median ms:")
+    differs = [key for key in FIXTURE_KEYS if old["meta"].get(key) != new["meta"].get(key)]
+    if differs:
+        print("⚠️ Not like-for-like, the fixtures differ in: "
+              + ", ".join(f"{key} {old['meta'].get(key)} -> {new['meta'].get(key)}" for key in differs))
+    for r in new["results"]:
+        prev = before.get((r["page"], r["case"]))
+        if prev is None:
+            print(f"{r['page']:<14} {r['case']:<32} {'-':>9} {r['median_ms']:9.1f}   new")
+            continue
+        ratio = r["median_ms"] / prev["median_ms"] if prev["median_ms"] else float("inf")
+        flag = "⚠️ slower" if ratio > SLOWER else ""
+        print(f"{r['page']:<14} {r['case']:<32} {prev['median_ms']:9.1f} {r['median_ms']:9.1f} {ratio:6.2f}x {flag}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time each page's data path on a synthetic fixture")
+    parser.add_argument("--scale", choices=SCALES, default="100k", help="fixture size (default: 100k)")
+    parser.add_argument("--seed", type=int, default=42, help="fixture seed (default: 42)")
+    parser.add_argument("--fixture", help="existing fixture directory (default: fixtures/<scale>, generated if missing)")
+    parser.add_argument("--repeat", type=int, default=10, help="warm runs per case (default: 10)")
+    parser.add_argument("--out", help="results file (default: bench_results/<fixture>-<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare with")
+    args = parser.parse_args()
+
+    fixture = args.fixture or os.path.join("fixtures", args.scale)
+    path = os.path.join(fixture, db.ORDERS_DB)
+    if not os.path.exists(path):
+        generate(args.scale, args.seed, fixture)
+
+    print(f"{'page':<14} {'case':<32} {'cold ms':>9} {'median':>9} {'p95':>9}")
+    ctx, sizes, results = run(path, args.repeat)
+    db.close_all()
+
+    stamp = datetime.now()
+    info = read_info(fixture)
+    report = {
+        "meta": {
+            "scale": info.get("scale"),
+            "seed": info.get("seed"),
+            "as_of": info.get("as_of"),
+            "fixture": fixture,
+            **sizes,
+            "db_bytes": os.path.getsize(path),
+            "repeat": args.repeat,
+            "context": ctx,
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "timestamp": stamp.isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+    label = os.path.basename(os.path.normpath(fixture))
+    out = args.out or os.path.join("bench_results", f"{label}-{stamp:%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results saved to {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from bench_dispatch_summary import build_db
+
+# Dispatch report PDF throughput: pages and lines per second, and peak
+# memory, for reports of N dispatched lines on synthetic databases (3 of
+# every 5 generated lines are dispatch events, all on 2025-01-02). Each size
+# is rendered in a fresh interpreter so its peak RSS is its own. "heap" is
+# the peak of Python allocations while rendering; with the streaming writer
+# it stays flat as the line count grows.
+#
+#   python bench_pdf.py [--lines 1000 10000 100000]
+
+REPORT_DAY = "2025-01-02"
+
+
+def peak_rss_kb():
+    # VmHWM starts afresh with the new interpreter; ru_maxrss can carry the
+    # parent's peak across fork/exec
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def render(path):
+    # Runs in the child interpreter
+    import dispatch_report_pdf
+
+    out = os.path.join(os.path.dirname(path), "report.pdf")
+    baseline_kb = peak_rss_kb()
+    start = time.perf_counter()
+    dispatch_report_pdf.generate_dispatch_pdf(out, REPORT_DAY, path=path)
+    elapsed = time.perf_counter() - start
+    peak_kb = peak_rss_kb()
+
+    # Python allocations alone, without SQLite's page cache, mmap and sorter
+    # (bounded by db.PRAGMAS, not by the report)
+    tracemalloc.start()
+    dispatch_report_pdf.generate_dispatch_pdf(out, REPORT_DAY, path=path)
+    heap_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    with open(out, "rb") as f:
+        pages = f.read().count(b"/Type /Page\n")
+    return {
+        "seconds": elapsed,
+        "pages": pages,
+        "bytes": os.path.getsize(out),
+        "baseline_kb": baseline_kb,
+        "peak_kb": peak_kb,
+        "heap_peak": heap_peak,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(render(args.child)))
+        sys.exit(0)
+
+    print(f"{'lines':>9} {'pages':>7} {'seconds':>8} {'pages/s':>8} {'lines/s':>9} {'PDF MB':>7} {'peak RSS MB':>13} {'heap MB':>8}")
+    for lines in args.lines:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.db")
+            build_db(path, lines * 5 // 3)
+            result = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", path],
+                                    capture_output=True, text=True, check=True)
+            r = json.loads(result.stdout.strip().splitlines()[-1])
+            print(f"{lines:9,} {r['pages']:7,} {r['seconds']:8.2f} {r['pages'] / r['seconds']:8.1f} "
+                  f"{lines / r['seconds']:9,.0f} {r['bytes'] / 1e6:7.1f} "
+                  f"{r['peak_kb'] / 1024:6.1f} (+{(r['peak_kb'] - r['baseline_kb']) / 1024:4.1f}) "
+                  f"{r['heap_peak'] / 1e6:8.1f}")
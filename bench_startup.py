@@ -0,0 +1,163 @@
+import argparse
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Cold-start and rerun timings for streamlit_app.py, checked against
+# recorded budgets. Every page is measured in a fresh interpreter, like the
+# first visitor after a container restart:
+#   import      python -X importtime -c "import streamlit_app"
+#   first run   first script run of the page (page imports, migrations
+#               check, image cache load, queries)
+#   rerun       median of later reruns with nothing changed
+# Runs on a throwaway copy of the app directory, so orders.db is untouched.
+#
+#   python bench_startup.py [--reruns 10] [--importtime 15]
+# Exits with status 1 if any timing is over budget.
+
+# Budgets in ms: about 2x the median of five runs on the 1-vCPU dev
+# container (and at least 1.5x the slowest of them), so only a real
+# regression fails the check. Re-record them the same way when the
+# baseline moves.
+BUDGETS_MS = {
+    "import": 900,
+    "Login: first run": 1000,
+    "Login: rerun": 60,
+    "Main Menu: first run": 1800,
+    "Main Menu: rerun": 70,
+    "Sales: first run": 1900,
+    "Sales: rerun": 130,
+    "Dispatch: first run": 1900,
+    "Dispatch: rerun": 110,
+    "Reports: first run": 2000,
+    "Reports: rerun": 90,
+    "Admin: first run": 1800,
+    "Admin: rerun": 120,
+}
+
+# scenario -> session_state page (None = logged out)
+SCENARIOS = {
+    "Login": None,
+    "Main Menu": "Main Menu",
+    "Sales": "Orders",
+    "Dispatch": "Dispatch",
+    "Reports": "Reports",
+    "Admin": "Admin Panel",
+}
+
+
+def import_times(app_dir):
+    # -> (total ms for streamlit_app, [(cumulative ms, module)] of its direct imports)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import streamlit_app"],
+        cwd=app_dir, capture_output=True, text=True, check=True,
+    )
+    total = 0.0
+    direct = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)", line)
+        if not match:
+            continue
+        cumulative_ms = int(match.group(1)) / 1000
+        depth = len(match.group(2)) - 1  # one space always follows the "|"
+        if match.group(3) == "streamlit_app":
+            total = cumulative_ms
+        elif depth == 2:
+            direct.append((cumulative_ms, match.group(3)))
+    return total, sorted(direct, reverse=True)
+
+
+def run_scenario(page, reruns):
+    # Runs in the child interpreter, inside the app copy
+    import types
+    from unittest import mock
+
+    from streamlit.testing.v1 import AppTest
+
+    # AppTest has no browser behind it: an empty cookie jar (the login
+    # page looks for a session cookie, see ui.restore_session)
+    mock.patch("streamlit.runtime.context._get_client_context",
+               lambda: types.SimpleNamespace(cookies={})).start()
+
+    def app():
+        at = AppTest.from_file(os.path.abspath("streamlit_app.py"), default_timeout=120)
+        if page is not None:
+            at.session_state["logged_in"] = True
+            at.session_state["username"] = "admin"
+            at.session_state["role"] = "Admin"
+            at.session_state["page"] = page
+        return at
+
+    at = app()
+    start = time.perf_counter()
+    at.run()
+    first = time.perf_counter() - start
+    errors = [str(e.value) for e in at.exception]
+
+    times = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - start)
+    rerun = statistics.median(times) * 1000 if times else None
+    return {"first_ms": first * 1000, "rerun_ms": rerun, "errors": errors}
+
+
+def check(name, elapsed_ms):
+    budget = BUDGETS_MS.get(name)
+    ok = budget is None or elapsed_ms <= budget
+    mark = "✅" if ok else "❌"
+    print(f"  {mark} {name:<22} {elapsed_ms:8.1f} ms   (budget {budget if budget is not None else '-'} ms)")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reruns", type=int, default=10)
+    parser.add_argument("--importtime", type=int, default=10, help="list the N slowest direct imports")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        page = None if args.child == "-" else args.child
+        print(json.dumps(run_scenario(page, args.reruns)))
+        sys.exit(0)
+
+    src = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as tmp:
+        app_dir = os.path.join(tmp, "app")
+        shutil.copytree(src, app_dir, ignore=shutil.ignore_patterns(".git", "__pycache__"))
+        # Warm the on-disk caches (.pyc, migrations, image cache) once, as a
+        # restarted container would have them from its previous run
+        subprocess.run([sys.executable, os.path.join(app_dir, "bench_startup.py"), "--child", "Main Menu",
+                        "--reruns", "0"], cwd=app_dir, capture_output=True, check=True)
+
+        all_ok = True
+        total, direct = import_times(app_dir)
+        print("Cold import")
+        all_ok &= check("import", total)
+        for cumulative_ms, module in direct[:args.importtime]:
+            print(f"      {cumulative_ms:8.1f} ms  {module}")
+
+        print("Pages (fresh interpreter each)")
+        for scenario, page in SCENARIOS.items():
+            result = subprocess.run(
+                [sys.executable, os.path.join(app_dir, "bench_startup.py"), "--child", page or "-",
+                 "--reruns", str(args.reruns)],
+                cwd=app_dir, capture_output=True, text=True, check=True,
+            )
+            timing = json.loads(result.stdout.strip().splitlines()[-1])
+            all_ok &= check(f"{scenario}: first run", timing["first_ms"])
+            all_ok &= check(f"{scenario}: rerun", timing["rerun_ms"])
+            for error in timing["errors"]:
+                print(f"      ⚠️ {error}")
+                all_ok = False
+
+    print("✅ Within budget." if all_ok else "❌ Over budget.")
+    sys.exit(0 if all_ok else 1)
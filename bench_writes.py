@@ -0,0 +1,86 @@
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+import db
+import order_service
+from migrations import migrate
+
+# Order submission write path: the old per-row loop (iterrows + one INSERT
+# per line) against order_service (vectorized editor parsing + one
+# executemany), each writing one order of N lines in a single transaction
+# on a migrated database, so rollup triggers are included in both. Small
+# orders are repeated until about --lines lines have been written.
+#
+#   python bench_writes.py [--sizes 10 1000 100000]
+
+PRODUCTS = [f"Salt Grade {i}" for i in range(12)]
+
+
+def editor_frame(n):
+    return pd.DataFrame({
+        'Product Name': [PRODUCTS[i % len(PRODUCTS)] for i in range(n)],
+        'Quantity': [float(10 + i % 90) for i in range(n)],
+        'Unit': ['KG'] * n,
+        'Currency': ['INR' if i % 4 else 'USD' for i in range(n)],
+        'Price': [8.5 + i % 3 for i in range(n)],
+    })
+
+
+def per_row(path, products):
+    with db.write_conn(path) as conn:
+        c = conn.cursor()
+        c.execute("INSERT INTO orders (created_by, customer_name, order_date, urgent_flag) VALUES ('bench', 'Bench', '2025-01-01', 0)")
+        order_id = c.lastrowid
+        for _, row in products.iterrows():
+            if row['Product Name']:
+                conn.execute('''
+                    INSERT INTO order_products (
+                        order_id, product_name, quantity, unit, price_inr, price_usd, status
+                    ) VALUES (?, ?, ?, ?, ?, ?, 'Original')
+                ''', (
+                    order_id,
+                    row['Product Name'],
+                    row['Quantity'],
+                    row['Unit'],
+                    row['Price'] if row['Currency'] == 'INR' else 0,
+                    row['Price'] if row['Currency'] == 'USD' else 0
+                ))
+
+
+def bulk(path, products):
+    lines, errors = order_service.order_lines_from_editor(products)
+    assert not errors, errors
+    order_service.create_order('bench', 'Bench', '2025-01-01', 0, '', '', lines, path)
+
+
+def timed(fn, path, products, repeat):
+    fn(path, products)  # warm-up: pool, statement cache
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(path, products)
+    return (time.perf_counter() - start) / repeat
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100_000])
+    parser.add_argument("--lines", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'lines':>8}  {'per-row':>14}  {'executemany':>14}  speedup")
+        for n in args.sizes:
+            products = editor_frame(n)
+            repeat = max(1, args.lines // n)
+            results = []
+            for name, fn in [("per_row", per_row), ("bulk", bulk)]:
+                path = os.path.join(tmp, f"{name}_{n}.db")
+                migrate(path)
+                results.append(timed(fn, path, products, repeat))
+            old, new = results
+            print(f"{n:>8,}  {n / old:>10,.0f} l/s  {n / new:>10,.0f} l/s  {old / new:6.1f}x")
+        db.close_all()
@@ -0,0 +1,100 @@
+import os
+from datetime import datetime
+
+import db
+
+# --- Buyer master ---
+# buyers.xlsx is imported once into the buyers table (migration 008) with
+# an FTS5 index over name, GSTIN and address, so the Sales page searches
+# SQLite instead of parsing the workbook on every rerun.
+
+BUYERS_XLSX = "buyers.xlsx"
+SEARCH_LIMIT = 50
+
+
+def read_workbook(source):
+    # `source` is a path or an uploaded file object
+    import pandas as pd
+
+    df = pd.read_excel(source, engine="openpyxl", dtype=str)
+    df.columns = df.columns.str.strip()
+    df = df.dropna(subset=["Buyer Name"])
+    if "State" not in df.columns:
+        df["State"] = ""
+    df = df.fillna("")
+    rows = []
+    for name, address, state, gstin in zip(df["Buyer Name"], df["Address"], df["State"], df["GSTIN/UIN"]):
+        rows.append((
+            name.strip(),
+            gstin.strip().upper(),
+            address.replace("_x000D_", "").strip(),
+            state.strip(),
+        ))
+    return rows
+
+
+def import_buyers(rows, path=db.ORDERS_DB):
+    # Upsert (name, gstin, address, state) rows keyed on (gstin, name).
+    # The sheet has several buyers sharing one GSTIN (branches) and many
+    # "Unregistered/Consumer" entries, so GSTIN alone is not unique.
+    # Only new or changed rows are written, which keeps re-uploads of a
+    # large master cheap (no row or FTS rewrites for unchanged buyers).
+    # Returns (inserted, updated, unchanged).
+    now = datetime.now().isoformat(timespec="seconds")
+    with db.write_conn(path) as conn:
+        existing = {
+            (gstin, name): (address, state)
+            for gstin, name, address, state in conn.execute("SELECT gstin, name, address, state FROM buyers")
+        }
+        latest = {}
+        for name, gstin, address, state in rows:
+            latest[(gstin, name)] = (address, state)
+        changed = [
+            (name, gstin, address, state, now)
+            for (gstin, name), (address, state) in latest.items()
+            if existing.get((gstin, name)) != (address, state)
+        ]
+        conn.executemany('''
+            INSERT INTO buyers (name, gstin, address, state, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (gstin, name) DO UPDATE SET
+                address = excluded.address,
+                state = excluded.state,
+                updated_at = excluded.updated_at
+        ''', changed)
+    inserted = sum(1 for key in latest if key not in existing)
+    updated = len(changed) - inserted
+    return inserted, updated, len(latest) - len(changed)
+
+
+def import_if_empty(path=db.ORDERS_DB, xlsx=BUYERS_XLSX):
+    # First start after migration 008: seed the table from the existing file
+    with db.read_conn(path) as conn:
+        has_rows = conn.execute("SELECT 1 FROM buyers LIMIT 1").fetchone()
+    if not has_rows and os.path.exists(xlsx):
+        return import_buyers(read_workbook(xlsx), path)
+    return None
+
+
+def _fts_query(text):
+    # Every word must match as a prefix: "sai ind" -> "sai"* "ind"*
+    words = [w.replace('"', '') for w in text.split()]
+    return " ".join(f'"{w}"*' for w in words if w)
+
+
+def search_buyers(conn, text, limit=SEARCH_LIMIT):
+    # [(buyer_id, name, gstin, address)] best matches first
+    query = _fts_query(text or "")
+    if not query:
+        return conn.execute('''
+            SELECT buyer_id, name, gstin, address FROM buyers
+            ORDER BY name LIMIT ?
+        ''', (limit,)).fetchall()
+    return conn.execute('''
+        SELECT b.buyer_id, b.name, b.gstin, b.address
+        FROM buyers_fts f
+        JOIN buyers b ON b.buyer_id = f.rowid
+        WHERE buyers_fts MATCH ?
+        ORDER BY f.rank
+        LIMIT ?
+    ''', (query, limit)).fetchall()
@@ -1,12 +1,16 @@
 import sqlite3
 from datetime import datetime
 
+from migrations import migrate
+
+migrate('orders.db')
 conn = sqlite3.connect('orders.db')
 c = conn.cursor()
 
 # Clear old data (optional during testing)
-c.execute('DELETE FROM orders')
+c.execute('DELETE FROM dispatch_events')
 c.execute('DELETE FROM order_products')
+c.execute('DELETE FROM orders')
 
 # --- Sample Orders by sales1 ---
 orders = [
@@ -31,14 +35,19 @@ c.execute('INSERT INTO order_products (order_id, product_name, quantity, unit, p
           (order_id, 'Product Z', 200, 'Kg', 10000, 120, 'Original'))
 
 # --- Sample Dispatches by dispatch1 and dispatch2 ---
-c.execute('INSERT INTO order_products (order_id, product_name, quantity, unit, price_inr, price_usd, status, modified_by, modified_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
-          (1, 'Product X', 80, 'Kg', 0, 0, 'Dispatched', 'dispatch1', str(datetime.now())))
-
-c.execute('INSERT INTO order_products (order_id, product_name, quantity, unit, price_inr, price_usd, status, modified_by, modified_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
-          (2, 'Product X', 100, 'Kg', 0, 0, 'Dispatched', 'dispatch2', str(datetime.now())))
+# Appended to the dispatch ledger against the order's line for the product
+# (the insert trigger keeps order_products.dispatched_qty in step)
+dispatches = [
+    (1, 'Product X', 80, 'dispatch1'),
+    (2, 'Product X', 100, 'dispatch2'),
+    (3, 'Product Z', 150, 'dispatch1'),
+]
 
-c.execute('INSERT INTO order_products (order_id, product_name, quantity, unit, price_inr, price_usd, status, modified_by, modified_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
-          (3, 'Product Z', 150, 'Kg', 0, 0, 'Dispatched', 'dispatch1', str(datetime.now())))
+for order_id, product_name, quantity, dispatched_by in dispatches:
+    line_id, unit = c.execute("SELECT order_product_id, unit FROM order_products WHERE order_id = ? AND product_name = ? AND status = 'Original'",
+                              (order_id, product_name)).fetchone()
+    c.execute('INSERT INTO dispatch_events (order_product_id, order_id, product_name, quantity, unit, price_inr, price_usd, dispatched_by, dispatched_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+              (line_id, order_id, product_name, quantity, unit, 0, 0, dispatched_by, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
 
 conn.commit()
 conn.close()
@@ -1,65 +1,70 @@
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.application import MIMEApplication
-from email.mime.text import MIMEText
+import csv
 import os
+import re
+
+from mailer import Mailer, message
+
+# --- Daily dispatch email ---
+# Sends today's dispatch summary PDF (or a "no dispatch" note) to RECIPIENT,
+# a comma-separated list. If CUSTOMER_EMAILS names a CSV file with
+# "customer,email" rows, every listed customer dispatched to today also gets
+# a dispatch note with their own lines. All messages go out over one SMTP
+# connection (see mailer.py for server settings and retries).
 
 def send_email_with_pdf(pdf_file, sender, password, recipient, subject, body):
-    msg = MIMEMultipart()
-    msg['From'] = sender
-    msg['To'] = recipient
-    msg['Subject'] = subject
+    with Mailer(sender, password) as mailer:
+        mailer.send(message(sender, recipient, subject, body, [pdf_file]))
+    print(f"Email sent to {recipient} with {pdf_file}")
 
-    msg.attach(MIMEText(body, 'plain'))
 
-    with open(pdf_file, "rb") as f:
-        part = MIMEApplication(f.read(), Name=pdf_file)
-    part['Content-Disposition'] = f'attachment; filename="{pdf_file}"'
-    msg.attach(part)
+def customer_emails(path):
+    # customer name -> [addresses]
+    emails = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if len(row) >= 2 and row[1].strip() and row[0].strip().lower() != "customer":
+                emails.setdefault(row[0].strip(), []).append(row[1].strip())
+    return emails
 
-    server = smtplib.SMTP('smtp.gmail.com', 587)
-    server.starttls()
-    server.login(sender, password)
-    server.send_message(msg)
-    server.quit()
 
-    print(f"Email sent to {recipient} with {pdf_file}")
+def send_customer_notes(mailer, sender, emails):
+    from dispatch_report_pdf import dispatched_customers, generate_dispatch_pdf
+
+    for customer in dispatched_customers():
+        if customer not in emails:
+            continue
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", customer).strip("_") or "customer"
+        pdf_file = generate_dispatch_pdf(f"dispatch_note_{slug}.pdf", customer=customer)
+        if pdf_file:
+            mailer.send(message(
+                sender, emails[customer], "Dispatch Note - Shree Sai Salt",
+                f"Dear {customer},\n\nPlease find attached the details of today's dispatch.\n\nRegards,\nShree Sai Industries",
+                [pdf_file]))
+            print(f"Dispatch note sent to {customer}")
+
 
 if __name__ == "__main__":
     from dispatch_report_pdf import generate_dispatch_pdf
-    import os
 
     sender = os.getenv("EMAIL_USER")
-    password = os.getenv("EMAIL_PASS")
-    recipient = os.getenv("RECIPIENT")
+    recipients = [r.strip() for r in os.getenv("RECIPIENT", "").split(",") if r.strip()]
 
     pdf_file = generate_dispatch_pdf()
 
-    if pdf_file:
-        # If dispatch report exists, send it with attachment
-        send_email_with_pdf(
-            pdf_file=pdf_file,
-            sender=sender,
-            password=password,
-            recipient=recipient,
-            subject="✅ Daily Dispatch Summary",
-            body="DearSir/Madam,\n\nPlease find attached today's dispatch summary report.\n\nRegards,\nTeam Admin,\nShree Sai Salt"
-        )
-    else:
-        # If no dispatch, send text-only email
-        import smtplib
-        from email.mime.text import MIMEText
-
-        msg = MIMEText("Dear Sir/Madam,\n\n📭 No dispatches for today.\n\nRegards,\nAdmin Team,\nShree Sai Industries")
-        msg["From"] = sender
-        msg["To"] = recipient
-        msg["Subject"] = "📭 No Dispatch Today"
-
-        server = smtplib.SMTP("smtp.gmail.com", 587)
-        server.starttls()
-        server.login(sender, password)
-        server.send_message(msg)
-        server.quit()
-        print(f"📭 Email sent to {recipient} stating no dispatch today.")
-
+    with Mailer() as mailer:
+        if pdf_file:
+            # If dispatch report exists, send it with attachment
+            mailer.send(message(
+                sender, recipients, "✅ Daily Dispatch Summary",
+                "DearSir/Madam,\n\nPlease find attached today's dispatch summary report.\n\nRegards,\nTeam Admin,\nShree Sai Salt",
+                [pdf_file]))
+            print(f"Email sent to {', '.join(recipients)} with {pdf_file}")
 
+            if os.getenv("CUSTOMER_EMAILS"):
+                send_customer_notes(mailer, sender, customer_emails(os.getenv("CUSTOMER_EMAILS")))
+        else:
+            # If no dispatch, send text-only email
+            mailer.send(message(
+                sender, recipients, "📭 No Dispatch Today",
+                "Dear Sir/Madam,\n\n📭 No dispatches for today.\n\nRegards,\nAdmin Team,\nShree Sai Industries"))
+            print(f"📭 Email sent to {', '.join(recipients)} stating no dispatch today.")
@@ -0,0 +1,174 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import sqltrace
+
+# --- Database locations ---
+ORDERS_DB = "orders.db"
+USERS_DB = os.path.join("data", "users.db")
+
+
+def archive_path(path):
+    # orders.db -> orders_archive.db (completed orders moved by archive.py)
+    return os.path.splitext(path)[0] + "_archive.db"
+
+# --- Connection tuning (applied once per pooled connection) ---
+# WAL lets readers keep going while a writer commits; busy_timeout makes a
+# second writer wait instead of failing with "database is locked".
+BUSY_TIMEOUT_MS = 5000
+PRAGMAS = [
+    "PRAGMA journal_mode = WAL",
+    f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -20000",      # ~20 MB page cache
+    "PRAGMA mmap_size = 268435456",    # 256 MB memory-mapped I/O
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA foreign_keys = ON",
+]
+
+READ_POOL_SIZE = 4
+
+
+def attach_archive(conn, path):
+    # Attaches the archive as "archive" when there is one (outside a
+    # transaction); -> whether it is attached. Only history reads use it
+    # (archive.history), hot-path queries stay on main.
+    if os.path.exists(archive_path(path)):
+        conn.execute("ATTACH DATABASE ? AS archive", (archive_path(path),))
+        return True
+    return False
+
+
+def _connect(path, read_only):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    # isolation_level=None -> we issue BEGIN/COMMIT ourselves; queries are
+    # timed per page render (sqltrace.py)
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000,
+                           isolation_level=None, check_same_thread=False,
+                           factory=sqltrace.TracedConnection if sqltrace.ENABLED else sqlite3.Connection)
+    if sqltrace.ENABLED:
+        sqltrace.install(conn)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    attach_archive(conn, path)
+    if read_only:
+        conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+class ConnectionPool:
+    # One pool per database file per process: a few idle read connections
+    # plus a single write connection guarded by a lock.
+
+    def __init__(self, path, read_pool_size=READ_POOL_SIZE):
+        self.path = path
+        self.read_pool_size = read_pool_size
+        self._readers = queue.LifoQueue()
+        self._writer = None
+        self._writer_archive = False
+        self._write_lock = threading.Lock()
+        self._watcher = None
+        self._watch_lock = threading.Lock()
+        self.writes = 0
+
+    @contextmanager
+    def read(self):
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = _connect(self.path, read_only=True)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            if self._readers.qsize() < self.read_pool_size:
+                self._readers.put(conn)
+            else:
+                conn.close()
+
+    @contextmanager
+    def write(self):
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = _connect(self.path, read_only=False)
+                self._writer_archive = os.path.exists(archive_path(self.path))
+            conn = self._writer
+            if not self._writer_archive:
+                # archive created since connecting; ATTACH can't run inside
+                # the transaction
+                self._writer_archive = attach_archive(conn, self.path)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+                self.writes += 1
+
+    def generation(self):
+        # Changes whenever the database file has changed: `writes` counts
+        # commits made through this pool, and PRAGMA data_version on a
+        # dedicated idle connection moves when any other connection (another
+        # process, a script) commits.
+        with self._watch_lock:
+            if self._watcher is None:
+                self._watcher = _connect(self.path, read_only=True)
+            data_version = self._watcher.execute("PRAGMA data_version").fetchone()[0]
+        return self.writes, data_version
+
+    def close(self):
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+                self._writer_archive = False
+        with self._watch_lock:
+            if self._watcher is not None:
+                self._watcher.close()
+                self._watcher = None
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+# --- Process-wide registry ---
+# Streamlit re-executes the page script on every interaction, but imported
+# modules stay loaded, so these pools live for the whole server process.
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path=ORDERS_DB):
+    key = os.path.abspath(path)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(path)
+    return pool
+
+
+def read_conn(path=ORDERS_DB):
+    return get_pool(path).read()
+
+
+def write_conn(path=ORDERS_DB):
+    return get_pool(path).write()
+
+
+def close_all():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
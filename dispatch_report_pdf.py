@@ -1,67 +1,400 @@
-import sqlite3
-import pandas as pd
-from datetime import datetime
-from fpdf import FPDF
+import argparse
+import heapq
 import os
+import tempfile
+from datetime import date, datetime, timedelta
+from fpdf import FPDF
+
+import archive
+import db
+from migrations import migrate
+
+# --- Dispatch report PDF ---
+# Dispatched lines for a date range (default: today), optionally for one
+# customer and/or product (or to orders still open), grouped by customer
+# and order with subtotals.
+# Archived orders are included (all_dispatch_lines, see archive.py).
+# Rows are read from the cursor CHUNK_ROWS at a time and written straight
+# into the page; finished pages are spooled to a temporary file and the PDF
+# is written to disk as it is assembled, so memory stays flat however many
+# rows the range holds.
+#
+#   python dispatch_report_pdf.py [--from 2025-01-01] [--to 2025-01-31]
+#                                 [--customer "Name"] [--product "Name"] [--open] [-o report.pdf]
+
+CHUNK_ROWS = 2000
+ROW_HEIGHT = 6
+FONT_SIZE = 8
+MARGIN = 10
+PAGE_WIDTH = 297 - 2 * MARGIN  # A4 landscape, mm
+
+# (heading, alignment); values come from the query below in the same order
+COLUMNS = [
+    ("Order No", "L"),
+    ("Customer Name", "L"),
+    ("Product Name", "L"),
+    ("Quantity", "R"),
+    ("Unit", "L"),
+    ("Amount (INR)", "R"),
+    ("Dispatched By", "L"),
+    ("Dispatched Date", "L"),
+]
+TEXT_COLUMNS = {0: "order_no", 1: "customer_name", 2: "product_name", 4: "unit", 6: "dispatched_by"}
+
+LINES_SQL = '''
+    SELECT order_no, customer_name, product_name, quantity, unit, amount_inr, dispatched_by, dispatched_at
+    FROM all_dispatch_lines
+    WHERE {where}
+    ORDER BY customer_name, order_no, event_id
+'''
+
+
+def _latin1(value):
+    # The core PDF fonts only cover Latin-1
+    return str(value).encode("latin-1", "replace").decode("latin-1")
+
+
+def parse_day(value):
+    if value is None:
+        return date.today()
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def line_filters(date_from, date_to, customer, product, open_only=False):
+    # dispatched_at is 'YYYY-MM-DD HH:MM:SS': a half-open text range keeps
+    # idx_dispatch_events_at usable (DATE(dispatched_at) would not)
+    where = ["dispatched_at >= ?", "dispatched_at < ?"]
+    params = [date_from.isoformat(), (date_to + timedelta(days=1)).isoformat()]
+    if customer:
+        where.append("customer_name = ?")
+        params.append(customer)
+    if product:
+        where.append("product_name = ?")
+        params.append(product)
+    if open_only:
+        # orders not yet fully dispatched (idx_orders_open, see fulfilment.py)
+        where.append("order_id IN (SELECT order_id FROM orders WHERE fulfilment_status <> 'complete')")
+    return " AND ".join(where), params
+
+
+class _FileBuffer:
+    # Stands in for FPDF.buffer: output is written to the file as FPDF
+    # appends it, and len() is the byte offset FPDF uses for its xref table
+    def __init__(self, f):
+        self.f = f
+        self.size = 0
+
+    def __iadd__(self, s):
+        data = s.encode("latin-1")
+        self.f.write(data)
+        self.size += len(data)
+        return self
+
+    def __len__(self):
+        return self.size
+
+
+class _PageBuffer:
+    def __init__(self):
+        self.parts = []
+
+    def __iadd__(self, s):
+        self.parts.append(s)
+        return self
+
+
+class _SpooledPages:
+    # Stands in for FPDF.pages: only the page being drawn is held in memory,
+    # earlier pages are read back one at a time when the document is closed
+    def __init__(self):
+        self.spool = tempfile.TemporaryFile()
+        self.index = {}  # page -> (offset, length)
+        self.page = None
+        self.current = None
+
+    def __setitem__(self, page, value):
+        if isinstance(value, _PageBuffer):  # FPDF's `pages[n] += s`
+            return
+        self.flush()
+        self.page = page
+        self.current = _PageBuffer()
+        if value:
+            self.current += value
+
+    def __getitem__(self, page):
+        if page == self.page:
+            return self.current
+        offset, length = self.index[page]
+        self.spool.seek(offset)
+        return self.spool.read(length).decode("latin-1")
+
+    def __contains__(self, page):
+        return page == self.page or page in self.index
+
+    def __len__(self):
+        return len(self.index) + (self.page is not None)
+
+    def flush(self):
+        if self.page is None:
+            return
+        data = "".join(self.current.parts).encode("latin-1")
+        self.spool.seek(0, os.SEEK_END)
+        self.index[self.page] = (self.spool.tell(), len(data))
+        self.spool.write(data)
+        self.page = None
+        self.current = None
+
+    def close(self):
+        self.spool.close()
+
+
+class DispatchPDF(FPDF):
 
-def generate_dispatch_pdf(filename='dispatch_report.pdf'):
-    db_file = 'orders.db'
+    def __init__(self, f, title):
+        super().__init__(orientation="L", format="A4")
+        self.buffer = _FileBuffer(f)
+        self.pages = _SpooledPages()
+        self.title = title
+        self.widths = None
+        self.set_margins(MARGIN, MARGIN)
+        self.set_auto_page_break(True, margin=12)
 
+    def header(self):
+        # Runs on every new page, including automatic page breaks
+        self.set_font("Arial", "B", 12)
+        self.cell(0, 8, self.title, ln=1, align="C")
+        self.set_font("Arial", "B", FONT_SIZE)
+        self.set_fill_color(230, 230, 230)
+        for (heading, align), width in zip(COLUMNS, self.widths):
+            self.cell(width, ROW_HEIGHT, heading, border=1, align=align, fill=True)
+        self.ln(ROW_HEIGHT)
+        self.set_font("Arial", "", FONT_SIZE)
+
+    def footer(self):
+        self.set_y(-10)
+        self.set_font("Arial", "I", 7)
+        self.cell(0, 5, f"Page {self.page_no()}", align="R")
+
+    def _endpage(self):
+        super()._endpage()
+        self.pages.flush()
+
+    def fit(self, text, width):
+        # Shorten text that would overflow its cell
+        room = width - 2 * self.c_margin
+        if self.get_string_width(text) <= room:
+            return text
+        while text and self.get_string_width(text + "..") > room:
+            text = text[:-1]
+        return text + ".."
+
+    def _room(self):
+        if self.y + ROW_HEIGHT > self.page_break_trigger:
+            self.add_page()
+
+    def row(self, values):
+        self._room()
+        for value, (_, align), width in zip(values, COLUMNS, self.widths):
+            self.cell(width, ROW_HEIGHT, self.fit(value, width), border=1, align=align)
+        self.ln(ROW_HEIGHT)
+
+    def subtotal(self, label, lines, qty, unit, amount):
+        # Label across Order/Customer/Product; quantity only when every
+        # line in the group has the same unit
+        self._room()
+        self.set_font("Arial", "B", FONT_SIZE)
+        w = self.widths
+        label = f"{label} ({lines:,} line{'s' if lines != 1 else ''})"
+        self.cell(w[0] + w[1] + w[2], ROW_HEIGHT, self.fit(label, w[0] + w[1] + w[2]), border=1, fill=True)
+        self.cell(w[3], ROW_HEIGHT, f"{qty:,.0f}" if unit else "", border=1, align="R", fill=True)
+        self.cell(w[4], ROW_HEIGHT, self.fit(unit or "", w[4]), border=1, fill=True)
+        self.cell(w[5], ROW_HEIGHT, f"{amount:,.2f}", border=1, align="R", fill=True)
+        self.cell(w[6] + w[7], ROW_HEIGHT, "", border=1, fill=True)
+        self.ln(ROW_HEIGHT)
+        self.set_font("Arial", "", FONT_SIZE)
+
+
+def column_widths(conn, where, params, page_width):
+    # Width of each column's widest heading or value, or None if nothing
+    # matches. Text columns are measured on their longest values (one pass
+    # over the distinct combinations), numbers on a fixed sample.
+    longest = {i: [] for i in TEXT_COLUMNS}  # column -> heap of (length, value)
+    found = False
+    cursor = conn.execute(f'''
+        SELECT DISTINCT {", ".join(TEXT_COLUMNS.values())} FROM all_dispatch_lines WHERE {where}
+    ''', params)
+    while True:
+        chunk = cursor.fetchmany(CHUNK_ROWS)
+        if not chunk:
+            break
+        found = True
+        for row in chunk:
+            for i, value in zip(TEXT_COLUMNS, row):
+                candidate = (len(value or ""), value or "")
+                heap = longest[i]
+                if candidate in heap:
+                    continue
+                if len(heap) < 20:
+                    heapq.heappush(heap, candidate)
+                elif candidate > heap[0]:
+                    heapq.heapreplace(heap, candidate)
+    if not found:
+        return None
+
+    probe = FPDF(orientation="L", format="A4")
+    probe.add_page()
+    probe.set_font("Arial", "B", FONT_SIZE)
+    widths = [probe.get_string_width(heading) for heading, _ in COLUMNS]
+    probe.set_font("Arial", "", FONT_SIZE)
+    for i, heap in longest.items():
+        for _, value in heap:
+            widths[i] = max(widths[i], probe.get_string_width(_latin1(value)))
+    widths[3] = max(widths[3], probe.get_string_width("9,999,999"))
+    widths[5] = max(widths[5], probe.get_string_width("99,99,99,999.00"))
+    widths[7] = max(widths[7], probe.get_string_width("2025-12-31 23:59:59"))
+    widths = [w + 2 * probe.c_margin + 1 for w in widths]
+
+    # Too wide for the page: shrink the text columns (values get "..")
+    excess = sum(widths) - page_width
+    if excess > 0:
+        flexible = sum(widths[i] for i in TEXT_COLUMNS)
+        widths = [w - excess * w / flexible if i in TEXT_COLUMNS else w for i, w in enumerate(widths)]
+    return widths
+
+
+def write_report(conn, f, title, where, params, widths):
+    # -> (rows written, pages)
+    pdf = DispatchPDF(f, title)
+    pdf.widths = widths
+    pdf.add_page()
+
+    # [lines, qty, unit (None once units are mixed), amount] per group
+    order_total = customer_total = grand_total = None
+    order = customer = None
+
+    def add(total, qty, unit, amount):
+        if total is None:
+            return [1, qty, unit, amount]
+        total[0] += 1
+        total[1] += qty
+        if total[2] != unit:
+            total[2] = None
+        total[3] += amount
+        return total
+
+    rows = 0
+    cursor = conn.execute(LINES_SQL.format(where=where), params)
+    while True:
+        chunk = cursor.fetchmany(CHUNK_ROWS)
+        if not chunk:
+            break
+        for order_no, customer_name, product_name, quantity, unit, amount, dispatched_by, dispatched_at in chunk:
+            if order is not None and (customer_name, order_no) != (customer, order):
+                pdf.subtotal(f"Order {_latin1(order or '')} subtotal", *order_total)
+                order_total = None
+                if customer_name != customer:
+                    pdf.subtotal(f"{_latin1(customer or '')} subtotal", *customer_total)
+                    customer_total = None
+            order, customer = order_no, customer_name
+            qty = quantity or 0
+            amount = amount or 0
+            order_total = add(order_total, qty, unit, amount)
+            customer_total = add(customer_total, qty, unit, amount)
+            grand_total = add(grand_total, qty, unit, amount)
+            pdf.row([
+                _latin1(order_no or ""), _latin1(customer_name or ""), _latin1(product_name or ""),
+                f"{qty:,.0f}", _latin1(unit or ""), f"{amount:,.2f}",
+                _latin1(dispatched_by or ""), str(dispatched_at or ""),
+            ])
+            rows += 1
+
+    if rows:
+        pdf.subtotal(f"Order {_latin1(order or '')} subtotal", *order_total)
+        pdf.subtotal(f"{_latin1(customer or '')} subtotal", *customer_total)
+        pdf.subtotal("Grand total", *grand_total)
+    pdf.close()
+    pdf.pages.close()
+    return rows, pdf.page_no()
+
+
+def dispatched_customers(date_from=None, date_to=None, path=db.ORDERS_DB):
+    # Customers with dispatches in the range (default: today)
+    date_from = parse_day(date_from)
+    date_to = parse_day(date_to) if date_to is not None else date_from
+    where, params = line_filters(date_from, date_to, None, None)
+    with db.read_conn(path) as conn:
+        archive.history(conn)
+        return [name for (name,) in conn.execute(
+            f"SELECT DISTINCT customer_name FROM all_dispatch_lines WHERE {where} ORDER BY customer_name", params)]
+
+
+def generate_dispatch_pdf(filename='dispatch_report.pdf', date_from=None, date_to=None,
+                          customer=None, product=None, path=db.ORDERS_DB, open_only=False):
     # Check if DB exists
-    if not os.path.exists(db_file):
+    if not os.path.exists(path):
         print("❌ Database file not found.")
         return None
 
-    conn = sqlite3.connect(db_file)
-    c = conn.cursor()
-
-    # Fetch today's dispatched orders
-    today = datetime.today().strftime('%Y-%m-%d')
-    try:
-        c.execute('''
-            SELECT o.order_no, o.customer_name, p.product_name, p.quantity, p.unit, p.status, p.modified_by, p.modified_date
-            FROM orders o
-            JOIN order_products p ON o.order_id = p.order_id
-            WHERE p.status = 'Dispatched'
-            AND DATE(p.modified_date) = ?
-            ORDER BY o.order_no ASC
-        ''', (today,))
-        data = c.fetchall()
-    except sqlite3.OperationalError as e:
-        print(f"❌ SQL Error: {e}")
-        conn.close()
-        return None
+    # Make sure the shared dispatch views exist
+    migrate(path)
 
-    if not data:
-        print("📭 No dispatched orders for today.")
-        conn.close()
+    result = render_pdf(filename, date_from, date_to, customer, product, path, open_only)
+    if result is None:
+        print("📭 No dispatched orders for this period.")
         return None
+    rows, pages = result
+    print(f"✅ PDF generated: {filename} ({rows:,} lines, {pages:,} pages)")
+    return filename
 
-    df = pd.DataFrame(data, columns=['Order No', 'Customer Name', 'Product Name', 'Quantity', 'Unit', 'Status', 'Dispatched By', 'Dispatched Date'])
 
-    # Generate PDF using FPDF
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", 'B', 14)
-    pdf.cell(200, 10, f"Dispatch Summary - {today}", ln=True, align='C')
-    pdf.set_font("Arial", '', 10)
-
-    col_width = pdf.w / 7
-    row_height = 8
-    for col in df.columns:
-        pdf.cell(col_width, row_height, str(col), border=1)
-    pdf.ln(row_height)
-
-    for _, row in df.iterrows():
-        for item in row:
-            pdf.cell(col_width, row_height, str(item), border=1)
-        pdf.ln(row_height)
-
-    pdf.output(filename)
-    print(f"✅ PDF generated: {filename}")
-    conn.close()
-    return filename
+def render_pdf(filename, date_from=None, date_to=None, customer=None, product=None, path=db.ORDERS_DB,
+               open_only=False):
+    # -> (rows, pages), or None if nothing matches. Assumes a migrated
+    # database (generate_dispatch_pdf checks); batch_reports calls this
+    # directly from its workers.
+    date_from = parse_day(date_from)
+    date_to = parse_day(date_to) if date_to is not None else date_from
+    where, params = line_filters(date_from, date_to, customer, product, open_only)
+
+    if date_from == date_to:
+        title = f"Dispatch Summary - {date_from.isoformat()}"
+    else:
+        title = f"Dispatch Summary - {date_from.isoformat()} to {date_to.isoformat()}"
+    if customer:
+        title += f" - {customer}"
+    if product:
+        title += f" - {product}"
+    if open_only:
+        title += " - open orders"
+
+    tmp = filename + ".tmp"
+    with db.read_conn(path) as conn:
+        archive.history(conn)
+        widths = column_widths(conn, where, params, PAGE_WIDTH)
+        if widths is None:
+            return None
+        try:
+            with open(tmp, "wb") as f:
+                rows, pages = write_report(conn, f, _latin1(title), where, params, widths)
+        except BaseException:
+            os.remove(tmp)
+            raise
+    os.replace(tmp, filename)
+    return rows, pages
+
 
-# Optional test run
 if __name__ == "__main__":
-    generate_dispatch_pdf()
+    parser = argparse.ArgumentParser(description="Dispatch report PDF")
+    parser.add_argument("--from", dest="date_from", help="first day, YYYY-MM-DD (default: today)")
+    parser.add_argument("--to", dest="date_to", help="last day, YYYY-MM-DD (default: --from)")
+    parser.add_argument("--customer")
+    parser.add_argument("--product")
+    parser.add_argument("--open", action="store_true", help="only orders not yet fully dispatched")
+    parser.add_argument("-o", "--output", default="dispatch_report.pdf")
+    args = parser.parse_args()
+    generate_dispatch_pdf(args.output, args.date_from, args.date_to, args.customer, args.product,
+                          open_only=args.open)
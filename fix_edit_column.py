@@ -1,14 +1,7 @@
-import sqlite3
+from migrations import migrate
 
-conn = sqlite3.connect("orders.db")
-c = conn.cursor()
-
-# Try adding the column (ignore if already exists)
-try:
-    c.execute("ALTER TABLE order_products ADD COLUMN edit_count INTEGER DEFAULT 0")
-    print("✅ Column 'edit_count' added.")
-except sqlite3.OperationalError as e:
-    print("⚠️ Column already exists or another issue:", e)
-
-conn.commit()
-conn.close()
+# The edit_count column is now added by migration 002; running the
+# migrations brings any older orders.db up to date.
+applied = migrate("orders.db", verbose=True)
+if not applied:
+    print("⚠️ Column already exists; schema is up to date.")
@@ -0,0 +1,166 @@
+import argparse
+import sys
+
+import db
+
+# --- Fulfilment state on orders ---
+# Every order carries its fulfilment totals and status (migration 012):
+#   ordered_qty        sum of its Original lines
+#   dispatched_qty     sum of its dispatch_events
+#   last_dispatch_at   newest dispatched_at
+#   fulfilment_status  'pending'  nothing dispatched yet (or no lines)
+#                      'partial'  some dispatched, some product still open
+#                      'complete' every product dispatched in full
+# A product is open while less of it has been dispatched than ordered (the
+# same test the dispatch queue used to run per order). Triggers on
+# rollup_order_product (itself kept by the order_products / dispatch_events
+# triggers, see rollups.py) and on dispatch_events recompute the order's
+# row in the transaction that changed it, from that order's few rollup rows.
+# Open orders are found through idx_orders_open, a partial index.
+#
+#   python fulfilment.py          # compare stored state with a full recompute
+#   python fulfilment.py --fix    # ...and rewrite the rows that differ
+
+STATUSES = ["pending", "partial", "complete"]
+
+TRIGGERS = [
+    "trg_fulfilment_rollup_insert", "trg_fulfilment_rollup_update", "trg_fulfilment_rollup_delete",
+    "trg_fulfilment_event_insert", "trg_fulfilment_event_delete",
+]
+
+OPEN = "fulfilment_status <> 'complete'"
+
+
+def _refresh_order(order_id):
+    # One order's totals and status from its rollup_order_product rows
+    rows = f"FROM rollup_order_product r WHERE r.order_id = {order_id}"
+    return f'''
+        UPDATE orders SET
+            ordered_qty = IFNULL((SELECT SUM(r.original_qty) {rows}), 0),
+            dispatched_qty = IFNULL((SELECT SUM(r.dispatched_qty) {rows}), 0),
+            fulfilment_status = CASE
+                WHEN NOT EXISTS (SELECT 1 {rows}) THEN 'pending'
+                WHEN EXISTS (SELECT 1 {rows} AND r.original_qty > r.dispatched_qty) THEN
+                    CASE WHEN EXISTS (SELECT 1 {rows} AND r.dispatched_lines > 0)
+                         THEN 'partial' ELSE 'pending' END
+                ELSE 'complete'
+            END
+        WHERE order_id = {order_id};
+    '''
+
+
+def create_triggers(conn):
+    for name in TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    conn.execute(f'''
+        CREATE TRIGGER trg_fulfilment_rollup_insert AFTER INSERT ON rollup_order_product
+        BEGIN {_refresh_order("NEW.order_id")} END
+    ''')
+    # original_price_inr changes don't move the totals
+    conn.execute(f'''
+        CREATE TRIGGER trg_fulfilment_rollup_update
+        AFTER UPDATE OF order_id, original_qty, dispatched_lines, dispatched_qty ON rollup_order_product
+        BEGIN {_refresh_order("OLD.order_id")} {_refresh_order("NEW.order_id")} END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER trg_fulfilment_rollup_delete AFTER DELETE ON rollup_order_product
+        BEGIN {_refresh_order("OLD.order_id")} END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER trg_fulfilment_event_insert AFTER INSERT ON dispatch_events BEGIN
+            UPDATE orders SET last_dispatch_at = NEW.dispatched_at
+            WHERE order_id = NEW.order_id
+              AND (last_dispatch_at IS NULL OR last_dispatch_at < NEW.dispatched_at);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER trg_fulfilment_event_delete AFTER DELETE ON dispatch_events BEGIN
+            UPDATE orders SET last_dispatch_at = (
+                SELECT MAX(e.dispatched_at) FROM dispatch_events e WHERE e.order_id = OLD.order_id
+            )
+            WHERE order_id = OLD.order_id;
+        END
+    ''')
+
+
+# Full recompute straight from order_products and dispatch_events (not from
+# the rollups, so drift in either shows up)
+EXPECTED_SQL = '''
+    WITH per_product AS (
+        SELECT order_id, product_name,
+               SUM(original_qty) AS original_qty,
+               SUM(dispatched_qty) AS dispatched_qty,
+               SUM(dispatched) AS dispatched_lines
+        FROM (
+            SELECT order_id, IFNULL(product_name, '') AS product_name,
+                   IFNULL(quantity, 0) AS original_qty, 0 AS dispatched_qty, 0 AS dispatched
+            FROM order_products WHERE status = 'Original'
+            UNION ALL
+            SELECT order_id, IFNULL(product_name, ''), 0, IFNULL(quantity, 0), 1
+            FROM dispatch_events
+        )
+        GROUP BY order_id, product_name
+    )
+    SELECT o.order_id,
+           IFNULL(SUM(p.original_qty), 0),
+           IFNULL(SUM(p.dispatched_qty), 0),
+           (SELECT MAX(e.dispatched_at) FROM dispatch_events e WHERE e.order_id = o.order_id),
+           CASE
+               WHEN COUNT(p.order_id) = 0 THEN 'pending'
+               WHEN SUM(p.original_qty > p.dispatched_qty) > 0 THEN
+                   CASE WHEN SUM(p.dispatched_lines) > 0 THEN 'partial' ELSE 'pending' END
+               ELSE 'complete'
+           END
+    FROM orders o
+    LEFT JOIN per_product p ON p.order_id = o.order_id
+    GROUP BY o.order_id
+'''
+
+STORED_SQL = '''
+    SELECT order_id, ordered_qty, dispatched_qty, last_dispatch_at, fulfilment_status
+    FROM orders
+'''
+
+
+def rebuild(conn):
+    # Rewrites every order's state; run inside a write transaction
+    conn.executemany('''
+        UPDATE orders
+        SET ordered_qty = ?, dispatched_qty = ?, last_dispatch_at = ?, fulfilment_status = ?
+        WHERE order_id = ?
+    ''', [row[1:] + row[:1] for row in conn.execute(EXPECTED_SQL).fetchall()])
+
+
+def _differs(stored, expected):
+    return (abs(stored[1] - expected[1]) > 1e-6 or abs(stored[2] - expected[2]) > 1e-6
+            or stored[3] != expected[3] or stored[4] != expected[4])
+
+
+def check(conn):
+    # -> [(stored row, expected row)] for every order whose state is off
+    stored = {row[0]: row for row in conn.execute(STORED_SQL)}
+    return [(stored[row[0]], row) for row in conn.execute(EXPECTED_SQL) if _differs(stored[row[0]], row)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the fulfilment state stored on orders")
+    parser.add_argument("--db", default=db.ORDERS_DB, help="database file (default: orders.db)")
+    parser.add_argument("--fix", action="store_true", help="rewrite the orders that differ")
+    parser.add_argument("--show", type=int, default=20, help="differences to list (default: 20)")
+    args = parser.parse_args()
+
+    with db.write_conn(args.db) as conn:
+        total = conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+        diffs = check(conn)
+        for stored, expected in diffs[:args.show]:
+            print(f"❌ order {stored[0]}: stored {stored[4]} {stored[1]:g}/{stored[2]:g} at {stored[3]}, "
+                  f"expected {expected[4]} {expected[1]:g}/{expected[2]:g} at {expected[3]}")
+        if args.fix and diffs:
+            rebuild(conn)
+    if not diffs:
+        print(f"✅ Fulfilment state matches a full recompute for all {total} orders.")
+    elif args.fix:
+        print(f"✅ Fixed {len(diffs)} of {total} orders.")
+    else:
+        print(f"❌ {len(diffs)} of {total} orders differ (run with --fix to rewrite them).")
+        sys.exit(1)
@@ -0,0 +1,356 @@
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import sqlite3
+import time
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+import auth
+import buyers
+import db
+import fulfilment
+import rollups
+from migrations import migrate
+
+# --- Synthetic fixtures at production scale ---
+# Builds a fresh, fully migrated orders.db, data/users.db and buyers.xlsx
+# under --out (default fixtures/<scale>) with about --scale order lines.
+# Everything is drawn from one seeded RNG and dated back from --as-of (a
+# fixed day, not today), so the same seed, scale and as-of give the same
+# data on any day; the three are recorded in FIXTURE_INFO next to the
+# databases. Distributions:
+#   products      30 salt grades x pack sizes, Zipf-weighted (a few sell most)
+#   customers     Pareto-weighted buyers (about 20% place 80% of the orders);
+#                 some are export buyers priced in USD
+#   order dates   HISTORY_DAYS back from --as-of, busy on weekdays, quiet on
+#                 Sundays, growing over the period
+#   lines         1-6 distinct products per order, lognormal quantities
+#   urgency       URGENT_SHARE of orders
+#   dispatches    1-3 ledger events per dispatched line; orders more than a
+#                 few days old are mostly complete, recent ones pending or
+#                 partial, and STUCK_SHARE of older orders never finish
+# Rollup and fulfilment triggers are off during the bulk load and their
+# tables rebuilt at the end (the dispatch ledger trigger stays on).
+#
+# Users: admin, sales1-5, dispatch1-3, each with their username as password
+# (low bcrypt rounds; fixtures only).
+#
+#   python generate_fixtures.py [--scale 1k|100k|1m] [--seed 42]
+#                               [--as-of 2025-06-30] [--out DIR]
+#
+# Point the app or bench_pages.py at the result, e.g.
+#   cd fixtures/100k && streamlit run ../../streamlit_app.py
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+HISTORY_DAYS = 730
+AS_OF = date(2025, 6, 30)   # the fixture's "today"
+CLOSE_OF_DAY = timedelta(hours=19)  # ...and its "now", after the last dispatch hour
+FIXTURE_INFO = "fixture.json"
+URGENT_SHARE = 0.08
+EXPORT_SHARE = 0.06
+STUCK_SHARE = 0.015
+USD_RATE = 83.0
+FIXTURE_BCRYPT_ROUNDS = 4
+FLUSH_ORDERS = 20_000
+
+GRADES = [
+    ("Refined Free Flow Salt", 14), ("Industrial Salt", 6), ("Iodised Salt", 12),
+    ("Vacuum Evaporated Salt", 16), ("Rock Salt", 22), ("Black Salt", 38),
+    ("Pink Himalayan Salt", 45), ("Low Sodium Salt", 52), ("Sea Salt", 18),
+    ("Water Softener Tablet Salt", 24),
+]
+PACKS = ["1 kg", "25 kg", "50 kg"]
+
+USERS = (
+    [("admin", "Admin", "Fixture Admin")]
+    + [(f"sales{i}", "Sales", f"Sales User {i}") for i in range(1, 6)]
+    + [(f"dispatch{i}", "Dispatch", f"Dispatch User {i}") for i in range(1, 4)]
+)
+SALES_WEIGHTS = [0.35, 0.25, 0.2, 0.12, 0.08]
+DISPATCH_WEIGHTS = [0.5, 0.3, 0.2]
+
+NAME_PREFIXES = ["Shree", "Sai", "Om", "Ganesh", "Bharat", "Jai", "Laxmi", "Krishna", "Balaji",
+                 "Durga", "Maa", "Shiv", "Radhe", "New", "Royal", "National", "Eastern", "Western"]
+NAME_CORES = ["Salt", "Chemicals", "Foods", "Agro", "Spices", "Dairy", "Pharma", "Textiles",
+              "Water", "Poly", "Leather", "Bakers"]
+NAME_SUFFIXES = ["Traders", "Industries", "Enterprises", "Pvt Ltd", "& Sons", "Corporation",
+                 "Suppliers", "Distributors", "LLP", "Stores"]
+STATES = [
+    ("07", "Delhi", "New Delhi"), ("09", "Uttar Pradesh", "Ghaziabad"), ("06", "Haryana", "Gurugram"),
+    ("08", "Rajasthan", "Jaipur"), ("24", "Gujarat", "Ahmedabad"), ("27", "Maharashtra", "Mumbai"),
+    ("03", "Punjab", "Ludhiana"), ("19", "West Bengal", "Kolkata"), ("33", "Tamil Nadu", "Chennai"),
+    ("29", "Karnataka", "Bengaluru"), ("36", "Telangana", "Hyderabad"), ("23", "Madhya Pradesh", "Indore"),
+]
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def products(rng):
+    # -> [(name, unit, base INR price)] in popularity order
+    items = [(f"{grade} {pack}", "Nos" if pack == "1 kg" else "KG", price * (1.15 if pack == "1 kg" else 1))
+             for grade, price in GRADES for pack in PACKS]
+    rng.shuffle(items)
+    return items
+
+
+def zipf_weights(n, s):
+    # cumulative, so rng.choices doesn't re-add them on every draw
+    return list(itertools.accumulate(1 / (rank + 1) ** s for rank in range(n)))
+
+
+def synthetic_buyers(rng, count):
+    # -> [(name, gstin, address, state, export)]; names stay unique
+    rows = []
+    seen = set()
+    while len(rows) < count:
+        name = f"{rng.choice(NAME_PREFIXES)} {rng.choice(NAME_CORES)} {rng.choice(NAME_SUFFIXES)}"
+        if name in seen:
+            name = f"{name} {len(rows)}"
+        seen.add(name)
+        code, state, city = rng.choice(STATES)
+        export = rng.random() < EXPORT_SHARE
+        if export or rng.random() < 0.1:
+            gstin = ""  # export / Unregistered
+        else:
+            pan = "".join(rng.choice(LETTERS) for _ in range(5)) + f"{rng.randrange(10000):04d}" + rng.choice(LETTERS)
+            gstin = f"{code}{pan}1Z{rng.choice(LETTERS + '0123456789')}"
+        address = f"{rng.randrange(1, 400)}, Industrial Area Phase {rng.randrange(1, 5)}, {city}"
+        rows.append((name, gstin, address, state, export))
+    return rows
+
+
+def order_days(rng, today, count):
+    # `count` order dates, oldest first
+    days = [today - timedelta(days=HISTORY_DAYS - 1 - i) for i in range(HISTORY_DAYS)]
+    weights = []
+    for i, day in enumerate(days):
+        weekday = [1.0, 1.0, 1.0, 1.0, 0.9, 0.5, 0.05][day.weekday()]
+        weights.append(weekday * (0.6 + 0.8 * i / HISTORY_DAYS))
+    return sorted(rng.choices(days, weights=weights, k=count))
+
+
+def line_counts(rng, target):
+    counts = []
+    total = 0
+    while total < target:
+        n = min(rng.choices([1, 2, 3, 4, 5, 6], weights=[30, 28, 18, 11, 8, 5])[0], target - total)
+        counts.append(n)
+        total += n
+    return counts
+
+
+def quantity(rng, unit):
+    if unit == "Nos":
+        return max(1, round(rng.lognormvariate(math.log(100), 0.8)))
+    return max(25, round(rng.lognormvariate(math.log(500), 0.9) / 25) * 25)
+
+
+def split(rng, qty, parts):
+    # `qty` in `parts` positive whole-number shipments
+    parts = min(parts, qty)
+    cuts = sorted(rng.sample(range(1, qty), parts - 1)) if parts > 1 else []
+    bounds = [0] + cuts + [qty]
+    return [b - a for a, b in zip(bounds, bounds[1:])]
+
+
+def shipment_times(rng, order_day, count, age, now):
+    # `count` ascending dispatch timestamps from the order date on
+    latest = min(age, 6)
+    stamps = []
+    for _ in range(count):
+        day = order_day + timedelta(days=min(latest, int(rng.expovariate(0.7))))
+        stamp = datetime.combine(day, datetime.min.time()) + timedelta(
+            hours=rng.randrange(9, 19), minutes=rng.randrange(60), seconds=rng.randrange(60))
+        stamps.append(min(stamp, now))
+    return [s.strftime("%Y-%m-%d %H:%M:%S") for s in sorted(stamps)]
+
+
+def dispatch_plan(rng, age):
+    # -> 'complete', 'partial' or 'pending' for an order `age` days old
+    if age > 7 and rng.random() < STUCK_SHARE:
+        return rng.choice(["partial", "pending"])
+    if rng.random() < 1 - math.exp(-age / 4):
+        return "complete"
+    return "partial" if rng.random() < (0.5 if age else 0.15) else "pending"
+
+
+def write_users(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("DROP TABLE IF EXISTS users")
+    conn.execute('''
+        CREATE TABLE users (
+            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash BLOB NOT NULL,
+            role TEXT NOT NULL,
+            full_name TEXT NOT NULL
+        )
+    ''')
+    conn.executemany(
+        "INSERT INTO users (username, password_hash, role, full_name) VALUES (?, ?, ?, ?)",
+        [(username, auth.hash_password(username, FIXTURE_BCRYPT_ROUNDS), role, full_name)
+         for username, role, full_name in USERS]
+    )
+    conn.commit()
+    conn.close()
+    auth.ensure_tables(path)
+
+
+def write_buyers(path, xlsx, rows):
+    pd.DataFrame(
+        [(name, address, state, gstin) for name, gstin, address, state, _ in rows],
+        columns=["Buyer Name", "Address", "State", "GSTIN/UIN"],
+    ).to_excel(xlsx, index=False, engine="openpyxl")
+    buyers.import_buyers(buyers.read_workbook(xlsx), path)
+
+
+def _flush(conn, orders, lines, events):
+    conn.executemany('''
+        INSERT INTO orders (order_id, created_by, customer_name, order_no, order_date, urgent_flag, address, gstin)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', orders)
+    conn.executemany('''
+        INSERT INTO order_products (
+            order_product_id, order_id, product_name, quantity, unit, price_inr, price_usd,
+            status, modified_by, modified_date
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, 'Original', ?, ?)
+    ''', lines)
+    conn.executemany('''
+        INSERT INTO dispatch_events (
+            order_product_id, order_id, product_name, quantity, unit, price_inr, price_usd,
+            dispatched_by, dispatched_at
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', events)
+    orders.clear()
+    lines.clear()
+    events.clear()
+
+
+def write_orders(path, rng, target_lines, customers, today):
+    # -> (orders, lines, events)
+    now = datetime.combine(today, datetime.min.time()) + CLOSE_OF_DAY
+    catalogue = products(rng)
+    product_weights = zipf_weights(len(catalogue), 1.1)
+    customer_weights = zipf_weights(len(customers), 1.0)
+    sales = [u for u, role, _ in USERS if role == "Sales"]
+    dispatchers = [u for u, role, _ in USERS if role == "Dispatch"]
+
+    counts = line_counts(rng, target_lines)
+    days = order_days(rng, today, len(counts))
+    totals = [len(counts), 0, 0]
+    orders, lines, events = [], [], []
+
+    with db.write_conn(path) as conn:
+        for name in rollups.TRIGGERS + fulfilment.TRIGGERS:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+        line_id = 0
+        for order_id, (count, day) in enumerate(zip(counts, days), start=1):
+            name, gstin, address, _, export = rng.choices(customers, cum_weights=customer_weights)[0]
+            created_by = rng.choices(sales, weights=SALES_WEIGHTS)[0]
+            order_date = day.isoformat()
+            entered = f"{order_date} {rng.randrange(9, 19):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}"
+            orders.append((order_id, created_by, name, f"ORD-{order_id:04d}", order_date,
+                           int(rng.random() < URGENT_SHARE), address, gstin))
+
+            picked = []
+            while len(picked) < count:
+                item = rng.choices(catalogue, cum_weights=product_weights)[0]
+                if item not in picked:
+                    picked.append(item)
+
+            age = (today - day).days
+            plan = dispatch_plan(rng, age)
+            partial_lines = set()
+            if plan == "partial":
+                partial_lines = {i for i in range(count) if rng.random() < 0.6} or {0}
+
+            for i, (product, unit, base) in enumerate(picked):
+                line_id += 1
+                qty = quantity(rng, unit)
+                price = round(base * rng.uniform(0.92, 1.08), 2)
+                price_inr, price_usd = (0.0, round(price / USD_RATE, 2)) if export else (price, 0.0)
+                lines.append((line_id, order_id, product, qty, unit, price_inr, price_usd, created_by, entered))
+
+                if plan == "complete":
+                    shipped = qty
+                elif i in partial_lines and qty > 1:
+                    shipped = max(1, int(qty * rng.uniform(0.2, 0.9)))
+                else:
+                    continue
+                parts = split(rng, shipped, rng.choices([1, 2, 3], weights=[70, 22, 8])[0])
+                dispatcher = rng.choices(dispatchers, weights=DISPATCH_WEIGHTS)[0]
+                for part, stamp in zip(parts, shipment_times(rng, day, len(parts), age, now)):
+                    events.append((line_id, order_id, product, part, unit, price_inr, price_usd, dispatcher, stamp))
+                    totals[2] += 1
+
+            if len(orders) >= FLUSH_ORDERS:
+                totals[1] += len(lines)
+                _flush(conn, orders, lines, events)
+        totals[1] += len(lines)
+        _flush(conn, orders, lines, events)
+
+        conn.execute("INSERT OR REPLACE INTO order_sequences (name, next_value) VALUES ('order_no', ?)",
+                     (len(counts) + 1,))
+        rollups.rebuild_rollups(conn, history=False)
+        fulfilment.rebuild(conn)
+        rollups.create_triggers(conn)
+        fulfilment.create_triggers(conn)
+    return tuple(totals)
+
+
+def read_info(out):
+    # -> {"scale", "seed", "as_of", "generated_at"} or {} (older fixtures)
+    path = os.path.join(out, FIXTURE_INFO)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def generate(scale="1k", seed=42, out=None, as_of=AS_OF):
+    # -> output directory
+    out = out or os.path.join("fixtures", scale)
+    orders_db = os.path.join(out, db.ORDERS_DB)
+    users_db = os.path.join(out, db.USERS_DB)
+    for path in (orders_db, db.archive_path(orders_db), users_db):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    os.makedirs(out, exist_ok=True)
+
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    migrate(orders_db)
+    customers = synthetic_buyers(rng, min(20_000, max(40, SCALES[scale] // 50)))
+    write_buyers(orders_db, os.path.join(out, buyers.BUYERS_XLSX), customers)
+    write_users(users_db)
+    orders, lines, events = write_orders(orders_db, rng, SCALES[scale], customers, as_of)
+    with db.write_conn(orders_db) as conn:
+        conn.execute("ANALYZE")
+    db.close_all()
+    with open(os.path.join(out, FIXTURE_INFO), "w") as f:
+        json.dump({"scale": scale, "seed": seed, "as_of": as_of.isoformat(),
+                   "generated_at": datetime.now().isoformat(timespec="seconds")}, f, indent=2)
+    print(f"✅ {out}: {orders} orders, {lines} lines, {events} dispatch events, "
+          f"{len(customers)} buyers in {time.perf_counter() - start:.1f}s (seed {seed}, as of {as_of}).")
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic orders.db / users.db / buyers.xlsx fixtures")
+    parser.add_argument("--scale", choices=SCALES, default="1k", help="order lines (default: 1k)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (default: 42)")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=AS_OF,
+                        help=f"the fixture's today, YYYY-MM-DD (default: {AS_OF})")
+    parser.add_argument("--out", help="output directory (default: fixtures/<scale>)")
+    args = parser.parse_args()
+    generate(args.scale, args.seed, args.out, args.as_of)
@@ -1,45 +1,96 @@
+import argparse
+import os
+import re
 import sqlite3
+import sys
 
-# Connect to orders.db (create if not exists)
-conn = sqlite3.connect("orders.db")
-c = conn.cursor()
-
-# Drop existing tables (optional, only for clean reset)
-c.execute("DROP TABLE IF EXISTS order_products")
-c.execute("DROP TABLE IF EXISTS orders")
-
-# Create orders table (with order_no!)
-c.execute('''
-    CREATE TABLE orders (
-        order_id INTEGER PRIMARY KEY AUTOINCREMENT,
-        created_by TEXT,
-        customer_name TEXT,
-        order_no TEXT,
-        order_date TEXT,
-        urgent_flag INTEGER,
-        address TEXT,
-        gstin TEXT
-    )
-''')
-
-# Create order_products table
-c.execute('''
-    CREATE TABLE order_products (
-        order_product_id INTEGER PRIMARY KEY AUTOINCREMENT,
-        order_id INTEGER,
-        product_name TEXT,
-        quantity INTEGER,
-        unit TEXT,
-        price_inr REAL,
-        price_usd REAL,
-        status TEXT,
-        modified_by TEXT,
-        modified_date TEXT,
-        FOREIGN KEY(order_id) REFERENCES orders(order_id)
-    )
-''')
-
-conn.commit()
-conn.close()
-
-print("✅ orders.db created successfully with correct schema.")
+import archive
+import db
+from migrations import migrate
+
+# Clean reset: remove orders.db (with its WAL / shared-memory files) instead
+# of dropping tables one by one, so no trigger, view, rollup or
+# dispatch_events row of a later migration survives into the new schema.
+# orders_archive.db holds the only copy of archived orders (archive.py) and
+# is kept unless asked for. Refuses to run while the app (or anything else)
+# has the database open. With the archive kept, new ids and order numbers
+# carry on after the archived ones, so later archive runs and the all_*
+# history views never see two orders with the same id or number.
+#
+#   python init_orders_db.py                      # orders.db only
+#   python init_orders_db.py --include-archive    # ...and orders_archive.db (asks first)
+
+
+def in_use(path):
+    # Every open WAL connection (the app's pooled ones included) holds a
+    # shared lock, so an exclusive one is refused while any is open
+    if not os.path.exists(path):
+        return False
+    conn = sqlite3.connect(path, timeout=0, isolation_level=None)
+    try:
+        conn.execute("PRAGMA locking_mode = EXCLUSIVE")
+        conn.execute("BEGIN EXCLUSIVE")
+        conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        conn.execute("ROLLBACK")
+        return False
+    except sqlite3.OperationalError as e:
+        if e.sqlite_errorcode != sqlite3.SQLITE_BUSY:
+            raise
+        return True
+    finally:
+        conn.close()
+
+
+def continue_after_archive(path):
+    with db.write_conn(path) as conn:
+        for table, key in archive.TABLES.items():
+            last = conn.execute(f"SELECT MAX({key}) FROM archive.{table}").fetchone()[0]
+            if last:
+                conn.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table,))
+                conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, last))
+        last = 0
+        for (order_no,) in conn.execute("SELECT order_no FROM archive.orders WHERE order_no IS NOT NULL"):
+            match = re.search(r"(\d+)$", order_no)
+            if match:
+                last = max(last, int(match.group(1)))
+        conn.execute("UPDATE order_sequences SET next_value = MAX(next_value, ?) WHERE name = 'order_no'",
+                     (last + 1,))
+    db.close_all()
+
+
+def remove(path):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recreate an empty orders.db")
+    parser.add_argument("--include-archive", action="store_true",
+                        help="also delete orders_archive.db (archived order history)")
+    args = parser.parse_args()
+
+    archive_file = db.archive_path(db.ORDERS_DB)
+    paths = [db.ORDERS_DB] + ([archive_file] if args.include_archive else [])
+    busy = [path for path in paths if in_use(path)]
+    if busy:
+        print(f"❌ {', '.join(busy)} is open in another process (is the app running?). Stop it and try again.")
+        sys.exit(1)
+
+    if args.include_archive and os.path.exists(archive_file):
+        answer = input(f"⚠️ {archive_file} is the only copy of archived orders. Type 'yes' to delete it: ")
+        if answer.strip().lower() != "yes":
+            print("❌ Reset cancelled.")
+            sys.exit(1)
+    elif os.path.exists(archive_file):
+        print(f"ℹ️ {archive_file} kept (use --include-archive to delete it too).")
+
+    for path in paths:
+        remove(path)
+
+    # Create the schema (tables, indexes) through the migration runner
+    migrate(db.ORDERS_DB, verbose=True)
+    if os.path.exists(archive_file):
+        continue_after_archive(db.ORDERS_DB)
+
+    print("✅ orders.db created successfully with correct schema.")
@@ -0,0 +1,148 @@
+import argparse
+import os
+import smtplib
+import ssl
+import time
+from email.mime.application import MIMEApplication
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+# --- Outgoing mail ---
+# One Mailer keeps a single authenticated SMTP connection open and sends
+# every message of a run through it. A send that fails on a dropped
+# connection, a network error or a temporary (4xx) reply is retried on a
+# fresh connection after 1, 2, 4... seconds; permanent errors (bad login,
+# 5xx) are raised straight away.
+#
+# Server settings come from the environment, so a local stand-in can be
+# used instead of Gmail:
+#   SMTP_HOST (smtp.gmail.com)  SMTP_PORT (587)  SMTP_STARTTLS (1)
+#   EMAIL_USER / EMAIL_PASS (no login if EMAIL_USER is empty)
+#
+#   python -m aiosmtpd -n -l localhost:8025           # prints received mail
+#   SMTP_HOST=localhost SMTP_PORT=8025 SMTP_STARTTLS=0 \
+#       python mailer.py --to someone@example.com      # send a test message
+
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") != "0"
+SMTP_TIMEOUT_S = 30
+
+RETRIES = 4
+RETRY_BASE_S = 1.0
+
+
+def message(sender, recipients, subject, body, attachments=()):
+    # `recipients` is one address or a list; `attachments` are file paths
+    if isinstance(recipients, str):
+        recipients = [recipients]
+    msg = MIMEMultipart()
+    msg['From'] = sender
+    msg['To'] = ", ".join(recipients)
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'plain'))
+    for path in attachments:
+        name = os.path.basename(path)
+        with open(path, "rb") as f:
+            part = MIMEApplication(f.read(), Name=name)
+        part['Content-Disposition'] = f'attachment; filename="{name}"'
+        msg.attach(part)
+    return msg
+
+
+def _transient(error):
+    # Whether the message may go through on a new connection
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        # every recipient refused; retry only if all refusals were temporary
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, (smtplib.SMTPException, ssl.SSLCertVerificationError)):
+        return False
+    # refused / reset connections, timeouts, DNS failures
+    return isinstance(error, OSError)
+
+
+class Mailer:
+
+    def __init__(self, user=None, password=None, host=None, port=None, starttls=None,
+                 retries=RETRIES, retry_base=RETRY_BASE_S):
+        self.user = os.getenv("EMAIL_USER") if user is None else user
+        self.password = os.getenv("EMAIL_PASS") if password is None else password
+        self.host = host or SMTP_HOST
+        self.port = port or SMTP_PORT
+        self.starttls = SMTP_STARTTLS if starttls is None else starttls
+        self.retries = retries
+        self.retry_base = retry_base
+        self._smtp = None
+        self.connections = 0
+        self.sent = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _connect(self):
+        smtp = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT_S)
+        try:
+            if self.starttls:
+                smtp.starttls(context=ssl.create_default_context())
+            if self.user:
+                smtp.login(self.user, self.password or "")
+        except BaseException:
+            smtp.close()
+            raise
+        self.connections += 1
+        return smtp
+
+    def _drop(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                self._smtp.close()
+            self._smtp = None
+
+    def send(self, msg):
+        # Returns the refused recipients ({} when all were accepted), like
+        # smtplib's send_message
+        attempt = 0
+        while True:
+            reused = self._smtp is not None
+            try:
+                if self._smtp is None:
+                    self._smtp = self._connect()
+                refused = self._smtp.send_message(msg)
+                self.sent += 1
+                return refused
+            except Exception as e:
+                self._drop()
+                if reused and isinstance(e, smtplib.SMTPServerDisconnected):
+                    # the server closed the idle connection: reconnect, no wait
+                    continue
+                if attempt >= self.retries or not _transient(e):
+                    raise
+                delay = self.retry_base * 2 ** attempt
+                print(f"⚠️ Send failed ({e.__class__.__name__}: {e}); retrying in {delay:.0f}s")
+                time.sleep(delay)
+                attempt += 1
+
+    def close(self):
+        self._drop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Send a test message with the configured SMTP settings")
+    parser.add_argument("--to", required=True, nargs="+")
+    parser.add_argument("--attach", nargs="*", default=[])
+    args = parser.parse_args()
+
+    with Mailer() as mailer:
+        sender = mailer.user or "order-management@localhost"
+        for recipient in args.to:
+            mailer.send(message(sender, recipient, "Test message", "Mail settings work.", args.attach))
+        print(f"✅ Sent {mailer.sent} message(s) to {mailer.host}:{mailer.port} over {mailer.connections} connection(s)")
@@ -0,0 +1,257 @@
+import functools
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import db
+
+# --- Operational metrics (Prometheus text format) ---
+# A process-wide registry of page renders (every Streamlit rerun of a page
+# function), page errors and login attempts, each render / login timed with
+# perf_counter into a histogram. Exported in the Prometheus text format:
+#   - to METRICS_FILE (default metrics/oms.prom), rewritten at most every
+#     FILE_INTERVAL seconds after a render, for node_exporter's textfile
+#     collector; METRICS_FILE= (empty) turns it off
+#   - on http://127.0.0.1:METRICS_PORT/metrics when METRICS_PORT is set
+#
+#   @metrics.timed_page("dispatch_page")
+#   def dispatch_page(admin_view=False): ...
+#
+# Series (page = the page function's name):
+#   oms_page_renders_total{page}                     counter
+#   oms_page_errors_total{page}                      counter
+#   oms_page_render_seconds{page}                    histogram (buckets)
+#   oms_page_render_recent_seconds{page,quantile}    p50/p95/p99 of the
+#                                                    last RECENT_SAMPLES renders
+#                                                    (_sum / _count: all renders)
+#   oms_login_attempts_total{result}                 counter (success / failure)
+#   oms_login_seconds / oms_login_recent_seconds     as for renders
+#   oms_page_sql_queries_total{page}, oms_page_sql_seconds_total{page}
+#                                                    from sqltrace.py
+#   oms_db_size_bytes{db}                            orders / archive / users,
+#                                                    WAL included
+#   oms_querycache_*                                 querycache.stats()
+#
+# e.g. alert when the Dispatch page gets slow while trucks are loading:
+#   histogram_quantile(0.95, sum by (le) (rate(
+#       oms_page_render_seconds_bucket{page="dispatch_page"}[5m]))) > 2
+
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUANTILES = (0.5, 0.95, 0.99)
+RECENT_SAMPLES = 1024
+METRICS_FILE = os.getenv("METRICS_FILE", os.path.join("metrics", "oms.prom"))
+FILE_INTERVAL = 5.0
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# Streamlit control flow (st.rerun / st.stop) raises these; not page errors
+_CONTROL_FLOW = ("RerunException", "StopException")
+
+
+class Histogram:
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def quantiles(self):
+        ordered = sorted(self.recent)
+        if not ordered:
+            return [(q, float("nan")) for q in QUANTILES]
+        return [(q, ordered[min(len(ordered) - 1, int(q * len(ordered)))]) for q in QUANTILES]
+
+
+_renders = {}   # page -> Histogram
+_errors = {}    # page -> count
+_logins = {"success": 0, "failure": 0}
+_login_seconds = Histogram()
+_lock = threading.Lock()
+_last_write = 0.0
+
+
+def observe_render(page, seconds, error=False):
+    with _lock:
+        histogram = _renders.get(page)
+        if histogram is None:
+            histogram = _renders[page] = Histogram()
+        histogram.observe(seconds)
+        if error:
+            _errors[page] = _errors.get(page, 0) + 1
+    _maybe_write_file()
+
+
+def observe_login(seconds, success):
+    with _lock:
+        _logins["success" if success else "failure"] += 1
+        _login_seconds.observe(seconds)
+
+
+def timed_page(page):
+    # Counts and times every run of the decorated page function
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            error = False
+            try:
+                return fn(*args, **kwargs)
+            except BaseException as e:
+                error = type(e).__name__ not in _CONTROL_FLOW
+                raise
+            finally:
+                observe_render(page, time.perf_counter() - started, error)
+        return wrapper
+    return decorate
+
+
+# --- Exposition ---
+
+def _labels(**labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+def _histogram_lines(name, histogram, **labels):
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f"{name}_bucket{_labels(**labels, le=f'{bound:g}')} {cumulative}")
+    lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {histogram.count}")
+    lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum:.6f}")
+    lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+    return lines
+
+
+def _quantile_lines(name, histogram, **labels):
+    lines = [f"{name}{_labels(**labels, quantile=f'{q:g}')} {'NaN' if value != value else f'{value:.6f}'}"
+             for q, value in histogram.quantiles()]
+    # _sum / _count are lifetime totals (counters), like the histogram's
+    lines.append(f"{name}_sum{_labels(**labels)} {histogram.sum:.6f}")
+    lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+    return lines
+
+
+def _db_bytes(path):
+    return sum(os.path.getsize(path + suffix) for suffix in ("", "-wal") if os.path.exists(path + suffix))
+
+
+def render_text():
+    import querycache
+    import sqltrace
+
+    out = []
+
+    def metric(name, kind, help_text, lines):
+        out.append(f"# HELP {name} {help_text}")
+        out.append(f"# TYPE {name} {kind}")
+        out.extend(lines)
+
+    with _lock:
+        renders = sorted(_renders.items())
+        metric("oms_page_renders_total", "counter", "Page function runs (Streamlit reruns).",
+               [f"oms_page_renders_total{_labels(page=p)} {h.count}" for p, h in renders])
+        metric("oms_page_errors_total", "counter", "Page runs that raised an exception.",
+               [f"oms_page_errors_total{_labels(page=p)} {_errors.get(p, 0)}" for p, _ in renders])
+        metric("oms_page_render_seconds", "histogram", "Page render time.",
+               [line for p, h in renders for line in _histogram_lines("oms_page_render_seconds", h, page=p)])
+        metric("oms_page_render_recent_seconds", "summary",
+               f"Page render time over the last {RECENT_SAMPLES} renders.",
+               [line for p, h in renders for line in _quantile_lines("oms_page_render_recent_seconds", h, page=p)])
+        metric("oms_login_attempts_total", "counter", "Login form submissions.",
+               [f"oms_login_attempts_total{_labels(result=r)} {n}" for r, n in sorted(_logins.items())])
+        metric("oms_login_seconds", "histogram", "Login check time (user lookup + bcrypt).",
+               _histogram_lines("oms_login_seconds", _login_seconds))
+        metric("oms_login_recent_seconds", "summary", f"Login check time over the last {RECENT_SAMPLES} logins.",
+               _quantile_lines("oms_login_recent_seconds", _login_seconds))
+
+    traced = sorted(sqltrace.pages().items())
+    metric("oms_page_sql_queries_total", "counter", "SQL queries issued by page renders (sqltrace).",
+           [f"oms_page_sql_queries_total{_labels(page=p)} {t.executions}" for p, t in traced])
+    metric("oms_page_sql_seconds_total", "counter", "Time spent in SQL by page renders (sqltrace).",
+           [f"oms_page_sql_seconds_total{_labels(page=p)} {t.sql_seconds:.6f}" for p, t in traced])
+
+    sizes = [("orders", db.ORDERS_DB), ("archive", db.archive_path(db.ORDERS_DB)), ("users", db.USERS_DB)]
+    metric("oms_db_size_bytes", "gauge", "Database file size including its WAL.",
+           [f"oms_db_size_bytes{_labels(db=name)} {_db_bytes(path)}" for name, path in sizes if os.path.exists(path)])
+
+    cache = querycache.stats()
+    metric("oms_querycache_hits_total", "counter", "Read query cache hits.", [f"oms_querycache_hits_total {cache['hits']}"])
+    metric("oms_querycache_misses_total", "counter", "Read query cache misses.",
+           [f"oms_querycache_misses_total {cache['misses']}"])
+    metric("oms_querycache_bytes", "gauge", "Approximate size of cached results.",
+           [f"oms_querycache_bytes {cache['bytes']}"])
+    return "\n".join(out) + "\n"
+
+
+def write_file(path=None):
+    path = path or METRICS_FILE
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    # the collector must never read a half-written file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(render_text())
+    os.replace(tmp, path)
+
+
+def _maybe_write_file():
+    global _last_write
+    if not METRICS_FILE:
+        return
+    now = time.monotonic()
+    with _lock:
+        if now - _last_write < FILE_INTERVAL:
+            return
+        _last_write = now
+    try:
+        write_file()
+    except OSError:
+        pass  # read-only checkout: the endpoint (if any) still works
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port=None):
+    # Starts the /metrics endpoint on localhost in a daemon thread; -> server
+    # (None when no port is configured)
+    port = port or METRICS_PORT
+    if not port:
+        return None
+    try:
+        server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+    except OSError as e:
+        print(f"⚠️ Metrics endpoint not started on port {port}: {e}")
+        return None
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
@@ -0,0 +1,591 @@
+import argparse
+import re
+from datetime import datetime
+
+import db
+import fulfilment
+import rollups
+
+# --- Versioned schema migrations for orders.db ---
+# Each migration runs once, in order, inside its own write transaction and
+# is recorded in schema_version. Migrations are written to be safe on
+# databases that were created by the old init/fix scripts.
+#
+#   python migrations.py            # apply pending migrations
+#   python migrations.py --status   # show applied / pending versions
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _m001_base_schema(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS orders (
+            order_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            created_by TEXT,
+            customer_name TEXT,
+            order_no TEXT,
+            order_date TEXT,
+            urgent_flag INTEGER,
+            address TEXT,
+            gstin TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS order_products (
+            order_product_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id INTEGER,
+            product_name TEXT,
+            quantity INTEGER,
+            unit TEXT,
+            price_inr REAL,
+            price_usd REAL,
+            status TEXT,
+            modified_by TEXT,
+            modified_date TEXT,
+            FOREIGN KEY(order_id) REFERENCES orders(order_id)
+        )
+    ''')
+
+
+def _m002_edit_count(conn):
+    if "edit_count" not in _columns(conn, "order_products"):
+        conn.execute("ALTER TABLE order_products ADD COLUMN edit_count INTEGER DEFAULT 0")
+
+
+def _m003_hot_path_indexes(conn):
+    # dispatch_page balances: per order, grouped by product/unit, summed by status
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_order_products_order
+        ON order_products(order_id, status, product_name, unit, quantity, price_inr, price_usd)
+    ''')
+    # reports_page demand queries: status filter, grouped by product
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_order_products_status_product
+        ON order_products(status, product_name, quantity, price_inr)
+    ''')
+    # generate_dispatch_pdf: dispatched rows by modification date
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_order_products_status_modified
+        ON order_products(status, modified_date)
+    ''')
+    # sales_page "My Orders": per salesperson, newest first
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_orders_created_by_date
+        ON orders(created_by, order_date, order_id)
+    ''')
+    # dispatch_page listing: all orders, newest first
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_orders_order_date
+        ON orders(order_date, order_id)
+    ''')
+
+
+def _m004_unique_order_no(conn):
+    # Concurrent order entry could hand out the same ORD-NNNN twice. Keep the
+    # first order with each number and suffix the later ones with their id
+    # so the unique index can be built.
+    dupes = conn.execute('''
+        SELECT o.order_id, o.order_no
+        FROM orders o
+        JOIN (
+            SELECT order_no, MIN(order_id) AS keep_id
+            FROM orders
+            WHERE order_no IS NOT NULL
+            GROUP BY order_no
+            HAVING COUNT(*) > 1
+        ) d ON d.order_no = o.order_no
+        WHERE o.order_id > d.keep_id
+        ORDER BY o.order_id
+    ''').fetchall()
+    for order_id, order_no in dupes:
+        new_no = f"{order_no}-{order_id}"
+        conn.execute("UPDATE orders SET order_no = ? WHERE order_id = ?", (new_no, order_id))
+        print(f"⚠️ Duplicate order number {order_no} on order {order_id} renamed to {new_no}")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_orders_order_no ON orders(order_no)")
+
+
+def _m005_order_sequence(conn):
+    # Order numbers are handed out from this table inside the insert
+    # transaction (see order_service.py). Seed it past the highest
+    # ORD-NNNN already used.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS order_sequences (
+            name TEXT PRIMARY KEY,
+            next_value INTEGER NOT NULL
+        )
+    ''')
+    last = 0
+    for (order_no,) in conn.execute("SELECT order_no FROM orders WHERE order_no IS NOT NULL"):
+        match = re.search(r"(\d+)$", order_no)
+        if match:
+            last = max(last, int(match.group(1)))
+    conn.execute(
+        "INSERT OR IGNORE INTO order_sequences (name, next_value) VALUES ('order_no', ?)",
+        (last + 1,)
+    )
+
+
+def _m006_report_rollups(conn):
+    rollups.create_tables(conn)
+    rollups.create_triggers(conn)
+    rollups.rebuild_rollups(conn)
+
+
+def _m007_dispatch_views(conn):
+    # Dispatch value = dispatched qty x price on the most recent Original
+    # line of the same (order, product).
+    # v_dispatch_summary (whole history): dispatches are grouped first and
+    # joined to v_original_price, which resolves each price once per group
+    # (SQLite takes the bare price_inr from the MAX(order_product_id) row).
+    # v_dispatch_lines (one row per dispatch, used with a date filter by the
+    # PDF job): a per-row MAX(order_product_id) lookup, which is a short
+    # range seek on idx_order_products_status_order.
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_order_products_status_order
+        ON order_products(status, order_id, product_name, quantity, price_inr)
+    ''')
+    conn.execute("DROP VIEW IF EXISTS v_dispatch_summary")
+    conn.execute("DROP VIEW IF EXISTS v_dispatch_lines")
+    conn.execute("DROP VIEW IF EXISTS v_original_price")
+    conn.execute('''
+        CREATE VIEW v_original_price AS
+        SELECT order_id, product_name, price_inr, MAX(order_product_id) AS order_product_id
+        FROM order_products
+        WHERE status = 'Original'
+        GROUP BY order_id, product_name
+    ''')
+    conn.execute('''
+        CREATE VIEW v_dispatch_lines AS
+        SELECT dp.order_product_id, dp.order_id, o.order_no, o.customer_name,
+               dp.product_name, dp.quantity, dp.unit, dp.status,
+               dp.modified_by, dp.modified_date,
+               p.price_inr AS original_price_inr,
+               dp.quantity * IFNULL(p.price_inr, 0) AS amount_inr
+        FROM order_products dp
+        JOIN orders o ON o.order_id = dp.order_id
+        LEFT JOIN order_products p ON p.order_product_id = (
+            SELECT MAX(op.order_product_id) FROM order_products op
+            WHERE op.status = 'Original'
+              AND op.order_id = dp.order_id
+              AND op.product_name = dp.product_name
+        )
+        WHERE dp.status = 'Dispatched'
+    ''')
+    conn.execute('''
+        CREATE VIEW v_dispatch_summary AS
+        WITH dispatched AS (
+            SELECT order_id, product_name, SUM(quantity) AS qty
+            FROM order_products
+            WHERE status = 'Dispatched'
+            GROUP BY order_id, product_name
+        )
+        SELECT d.order_id, o.customer_name, d.product_name,
+               d.qty AS dispatched_kg,
+               d.qty * IFNULL(op.price_inr, 0) AS total_amount
+        FROM dispatched d
+        JOIN orders o ON o.order_id = d.order_id
+        LEFT JOIN v_original_price op
+               ON op.order_id = d.order_id AND op.product_name = d.product_name
+    ''')
+
+
+def _m008_buyers(conn):
+    # Buyer master imported from buyers.xlsx (see buyers.py), searchable
+    # through an external-content FTS5 index kept in sync by triggers.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS buyers (
+            buyer_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            gstin TEXT NOT NULL DEFAULT '',
+            address TEXT,
+            state TEXT,
+            updated_at TEXT,
+            UNIQUE (gstin, name)
+        )
+    ''')
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS buyers_fts USING fts5(
+            name, gstin, address,
+            content='buyers', content_rowid='buyer_id',
+            tokenize="unicode61 tokenchars '/-'"
+        )
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_buyers_fts_insert AFTER INSERT ON buyers BEGIN
+            INSERT INTO buyers_fts (rowid, name, gstin, address)
+            VALUES (NEW.buyer_id, NEW.name, NEW.gstin, NEW.address);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_buyers_fts_delete AFTER DELETE ON buyers BEGIN
+            INSERT INTO buyers_fts (buyers_fts, rowid, name, gstin, address)
+            VALUES ('delete', OLD.buyer_id, OLD.name, OLD.gstin, OLD.address);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_buyers_fts_update AFTER UPDATE ON buyers BEGIN
+            INSERT INTO buyers_fts (buyers_fts, rowid, name, gstin, address)
+            VALUES ('delete', OLD.buyer_id, OLD.name, OLD.gstin, OLD.address);
+            INSERT INTO buyers_fts (rowid, name, gstin, address)
+            VALUES (NEW.buyer_id, NEW.name, NEW.gstin, NEW.address);
+        END
+    ''')
+
+
+def _m009_rollup_insert_trigger(conn):
+    # Reinstall the rollup triggers: the insert trigger now takes the price
+    # from the new row instead of searching for the latest Original line.
+    rollups.create_triggers(conn)
+
+
+def _m010_dispatch_timestamps(conn):
+    # Dispatch lines were inserted without modified_by/modified_date, so the
+    # date-filtered reports never saw them (order_service now fills both on
+    # every insert). Rollup updates are limited to the columns they read
+    # first, so the backfill below doesn't re-run the rollup triggers.
+    rollups.create_triggers(conn)
+    # One sortable text format, 'YYYY-MM-DD HH:MM:SS' (some rows carry
+    # str(datetime.now()) microseconds or an ISO 'T')
+    conn.execute('''
+        UPDATE order_products
+        SET modified_date = SUBSTR(REPLACE(modified_date, 'T', ' '), 1, 19)
+        WHERE modified_date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9][ T]*'
+          AND modified_date <> SUBSTR(REPLACE(modified_date, 'T', ' '), 1, 19)
+    ''')
+    # Historical dispatches without a time: the order date is the only date
+    # on record (and the earliest the dispatch can have happened)
+    backfilled = conn.execute('''
+        UPDATE order_products
+        SET modified_date = (
+            SELECT SUBSTR(o.order_date, 1, 10) || ' 00:00:00' FROM orders o
+            WHERE o.order_id = order_products.order_id
+        )
+        WHERE status = 'Dispatched' AND modified_date IS NULL
+          AND order_id IN (
+              SELECT order_id FROM orders
+              WHERE order_date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*'
+          )
+    ''').rowcount
+    if backfilled:
+        print(f"⚠️ {backfilled} dispatch lines had no dispatch time; dated to their order date")
+    # Reports filter status = 'Dispatched' AND modified_date in [from, to)
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_order_products_status_modified
+        ON order_products(status, modified_date)
+    ''')
+
+
+def _m011_dispatch_events(conn):
+    # Dispatches move out of order_products into an append-only ledger.
+    # Each event points at the order line it dispatches against, and the
+    # line keeps a running dispatched_qty (maintained by the triggers
+    # below, in the inserting transaction), so an open balance is
+    # quantity - dispatched_qty on one row.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS dispatch_events (
+            event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_product_id INTEGER NOT NULL
+                REFERENCES order_products(order_product_id) ON DELETE CASCADE,
+            order_id INTEGER NOT NULL,
+            product_name TEXT,
+            quantity REAL NOT NULL,
+            unit TEXT,
+            price_inr REAL,
+            price_usd REAL,
+            dispatched_by TEXT,
+            dispatched_at TEXT
+        )
+    ''')
+    # Date-range reports, per-line history (and the foreign key check on
+    # order_products deletes), order deletes
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_dispatch_events_at ON dispatch_events(dispatched_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_dispatch_events_line ON dispatch_events(order_product_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_dispatch_events_order ON dispatch_events(order_id)")
+    if "dispatched_qty" not in _columns(conn, "order_products"):
+        conn.execute("ALTER TABLE order_products ADD COLUMN dispatched_qty REAL NOT NULL DEFAULT 0")
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_dispatch_events_no_update BEFORE UPDATE ON dispatch_events
+        BEGIN SELECT RAISE(ABORT, 'dispatch_events is append-only'); END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_dispatch_events_insert AFTER INSERT ON dispatch_events BEGIN
+            UPDATE order_products SET dispatched_qty = dispatched_qty + NEW.quantity
+            WHERE order_product_id = NEW.order_product_id;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_dispatch_events_delete AFTER DELETE ON dispatch_events BEGIN
+            UPDATE order_products SET dispatched_qty = dispatched_qty - OLD.quantity
+            WHERE order_product_id = OLD.order_product_id;
+        END
+    ''')
+
+    # Existing Dispatched rows become one event each, against the first
+    # Original line of the same (order, product) that still has an open
+    # balance (else the first such line). A dispatch of a product the order
+    # never had gets a zero-quantity Original line to point at. The rollup
+    # triggers are off for the move and the rollups rebuilt after it.
+    for name in rollups.TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    # Foreign keys were not enforced until db.PRAGMAS, so a Dispatched
+    # row can belong to an order that no longer exists. It has no line to
+    # point an event at (and a placeholder line would break the foreign
+    # key), so it is set aside unchanged in orphan_dispatched_lines.
+    orphan = "status = 'Dispatched' AND NOT EXISTS (SELECT 1 FROM orders o WHERE o.order_id = order_products.order_id)"
+    conn.execute("CREATE TABLE IF NOT EXISTS orphan_dispatched_lines AS SELECT * FROM order_products WHERE 0")
+    orphans = conn.execute(f"INSERT INTO orphan_dispatched_lines SELECT * FROM order_products WHERE {orphan}").rowcount
+    conn.execute(f"DELETE FROM order_products WHERE {orphan}")
+    dispatched = conn.execute('''
+        SELECT order_product_id, order_id, product_name, quantity, unit, price_inr, price_usd,
+               modified_by, modified_date
+        FROM order_products
+        WHERE status = 'Dispatched'
+        ORDER BY order_product_id
+    ''').fetchall()
+    placeholders = 0
+    for _, order_id, product, qty, unit, price_inr, price_usd, by, at in dispatched:
+        line = conn.execute('''
+            SELECT order_product_id FROM order_products
+            WHERE order_id = ? AND product_name IS ? AND status = 'Original'
+            ORDER BY IFNULL(quantity, 0) <= dispatched_qty, order_product_id
+            LIMIT 1
+        ''', (order_id, product)).fetchone()
+        if line is None:
+            line = (conn.execute('''
+                INSERT INTO order_products (order_id, product_name, quantity, unit, price_inr, price_usd,
+                                            status, modified_by, modified_date)
+                VALUES (?, ?, 0, ?, ?, ?, 'Original', ?, ?)
+            ''', (order_id, product, unit, price_inr, price_usd, by, at)).lastrowid,)
+            placeholders += 1
+        conn.execute('''
+            INSERT INTO dispatch_events (order_product_id, order_id, product_name, quantity, unit,
+                                         price_inr, price_usd, dispatched_by, dispatched_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (line[0], order_id, product, qty or 0, unit, price_inr, price_usd, by, at))
+    conn.execute("DELETE FROM order_products WHERE status = 'Dispatched'")
+    if dispatched:
+        print(f"✅ {len(dispatched)} dispatch lines moved to dispatch_events")
+    if placeholders:
+        print(f"⚠️ {placeholders} dispatched products were not on their order; added as zero-quantity lines")
+    if orphans:
+        print(f"⚠️ {orphans} dispatch lines of missing orders set aside in orphan_dispatched_lines")
+    rollups.create_triggers(conn)
+    rollups.rebuild_rollups(conn)
+
+    conn.execute("DROP INDEX IF EXISTS idx_order_products_status_modified")
+    # dispatch_page balances now read dispatched_qty off the Original lines
+    conn.execute("DROP INDEX IF EXISTS idx_order_products_order")
+    conn.execute('''
+        CREATE INDEX idx_order_products_order
+        ON order_products(order_id, status, product_name, unit, quantity, dispatched_qty, price_inr, price_usd)
+    ''')
+
+    # Same view names and shapes as migration 007, now over the ledger; the
+    # value of a dispatch is its quantity x the price of its order line.
+    conn.execute("DROP VIEW IF EXISTS v_dispatch_summary")
+    conn.execute("DROP VIEW IF EXISTS v_dispatch_lines")
+    conn.execute("DROP VIEW IF EXISTS v_original_price")
+    conn.execute('''
+        CREATE VIEW v_dispatch_lines AS
+        SELECT e.event_id, e.order_product_id, e.order_id, o.order_no, o.customer_name,
+               e.product_name, e.quantity, e.unit,
+               e.dispatched_by, e.dispatched_at,
+               p.price_inr AS original_price_inr,
+               e.quantity * IFNULL(p.price_inr, 0) AS amount_inr
+        FROM dispatch_events e
+        JOIN orders o ON o.order_id = e.order_id
+        JOIN order_products p ON p.order_product_id = e.order_product_id
+    ''')
+    conn.execute('''
+        CREATE VIEW v_dispatch_summary AS
+        SELECT e.order_id, o.customer_name, e.product_name,
+               SUM(e.quantity) AS dispatched_kg,
+               SUM(e.quantity * IFNULL(p.price_inr, 0)) AS total_amount
+        FROM dispatch_events e
+        JOIN orders o ON o.order_id = e.order_id
+        JOIN order_products p ON p.order_product_id = e.order_product_id
+        GROUP BY e.order_id, e.product_name
+    ''')
+
+
+def _m012_order_fulfilment(conn):
+    # Fulfilment totals and status on each order, kept by triggers (see
+    # fulfilment.py), so open orders are an index range scan instead of a
+    # per-order aggregate over its lines.
+    columns = _columns(conn, "orders")
+    for name, decl in [
+        ("fulfilment_status", "TEXT NOT NULL DEFAULT 'pending'"),
+        ("ordered_qty", "REAL NOT NULL DEFAULT 0"),
+        ("dispatched_qty", "REAL NOT NULL DEFAULT 0"),
+        ("last_dispatch_at", "TEXT"),
+    ]:
+        if name not in columns:
+            conn.execute(f"ALTER TABLE orders ADD COLUMN {name} {decl}")
+    fulfilment.create_triggers(conn)
+    fulfilment.rebuild(conn)
+    # dispatch queue (open orders, newest first), Reports, PDF --open
+    conn.execute(f'''
+        CREATE INDEX IF NOT EXISTS idx_orders_open
+        ON orders(order_date, order_id) WHERE {fulfilment.OPEN}
+    ''')
+
+
+def _m013_dispatch_view_prices(conn):
+    # Back to migration 007's pricing rule, over the ledger: a dispatch is
+    # valued at the price on the most recent Original line of its (order,
+    # product), the same price rollup_order_product.original_price_inr holds
+    # for Reports, not at the price of the line it was allocated to (which
+    # differs when an order repeats a product at another price).
+    conn.execute("DROP VIEW IF EXISTS v_dispatch_summary")
+    conn.execute("DROP VIEW IF EXISTS v_dispatch_lines")
+    conn.execute("DROP VIEW IF EXISTS v_original_price")
+    conn.execute('''
+        CREATE VIEW v_original_price AS
+        SELECT order_id, product_name, price_inr, MAX(order_product_id) AS order_product_id
+        FROM order_products
+        WHERE status = 'Original'
+        GROUP BY order_id, product_name
+    ''')
+    # per-row MAX(order_product_id): a short seek on idx_order_products_order
+    conn.execute('''
+        CREATE VIEW v_dispatch_lines AS
+        SELECT e.event_id, e.order_product_id, e.order_id, o.order_no, o.customer_name,
+               e.product_name, e.quantity, e.unit,
+               e.dispatched_by, e.dispatched_at,
+               p.price_inr AS original_price_inr,
+               e.quantity * IFNULL(p.price_inr, 0) AS amount_inr
+        FROM dispatch_events e
+        JOIN orders o ON o.order_id = e.order_id
+        LEFT JOIN order_products p ON p.order_product_id = (
+            SELECT MAX(op.order_product_id) FROM order_products op
+            WHERE op.order_id = e.order_id
+              AND op.status = 'Original'
+              AND op.product_name = e.product_name
+        )
+    ''')
+    # whole history: events grouped first, the price resolved once per group
+    conn.execute('''
+        CREATE VIEW v_dispatch_summary AS
+        WITH dispatched AS (
+            SELECT order_id, product_name, SUM(quantity) AS qty
+            FROM dispatch_events
+            GROUP BY order_id, product_name
+        )
+        SELECT d.order_id, o.customer_name, d.product_name,
+               d.qty AS dispatched_kg,
+               d.qty * IFNULL(op.price_inr, 0) AS total_amount
+        FROM dispatched d
+        JOIN orders o ON o.order_id = d.order_id
+        LEFT JOIN v_original_price op
+               ON op.order_id = d.order_id AND op.product_name = d.product_name
+    ''')
+    # orders_archive.db keeps its own copy of v_dispatch_lines
+    if conn.execute("SELECT 1 FROM pragma_database_list WHERE name = 'archive'").fetchone():
+        import archive  # archive imports this module
+
+        archive.sync_schema(conn)
+
+
+def _m014_order_date_nulls(conn):
+    # Orders without an order_date sort as '' (after every dated order, newest
+    # first): the listings page on IFNULL(order_date, '') so a NULL date no
+    # longer ends keyset pagination early, and the indexes follow suit
+    conn.execute("DROP INDEX IF EXISTS idx_orders_created_by_date")
+    conn.execute("DROP INDEX IF EXISTS idx_orders_order_date")
+    conn.execute("DROP INDEX IF EXISTS idx_orders_open")
+    conn.execute('''
+        CREATE INDEX idx_orders_created_by_date
+        ON orders(created_by, IFNULL(order_date, ''), order_id)
+    ''')
+    conn.execute('''
+        CREATE INDEX idx_orders_order_date
+        ON orders(IFNULL(order_date, ''), order_id)
+    ''')
+    conn.execute(f'''
+        CREATE INDEX idx_orders_open
+        ON orders(IFNULL(order_date, ''), order_id) WHERE {fulfilment.OPEN}
+    ''')
+
+
+def _m015_rollup_archive_guard(conn):
+    # archive.py no longer drops and recreates the rollup triggers around
+    # every batch; the delete triggers skip its moves instead
+    rollups.create_tables(conn)
+    rollups.create_triggers(conn)
+
+
+MIGRATIONS = [
+    (1, "base orders/order_products schema", _m001_base_schema),
+    (2, "order_products.edit_count", _m002_edit_count),
+    (3, "hot-path indexes", _m003_hot_path_indexes),
+    (4, "unique orders.order_no", _m004_unique_order_no),
+    (5, "order number sequence", _m005_order_sequence),
+    (6, "trigger-maintained report rollups", _m006_report_rollups),
+    (7, "dispatch summary views", _m007_dispatch_views),
+    (8, "buyer master with FTS5 search", _m008_buyers),
+    (9, "rollup insert trigger without price lookup", _m009_rollup_insert_trigger),
+    (10, "dispatch timestamps backfill", _m010_dispatch_timestamps),
+    (11, "dispatch event ledger with per-line dispatched_qty", _m011_dispatch_events),
+    (12, "order fulfilment status and totals", _m012_order_fulfilment),
+    (13, "dispatch views priced like the rollups", _m013_dispatch_view_prices),
+    (14, "order date indexes with NULL dates last", _m014_order_date_nulls),
+    (15, "rollup delete triggers skip archive moves", _m015_rollup_archive_guard),
+]
+
+
+def _ensure_version_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TEXT
+        )
+    ''')
+
+
+def applied_versions(path=db.ORDERS_DB):
+    with db.write_conn(path) as conn:
+        _ensure_version_table(conn)
+        return {row[0] for row in conn.execute("SELECT version FROM schema_version")}
+
+
+def migrate(path=db.ORDERS_DB, verbose=False, target=None):
+    # `target` stops after that version (benchmarks compare schemas)
+    applied = []
+    for version, description, apply in MIGRATIONS:
+        if target is not None and version > target:
+            break
+        with db.write_conn(path) as conn:
+            _ensure_version_table(conn)
+            # Re-checked inside the write lock so concurrent starters don't
+            # apply the same migration twice.
+            if conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,)).fetchone():
+                continue
+            apply(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                (version, description, datetime.now().isoformat(timespec="seconds"))
+            )
+        applied.append(version)
+        if verbose:
+            print(f"✅ Applied migration {version:03d}: {description}")
+    return applied
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply orders.db schema migrations")
+    parser.add_argument("--db", default=db.ORDERS_DB, help="database file (default: orders.db)")
+    parser.add_argument("--status", action="store_true", help="list migrations without applying them")
+    args = parser.parse_args()
+
+    if args.status:
+        done = applied_versions(args.db)
+        for version, description, _ in MIGRATIONS:
+            mark = "applied" if version in done else "pending"
+            print(f"{version:03d}  {mark:8}  {description}")
+    else:
+        applied = migrate(args.db, verbose=True)
+        if not applied:
+            print("✅ Schema is up to date.")
@@ -0,0 +1,216 @@
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import db
+
+# --- Order write path ---
+# Order numbers come from the order_sequences table (migration 005) and are
+# taken inside the same BEGIN IMMEDIATE transaction that inserts the order,
+# so two salespeople submitting at once can never get the same number.
+# Editor frames are validated column-wise and every line of an order or
+# dispatch is written with one executemany in a single transaction.
+# Every line records who entered it and when (modified_by, modified_date as
+# 'YYYY-MM-DD HH:MM:SS' local time). Dispatches are appended to the
+# dispatch_events ledger with dispatched_by / dispatched_at in the same
+# format, which the dispatch reports range-scan.
+
+ORDER_NO_FORMAT = "ORD-{:04d}"
+
+# Numbers reserved per trip to the sequence table. 1 = allocate inside the
+# insert transaction; larger values hand out numbers from a per-process
+# block, trading possible gaps (unused numbers on restart) for fewer
+# sequence updates under bursty order entry.
+ORDER_NO_BLOCK_SIZE = 1
+
+
+def format_order_no(value):
+    return ORDER_NO_FORMAT.format(value)
+
+
+def preview_order_no(conn):
+    # Cheap primary-key read for display only; the real number is assigned
+    # when the order is saved and may differ if someone else saves first.
+    row = conn.execute("SELECT next_value FROM order_sequences WHERE name = 'order_no'").fetchone()
+    return format_order_no(row[0] if row else 1)
+
+
+def _take_sequence(conn, count):
+    # Must run inside a write transaction. Returns the first of `count`
+    # consecutive values and advances the sequence past them.
+    row = conn.execute("SELECT next_value FROM order_sequences WHERE name = 'order_no'").fetchone()
+    first = row[0] if row else 1
+    conn.execute(
+        "INSERT OR REPLACE INTO order_sequences (name, next_value) VALUES ('order_no', ?)",
+        (first + count,)
+    )
+    return first
+
+
+class _OrderNumberBlock:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._blocks = {}
+
+    def take(self, path, size):
+        with self._lock:
+            next_value, end = self._blocks.get(path, (0, 0))
+            if next_value >= end:
+                with db.write_conn(path) as conn:
+                    next_value = _take_sequence(conn, size)
+                end = next_value + size
+            self._blocks[path] = (next_value + 1, end)
+            return next_value
+
+
+_order_number_block = _OrderNumberBlock()
+
+
+def _order_no_taken(conn, order_no):
+    return conn.execute("SELECT 1 FROM orders WHERE order_no = ?", (order_no,)).fetchone() is not None
+
+
+# --- Editor frame -> line tuples (vectorized) ---
+# Columns are converted to arrays once and checked with array operations;
+# per-row work is limited to zipping the final tuples.
+
+def _editor_lines(df, qty_col, skip_zero):
+    names = df['Product Name'].fillna('').astype(str).str.strip().to_numpy()
+    qty = pd.to_numeric(df[qty_col], errors='coerce').to_numpy(dtype=float)
+    price = pd.to_numeric(df['Price'], errors='coerce').fillna(0.0).to_numpy(dtype=float)
+    currency = df['Currency'].fillna('INR').to_numpy()
+    units = [None if pd.isna(u) else u for u in df['Unit'].tolist()]
+
+    keep = names != ''
+    if skip_zero:
+        keep &= qty != 0
+    errors = []
+    bad_qty = keep & ~(qty > 0)
+    if bad_qty.any():
+        errors.append(f"{qty_col} must be a number greater than 0 for: {', '.join(names[bad_qty])}")
+    bad_price = keep & (price < 0)
+    if bad_price.any():
+        errors.append(f"Price cannot be negative for: {', '.join(names[bad_price])}")
+
+    price_inr = np.where(currency == 'INR', price, 0.0)
+    price_usd = np.where(currency == 'USD', price, 0.0)
+    lines = [
+        line[:5]
+        for line in zip(names.tolist(), qty.tolist(), units, price_inr.tolist(), price_usd.tolist(), keep.tolist())
+        if line[5]
+    ]
+    return lines, errors
+
+
+def order_lines_from_editor(products):
+    # Sales editor (Product Name, Quantity, Unit, Currency, Price, ...) ->
+    # ([(product_name, quantity, unit, price_inr, price_usd)], [errors])
+    return _editor_lines(products, 'Quantity', skip_zero=False)
+
+
+def dispatch_lines_from_editor(edited):
+    # Dispatch editor -> lines with a Dispatch Qty (rows left at 0 are
+    # products not being dispatched this time, not errors)
+    return _editor_lines(edited, 'Dispatch Qty', skip_zero=True)
+
+
+# --- Writes ---
+
+def timestamp():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _insert_lines(conn, order_id, lines, status, user):
+    # Returns the new order_product_ids. The write lock is held for the
+    # whole transaction, so AUTOINCREMENT ids of one executemany are
+    # consecutive and end at last_insert_rowid().
+    now = timestamp()
+    conn.executemany(f'''
+        INSERT INTO order_products (
+            order_id, product_name, quantity, unit, price_inr, price_usd, status, modified_by, modified_date
+        )
+        VALUES (?, ?, ?, ?, ?, ?, '{status}', ?, ?)
+    ''', [(order_id,) + tuple(line) + (user, now) for line in lines])
+    if not lines:
+        return []
+    last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+    return list(range(last_id - len(lines) + 1, last_id + 1))
+
+
+def create_order(created_by, customer_name, order_date, urgent_flag, address, gstin, lines, path=db.ORDERS_DB):
+    # `lines` is a list of (product_name, quantity, unit, price_inr, price_usd).
+    # Returns (order_id, order_no, line_ids).
+    reserved = None
+    if ORDER_NO_BLOCK_SIZE > 1:
+        reserved = _order_number_block.take(path, ORDER_NO_BLOCK_SIZE)
+
+    with db.write_conn(path) as conn:
+        order_no = format_order_no(reserved if reserved is not None else _take_sequence(conn, 1))
+        # Orders inserted outside this service (scripts, imports) can sit
+        # ahead of the sequence; skip past them rather than fail.
+        while _order_no_taken(conn, order_no):
+            order_no = format_order_no(_take_sequence(conn, 1))
+
+        c = conn.cursor()
+        c.execute('''
+            INSERT INTO orders (created_by, customer_name, order_no, order_date, urgent_flag, address, gstin)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (created_by, customer_name, order_no, order_date, urgent_flag, address, gstin))
+        order_id = c.lastrowid
+        line_ids = _insert_lines(conn, order_id, lines, 'Original', created_by)
+
+    return order_id, order_no, line_ids
+
+
+def submit_dispatch(order_id, lines, dispatched_by, path=db.ORDERS_DB):
+    # `lines` as for create_order. Each quantity is spread over the order's
+    # lines of that product in order, filling each up to its open balance
+    # (anything over the product's total lands on its last line), with one
+    # dispatch_events row per line touched; each line's dispatched_qty is
+    # bumped by trigger in the same transaction. Returns the new event_ids.
+    with db.write_conn(path) as conn:
+        open_qty = {}
+        targets = {}
+        for line_id, product, qty, dispatched in conn.execute('''
+            SELECT order_product_id, product_name, IFNULL(quantity, 0), dispatched_qty
+            FROM order_products
+            WHERE order_id = ? AND status = 'Original'
+            ORDER BY order_product_id
+        ''', (order_id,)):
+            open_qty[line_id] = qty - dispatched
+            targets.setdefault(product, []).append(line_id)
+
+        events = []
+        missing = []
+        for product, qty, unit, price_inr, price_usd in lines:
+            if product not in targets:
+                missing.append(product)
+                continue
+            remaining = qty
+            last_line = targets[product][-1]
+            for line_id in targets[product]:
+                take = remaining if line_id == last_line else min(remaining, max(open_qty[line_id], 0))
+                if take <= 0:
+                    continue
+                open_qty[line_id] -= take
+                remaining -= take
+                events.append((line_id, order_id, product, take, unit, price_inr, price_usd))
+                if remaining <= 0:
+                    break
+        if missing:
+            raise ValueError(f"Not on order {order_id}: {', '.join(missing)}")
+
+        now = timestamp()
+        conn.executemany('''
+            INSERT INTO dispatch_events (
+                order_product_id, order_id, product_name, quantity, unit, price_inr, price_usd,
+                dispatched_by, dispatched_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [event + (dispatched_by, now) for event in events])
+        if not events:
+            return []
+        last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        return list(range(last_id - len(events) + 1, last_id + 1))
@@ -0,0 +1,139 @@
+import sqlite3
+
+import streamlit as st
+
+import auth
+import db
+import metrics
+import querycache
+import ui
+
+
+# --- Background password hashing (Admin) ---
+# bcrypt runs on auth's worker thread; this fragment polls for the results
+# and refreshes the page once every queued create/reset has finished.
+@st.fragment(run_every=1)
+def show_password_jobs():
+    jobs = st.session_state.get('admin_password_jobs', [])
+    if not all(future.done() for future, _ in jobs):
+        st.info("🔐 Saving password…")
+        return
+    results = []
+    for future, message in jobs:
+        try:
+            future.result()
+            results.append(("success", message))
+        except sqlite3.IntegrityError:
+            results.append(("error", "⚠️ Username already exists."))
+        except Exception as e:
+            results.append(("error", f"❌ {e}"))
+    st.session_state['admin_password_jobs'] = []
+    st.session_state['admin_password_results'] = results
+    st.rerun(scope="app")
+
+@metrics.timed_page("admin_page")
+def admin_page():
+    ui.show_header()
+    st.markdown("<h4>Shree Sai Salt - Order Management System</h4>", unsafe_allow_html=True)
+
+    ui.show_user_profile_photo(placeholder=False)
+
+    with db.write_conn(db.USERS_DB) as conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE,
+                password_hash BLOB,
+                role TEXT,
+                full_name TEXT
+            )
+        ''')
+
+    # --- Create New User ---
+    st.subheader("➕ Create New User")
+    new_username = st.text_input("Username", key="admin_new_username")
+    new_password = st.text_input("Password", type="password", key="admin_new_password")
+    new_role = st.selectbox("Role", ["Admin", "Sales", "Dispatch"], key="admin_new_role")
+    new_full_name = st.text_input("Full Name", key="admin_new_fullname")
+
+    if st.button("Create User", key="admin_create_user"):
+        if not new_username.strip() or not new_password or not new_full_name.strip():
+            st.warning("Please enter username, full name, and password.")
+        else:
+            future = auth.create_user_async(new_username.strip(), new_password, new_role, new_full_name.strip())
+            st.session_state.setdefault('admin_password_jobs', []).append(
+                (future, f"✅ User '{new_username}' created successfully!")
+            )
+
+    for kind, message in st.session_state.pop('admin_password_results', []):
+        if kind == "success":
+            st.success(message)
+        else:
+            st.error(message)
+    if st.session_state.get('admin_password_jobs'):
+        show_password_jobs()
+
+    # --- Manage Existing Users ---
+    st.markdown("---")
+    st.subheader("👥 Manage Existing Users")
+    with db.read_conn(db.USERS_DB) as conn:
+        c = conn.cursor()
+        c.row_factory = sqlite3.Row
+        users = c.execute("SELECT user_id, username, role, full_name FROM users ORDER BY user_id").fetchall()
+
+    for user in users:
+        user_id = user["user_id"]
+        username = user["username"]
+        role = user["role"]
+        full_name = user["full_name"]
+
+        col1, col2, col3, col4 = st.columns([3, 3, 3, 1.5])
+        with col1:
+            st.markdown(f"**{username}**  \n_Full Name_: {full_name}  \n_Role_: {role}")
+
+        with col2:
+            updated_role = st.selectbox("Change Role", ["Admin", "Sales", "Dispatch"],
+                                        index=["Admin", "Sales", "Dispatch"].index(role),
+                                        key=f"role_{user_id}")
+            if updated_role != role:
+                if st.button("Update Role", key=f"update_role_{user_id}"):
+                    with db.write_conn(db.USERS_DB) as conn:
+                        conn.execute("UPDATE users SET role = ? WHERE user_id = ?", (updated_role, user_id))
+                    st.success(f"✅ Role updated for '{username}' to {updated_role}")
+                    st.rerun()
+
+        with col3:
+            new_pw = st.text_input(f"New Password for {username}", type="password", key=f"new_pw_{user_id}")
+            if new_pw:
+                if st.button("Reset Password", key=f"reset_pw_{user_id}"):
+                    future = auth.set_password_async(username, new_pw)
+                    st.session_state.setdefault('admin_password_jobs', []).append(
+                        (future, f"🔐 Password reset for '{username}'")
+                    )
+
+        with col4:
+            if username.lower() == "admin":
+                st.caption("🔒")
+            else:
+                if st.button("🗑️", key=f"delete_user_{user_id}"):
+                    with db.write_conn(db.USERS_DB) as conn:
+                        conn.execute("DELETE FROM users WHERE user_id = ?", (user_id,))
+                        conn.execute("DELETE FROM sessions WHERE username = ?", (username,))
+                    st.success(f"🗑️ Deleted user '{username}'")
+                    st.rerun()
+
+    # --- Query Cache ---
+    st.markdown("---")
+    with st.expander("⚡ Query Cache"):
+        cache = querycache.stats()
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Hit Rate", f"{cache['hit_rate']:.0%}")
+        m2.metric("Hits / Misses", f"{cache['hits']} / {cache['misses']}")
+        m3.metric("Entries", cache['entries'])
+        m4.metric("Size", f"{cache['bytes'] / 1024:,.0f} KB")
+        st.caption(f"Evictions: {cache['evictions']}")
+        if st.button("Clear Query Cache", key="admin_clear_query_cache"):
+            querycache.clear()
+            st.rerun()
+
+    ui.return_menu_logout("admin")
@@ -0,0 +1,142 @@
+import streamlit as st
+
+import metrics
+import order_service
+import queries
+import querycache
+import ui
+
+DISPATCH_QUEUE_PAGE_SIZES = [10, 25, 50]
+
+
+@metrics.timed_page("dispatch_page")
+def dispatch_page(admin_view=False):
+    ui.show_header()
+    st.markdown("<h4>Shree Sai Salt - Order Management System</h4>", unsafe_allow_html=True)
+
+    ui.show_user_profile_photo()
+    
+    balances = None
+    next_cursor = None
+
+    # --- Dispatch Queue Filters ---
+    products_list = querycache.cached(queries.product_names)
+
+    f1, f2, f3, f4 = st.columns([2, 2, 2, 1])
+    with f1:
+        date_range = st.date_input("Order Date Range", value=(), key="dispatch_queue_dates")
+    with f2:
+        customer_filter = st.text_input("Customer", key="dispatch_queue_customer")
+    with f3:
+        product_filter = st.selectbox("Product", [""] + products_list, key="dispatch_queue_product")
+    with f4:
+        page_size = st.selectbox("Per page", DISPATCH_QUEUE_PAGE_SIZES, key="dispatch_queue_page_size")
+    g1, g2 = st.columns([1, 1])
+    with g1:
+        urgent_only = st.checkbox("Urgent only", key="dispatch_queue_urgent")
+    with g2:
+        show_all = st.checkbox("Include fully dispatched orders", key="dispatch_queue_all")
+
+    filters = dict(
+        date_from=date_range[0] if len(date_range) > 0 else None,
+        date_to=date_range[1] if len(date_range) > 1 else None,
+        customer=customer_filter.strip(),
+        urgent_only=urgent_only,
+        product=product_filter or None,
+        open_only=not show_all,
+    )
+    cursors = ui.pager_cursors("dispatch_queue", (tuple(map(str, filters.values())), page_size))
+
+    # --- Original Orders ---
+    try:
+        # One page of the queue plus its per-product balances
+        queue_count = querycache.cached(queries.dispatch_queue_count, **filters)
+        orders, next_cursor = querycache.cached(queries.dispatch_queue, page_size, after=cursors[-1], **filters)
+        balances = querycache.cached(queries.dispatch_balances, orders['Order ID'].tolist())
+
+        label = "orders in queue" if filters['open_only'] else "orders"
+        st.subheader(f"📋 Original Order  ·  {queue_count} {label}")
+        if orders.empty:
+            st.info("✅ No orders match the current filters.")
+
+        for order_id, order_lines in balances.groupby('Order ID', sort=False):
+            head = order_lines.iloc[0]
+            customer_name = head['Customer']
+
+            st.markdown(
+                f"### Order No: {head['Order No']} | Customer: {customer_name} | GSTIN: {head['GSTIN']} | Date: {head['Order Date']} | Urgent: {'Yes' if head['Urgent'] else 'No'}"
+            )
+
+            df = order_lines[order_lines['Product Name'].notna()].reset_index(drop=True)
+
+            st.data_editor(
+                df[['Product Name', 'Original Qty', 'Unit', 'Price INR', 'Price USD', 'Total INR', 'Total USD']],
+                disabled=True,
+                use_container_width=True,
+                key=f"view_table_{order_id}"
+            )
+
+            st.markdown(f"**🧾 Grand Total INR:** ₹ {df['Total INR'].sum():,.2f} | **USD:** $ {df['Total USD'].sum():,.2f}")
+
+            # --- Dispatch Entry ---
+            st.subheader("✏️ Edit Order")
+            st.info("Edit and adjust dispatch quantities below.")
+
+            editable_df = df[['Product Name', 'Unit']].copy()
+            editable_df['Dispatch Qty'] = 0.0
+            editable_df['Currency'] = 'INR'
+            editable_df['Price'] = 0.0
+
+            column_config = {
+                "Unit": st.column_config.SelectboxColumn("Unit", options=["KG", "Nos"]),
+                "Currency": st.column_config.SelectboxColumn("Currency", options=["INR", "USD"])
+            }
+
+            edited = st.data_editor(
+                editable_df,
+                column_config=column_config,
+                num_rows='dynamic',
+                key=f"edit_order_{order_id}"
+            )
+
+            if st.button("🚀 Submit Dispatch", key=f"submit_dispatch_{order_id}"):
+                saved = False
+                lines, errors = order_service.dispatch_lines_from_editor(edited)
+                if not lines:
+                    st.warning("Enter a Dispatch Qty for at least one product.")
+                elif errors:
+                    for error in errors:
+                        st.warning(error)
+                else:
+                    try:
+                        order_service.submit_dispatch(order_id, lines, st.session_state.get('username'))
+                        saved = True
+                    except Exception as e:
+                        st.error(f"❌ Error submitting dispatch: {e}")
+
+                if saved:
+                    st.success("✅ Dispatch submitted successfully!")
+                    st.rerun()
+
+        ui.show_pager("dispatch_queue", cursors, next_cursor)
+
+    except Exception as e:
+        st.error(f"⚠️ Error fetching orders: {e}")
+
+    # --- Pending Summary ---
+    full_pending_df = queries.pending_summary(balances) if balances is not None else None
+    if full_pending_df is not None and not full_pending_df.empty:
+        st.subheader("⏳ Pending Orders (this page)")
+        st.dataframe(full_pending_df, use_container_width=True)
+    else:
+        st.info("✅ No pending orders.")
+
+    # --- Dispatched Summary ---
+    full_dispatched_df = queries.dispatched_summary(balances) if balances is not None else None
+    if full_dispatched_df is not None and not full_dispatched_df.empty:
+        st.subheader("🚚 Dispatched Orders (this page)")
+        st.dataframe(full_dispatched_df, use_container_width=True)
+    else:
+        st.info("🚫 No dispatched orders found.")
+
+    ui.return_menu_logout("dispatch")
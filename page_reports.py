@@ -0,0 +1,103 @@
+import streamlit as st
+
+import metrics
+import queries
+import querycache
+import ui
+DEMAND_TOP_N = [10, 20, 50, None]  # None = all products
+
+
+@metrics.timed_page("reports_page")
+def reports_page():
+    ui.show_header()
+    st.markdown("<h4>Shree Sai Salt - Order Management System</h4>", unsafe_allow_html=True)
+    
+    st.markdown(f"### 👋 Welcome back, **{st.session_state.get('username', 'User')}**!")
+    st.title("📊 Reports and Analytics")
+    st.info("Track demand, dispatched summary, and performance insights.")
+
+    try:
+        highest, lowest = querycache.cached(queries.demand_extremes)
+        daily_demand = querycache.cached(queries.daily_product_demand)
+        dispatched = querycache.cached(queries.dispatch_summary)
+        open_orders = querycache.cached(queries.open_orders)
+
+        # --- Max Demand Product ---
+        st.subheader("🔥 Highest Demand Product")
+        if highest:
+            st.success(f"Max Demand: {highest[0]} | Total KG: {highest[1]:g}")
+        else:
+            st.warning("No order data available.")
+
+        # --- Min Demand Product ---
+        st.subheader("💤 Lowest Demand Product")
+        if lowest:
+            st.info(f"Min Demand: {lowest[0]} | Total KG: {lowest[1]:g}")
+        else:
+            st.warning("No order data available.")
+
+        # --- Demand Chart ---
+        # Rendered in the browser (Vega-Lite) from the cached daily rollup;
+        # changing the filters only regroups that frame.
+        st.subheader("📈 Product Demand Chart")
+        c1, c2, c3 = st.columns([1, 2, 1])
+        with c1:
+            view_option = st.selectbox("View By", ["Total KG", "Amount (INR)"], key="reports_view_by")
+        with c2:
+            date_range = st.date_input("Order Date Range", value=(), key="reports_dates")
+        with c3:
+            top_n = st.selectbox("Top Products", DEMAND_TOP_N, key="reports_top_n",
+                                 format_func=lambda n: "All" if n is None else f"Top {n}")
+
+        chart = queries.demand_chart_data(
+            daily_demand, view_option,
+            date_from=date_range[0] if len(date_range) > 0 else None,
+            date_to=date_range[1] if len(date_range) > 1 else None,
+            top_n=top_n,
+        )
+        if not chart.empty:
+            st.vega_lite_chart(chart, {
+                "title": f"Product-wise {view_option}",
+                "mark": {"type": "bar", "tooltip": True},
+                "encoding": {
+                    "x": {"field": "Product", "type": "nominal", "sort": "-y"},
+                    "y": {"field": "Value", "type": "quantitative", "title": view_option},
+                },
+            }, use_container_width=True)
+        else:
+            st.warning("No data to display.")
+
+        # --- Open Orders ---
+        st.subheader("⏳ Open Orders")
+        if not open_orders.empty:
+            counts = open_orders["Status"].value_counts()
+            c1, c2, c3 = st.columns(3)
+            c1.metric("Pending", int(counts.get("pending", 0)))
+            c2.metric("Partially dispatched", int(counts.get("partial", 0)))
+            c3.metric("Balance Qty", f"{(open_orders['Ordered Qty'] - open_orders['Dispatched Qty']).clip(lower=0).sum():,.0f}")
+            st.dataframe(open_orders, use_container_width=True)
+        else:
+            st.success("✅ Every order is fully dispatched.")
+
+        # --- Dispatched Summary ---
+        st.subheader("🚚 Dispatch Summary")
+        if not dispatched.empty:
+            df = dispatched
+            df["Total Amount"] = df["Total Amount"].fillna(0).astype(float)
+            st.dataframe(df, use_container_width=True)
+            st.markdown(f"### 🧾 Total Dispatch Value: ₹ {df['Total Amount'].sum():,.2f}")
+        else:
+            st.info("No dispatch data available.")
+
+    except Exception as e:
+        st.error(f"⚠️ Error loading reports: {e}")
+
+    st.markdown("---")
+    if st.button("⬅ Return to Main Menu", key="return_main_reports_btn"):
+        st.session_state['page'] = 'Main Menu'
+        st.rerun()
+
+    if st.button("🔒 Logout", key="logout_reports_btn"):
+        ui.logout()
+        st.session_state.clear()
+        st.rerun()
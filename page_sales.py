@@ -0,0 +1,211 @@
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+import buyers
+import db
+import metrics
+import order_service
+import queries
+import querycache
+import ui
+
+MY_ORDERS_PAGE_SIZES = [10, 25, 50]
+
+
+@metrics.timed_page("sales_page")
+def sales_page(admin_view=False):
+    ui.show_header()
+    st.markdown("<h4>Shree Sai Salt - Order Management System</h4>", unsafe_allow_html=True)
+
+    username = st.session_state.get('username', 'user')
+    ui.show_user_profile_photo()
+    
+    # --- Upload buyer Excel file (Only Admin can replace it) ---
+    if st.session_state['role'] == 'Admin':
+        uploaded_file = st.file_uploader("Upload Buyer Excel File", type=["xlsx"])
+        # The uploader keeps its file across reruns; import each upload once
+        if uploaded_file is not None and st.session_state.get('buyers_upload_id') != uploaded_file.file_id:
+            try:
+                with open(buyers.BUYERS_XLSX, "wb") as f:
+                    f.write(uploaded_file.getbuffer())
+                inserted, updated, unchanged = buyers.import_buyers(buyers.read_workbook(buyers.BUYERS_XLSX))
+                st.session_state['buyers_upload_id'] = uploaded_file.file_id
+                st.success(f"✅ Buyer list imported: {inserted} new, {updated} updated, {unchanged} unchanged.")
+            except Exception as e:
+                st.warning(f"⚠️ Error reading buyers.xlsx: {e}")
+
+    # --- Buyer Details Form ---
+    st.subheader("🧾 Buyer Details")
+    customer_name = ""
+    address = ""
+    gstin = ""
+
+    buyer_query = st.text_input("Search Buyer (name, GSTIN or address)", key="buyer_search")
+    matches = querycache.cached(buyers.search_buyers, buyer_query)
+
+    if matches or buyer_query:
+        by_id = {m[0]: m for m in matches}
+        selected_id = st.selectbox(
+            "Select Buyer (or leave blank to enter manually)", [None] + list(by_id),
+            format_func=lambda i: "" if i is None else f"{by_id[i][1]}  ·  {by_id[i][2]}",
+            key="buyer_select"
+        )
+        selected_buyer = by_id.get(selected_id)
+    else:
+        selected_buyer = None
+        st.info("📂 Buyer list not found. Please ask Admin to upload 'buyers.xlsx'.")
+
+    if selected_buyer:
+        _, customer_name, gstin, address = selected_buyer
+
+        st.markdown(f"**Address:** {address}")
+        st.markdown(f"**GSTIN:** {gstin}")
+    else:
+        customer_name = st.text_input("Customer Name", key="manual_customer_name")
+        address = st.text_area("Address", key="manual_address")
+        gstin = st.text_input("GSTIN", key="manual_gstin")
+
+    # --- Auto-generate Order Number ---
+    # Preview only: the number is assigned when the order is saved.
+    if 'last_order_no' in st.session_state:
+        st.success(f"✅ Order {st.session_state.pop('last_order_no')} Created Successfully!")
+    new_order_no = querycache.cached(order_service.preview_order_no)
+    st.markdown(f"### 🆕 Auto-Generated Order Number: `{new_order_no}`")
+    st.caption("Final number is confirmed when the order is submitted.")
+
+    # --- Order Info ---
+    order_date = st.date_input("Order Date", datetime.today(), key="sales_order_date")
+    urgent_flag = st.checkbox("Mark as Urgent", key="sales_urgent_flag")
+
+    # --- Product Entry ---
+    st.write("📦 Enter Products")
+    unit_options = ["KG", "Nos"]
+    currency_options = ["INR", "USD"]
+    price_type_options = ["Per Kg", "Per Nos"]
+
+    product_columns = ['Product Name', 'Quantity', 'Unit', 'Currency', 'Price', 'Price Type']
+    product_data = pd.DataFrame(columns=product_columns)
+    column_config = {
+        "Unit": st.column_config.SelectboxColumn("Unit", options=unit_options),
+        "Currency": st.column_config.SelectboxColumn("Currency", options=currency_options),
+        "Price Type": st.column_config.SelectboxColumn("Price Type", options=price_type_options),
+    }
+
+    products = st.data_editor(product_data, column_config=column_config, num_rows="dynamic", key="sales_products_editor")
+
+    if not products.empty and 'Quantity' in products.columns and 'Price' in products.columns:
+        try:
+            products['Quantity'] = pd.to_numeric(products['Quantity'], errors='coerce').fillna(0)
+            products['Price'] = pd.to_numeric(products['Price'], errors='coerce').fillna(0)
+            products['Total'] = products['Quantity'] * products['Price']
+        except Exception as e:
+            st.warning(f"Error calculating totals: {e}")
+            products['Total'] = 0.0
+
+    st.write("🔍 Order Summary Preview:")
+    st.data_editor(products, use_container_width=True, key="summary_preview_editor")
+
+    grand_total = 0.0
+    if 'Total' in products:
+        try:
+            grand_total = products['Total'].astype(float).sum()
+            st.markdown(f"### 🧾 Grand Total: ₹ {grand_total:,.2f}")
+        except:
+            pass
+
+    # --- Submit Order ---
+    if st.button("✅ Submit Order", key="sales_submit_order"):
+        if not customer_name.strip():
+            st.warning("Please fill in Customer Name.")
+        else:
+            lines, errors = order_service.order_lines_from_editor(products)
+            saved_order_no = None
+            if not lines:
+                st.warning("Please enter at least one product.")
+            elif errors:
+                for error in errors:
+                    st.warning(error)
+            else:
+                try:
+                    _, saved_order_no, _ = order_service.create_order(
+                        username, customer_name.strip(), str(order_date), int(urgent_flag),
+                        str(address).strip(), str(gstin).strip(), lines
+                    )
+                except Exception as e:
+                    st.error(f"❌ Error saving order: {e}")
+
+            if saved_order_no:
+                st.session_state['last_order_no'] = saved_order_no
+                st.rerun()
+
+    # --- Existing Orders List ---
+    st.subheader("📋 My Orders")
+
+    f1, f2, f3, f4 = st.columns([2, 2, 1, 1])
+    with f1:
+        date_range = st.date_input("Order Date Range", value=(), key="my_orders_dates")
+    with f2:
+        customer_filter = st.text_input("Customer", key="my_orders_customer")
+    with f3:
+        urgent_only = st.checkbox("Urgent only", key="my_orders_urgent")
+    with f4:
+        page_size = st.selectbox("Per page", MY_ORDERS_PAGE_SIZES, key="my_orders_page_size")
+
+    date_from = date_range[0] if len(date_range) > 0 else None
+    date_to = date_range[1] if len(date_range) > 1 else None
+
+    filters = (username, str(date_from), str(date_to), customer_filter.strip(), urgent_only, page_size)
+    cursors = ui.pager_cursors("my_orders", filters)
+
+    try:
+        orders, next_cursor = querycache.cached(
+            queries.my_orders_page, username, page_size, after=cursors[-1],
+            date_from=date_from, date_to=date_to,
+            customer=customer_filter.strip(), urgent_only=urgent_only
+        )
+        lines = querycache.cached(queries.original_lines, orders['Order ID'].tolist())
+        lines_by_order = dict(tuple(lines.groupby('Order ID', sort=False)))
+
+        if orders.empty:
+            st.info("No orders found.")
+
+        for order in orders.itertuples(index=False):
+            order_id, customer, order_no, order_date, urgent, gstin = order
+            st.markdown(
+                f"### Order No: {order_no} | Customer: {customer} | GSTIN: {gstin} | Date: {order_date} | Urgent: {'Yes' if urgent else 'No'}"
+            )
+
+            # Admin-only delete button after order summary
+            if admin_view:
+                if st.button(f"❌ Delete Order #{order_no}", key=f"delete_order_{order_id}"):
+                    deleted = False
+                    try:
+                        with db.write_conn() as conn:
+                            conn.execute("DELETE FROM dispatch_events WHERE order_id = ?", (order_id,))
+                            conn.execute("DELETE FROM order_products WHERE order_id = ?", (order_id,))
+                            conn.execute("DELETE FROM orders WHERE order_id = ?", (order_id,))
+                        deleted = True
+                    except Exception as e:
+                        st.error(f"❌ Error deleting order: {e}")
+                    if deleted:
+                        st.success(f"✅ Order {order_no} deleted successfully.")
+                        st.rerun()
+
+            df = lines_by_order.get(order_id, lines.iloc[0:0])
+            df = df.drop(columns=['Order ID']).reset_index(drop=True)
+
+            st.data_editor(df, disabled=True, use_container_width=True, key=f"view_table_{order_id}")
+
+            # Show grand totals
+            total_inr = df['Total INR'].sum()
+            total_usd = df['Total USD'].sum()
+            st.markdown(f"**🧾 Grand Total INR:** ₹ {total_inr:,.2f} | **USD:** $ {total_usd:,.2f}")
+
+        ui.show_pager("my_orders", cursors, next_cursor)
+
+    except Exception as e:
+        st.error(f"⚠️ Error fetching orders: {e}")
+
+    ui.return_menu_logout("sales")
@@ -0,0 +1,238 @@
+import pandas as pd
+
+import archive
+
+# --- Read-side queries shared by the pages ---
+# Each function takes an open connection (see db.read_conn) and returns a
+# DataFrame with the column names the pages display.
+
+DISPATCH_BALANCE_COLUMNS = [
+    'Order ID', 'Customer', 'Order No', 'Order Date', 'Urgent', 'GSTIN',
+    'Product Name', 'Original Qty', 'Dispatched Qty', 'Unit', 'Price INR', 'Price USD'
+]
+
+
+def dispatch_balances(conn, order_ids=None):
+    # One row per (order, product, unit) with original, dispatched and
+    # balance quantities, from the order lines and their running
+    # dispatched_qty (no dispatch history is read). Limited to `order_ids`
+    # when given (e.g. the orders on the current queue page).
+    where = ""
+    params = []
+    if order_ids is not None:
+        where = f"WHERE o.order_id IN ({', '.join('?' * len(order_ids))})" if len(order_ids) else "WHERE 0"
+        params = [int(i) for i in order_ids]
+    rows = conn.execute(f'''
+        SELECT o.order_id, o.customer_name, o.order_no, o.order_date,
+               IFNULL(o.urgent_flag, 0), o.gstin,
+               p.product_name,
+               SUM(p.quantity),
+               SUM(p.dispatched_qty),
+               p.unit,
+               MAX(p.price_inr),
+               MAX(p.price_usd)
+        FROM orders o
+        LEFT JOIN order_products p ON p.order_id = o.order_id AND p.status = 'Original'
+        {where}
+        GROUP BY o.order_id, p.product_name, p.unit
+        ORDER BY o.order_date DESC, o.order_id DESC
+    ''', params).fetchall()
+    df = pd.DataFrame(rows, columns=DISPATCH_BALANCE_COLUMNS)
+
+    df['Original Qty'] = df['Original Qty'].fillna(0).astype(float)
+    df['Dispatched Qty'] = df['Dispatched Qty'].fillna(0).astype(float)
+    df['Balance Qty'] = (df['Original Qty'] - df['Dispatched Qty']).clip(lower=0)
+    df['Total INR'] = df['Original Qty'] * df['Price INR']
+    df['Total USD'] = df['Original Qty'] * df['Price USD']
+    return df
+
+
+def pending_summary(balances):
+    pending = balances[balances['Balance Qty'] > 0]
+    return pending[['Order ID', 'Product Name', 'Customer', 'Balance Qty']].reset_index(drop=True)
+
+
+def dispatched_summary(balances):
+    dispatched = balances[balances['Dispatched Qty'] > 0]
+    return dispatched[['Order ID', 'Product Name', 'Customer', 'Dispatched Qty']].reset_index(drop=True)
+
+
+# --- Order listings (My Orders on sales_page, work queue on dispatch_page) ---
+ORDER_COLUMNS = ['Order ID', 'Customer', 'Order No', 'Order Date', 'Urgent', 'GSTIN']
+LINE_COLUMNS = ['Order ID', 'Product Name', 'Qty', 'Unit', 'Price INR', 'Price USD']
+
+
+def _order_filters(created_by=None, date_from=None, date_to=None, customer=None,
+                   urgent_only=False, product=None, open_only=False):
+    where = []
+    params = []
+    if created_by is not None:
+        where.append("o.created_by = ?")
+        params.append(created_by)
+    # on IFNULL(order_date, ''), the indexed sort key (see _order_page); an
+    # order without a date matches no date range
+    if date_from:
+        where.append("IFNULL(o.order_date, '') >= ?")
+        params.append(str(date_from))
+    if date_to:
+        where.append("IFNULL(o.order_date, '') <= ? AND o.order_date IS NOT NULL")
+        params.append(str(date_to))
+    if customer:
+        where.append("o.customer_name LIKE ?")
+        params.append(f"%{customer}%")
+    if urgent_only:
+        where.append("o.urgent_flag = 1")
+    if product:
+        where.append('''EXISTS (
+            SELECT 1 FROM rollup_order_product r
+            WHERE r.order_id = o.order_id AND r.product_name = ?
+        )''')
+        params.append(product)
+    if open_only:
+        # Open = some product still has less dispatched than ordered; kept
+        # on the order by triggers (fulfilment.py), range scan of idx_orders_open
+        where.append("o.fulfilment_status <> 'complete'")
+    return where, params
+
+
+def _order_page(conn, where, params, page_size, after):
+    # Keyset pagination on (order_date, order_id), newest first, with a
+    # missing order_date sorting as '' (last) so those orders are still
+    # paged to. `after` is the (order_date or '', order_id) of the last row
+    # of the previous page. The cursor test is spelled out instead of a row
+    # value so SQLite seeks the IFNULL(order_date, '') indexes (migration 14).
+    # Returns (orders DataFrame, cursor for the next page or None).
+    where = list(where)
+    params = list(params)
+    if after is not None:
+        where.append("IFNULL(o.order_date, '') <= ? AND (IFNULL(o.order_date, '') < ? OR o.order_id < ?)")
+        params.extend([after[0], after[0], after[1]])
+
+    rows = conn.execute(f'''
+        SELECT o.order_id, o.customer_name, o.order_no, o.order_date, o.urgent_flag, o.gstin
+        FROM orders o
+        WHERE {" AND ".join(where) or "1"}
+        ORDER BY IFNULL(o.order_date, '') DESC, o.order_id DESC
+        LIMIT ?
+    ''', params + [page_size + 1]).fetchall()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = (rows[-1][3] or '', rows[-1][0])
+    return pd.DataFrame(rows, columns=ORDER_COLUMNS), next_cursor
+
+
+def my_orders_page(conn, created_by, page_size, after=None,
+                   date_from=None, date_to=None, customer=None, urgent_only=False):
+    where, params = _order_filters(created_by, date_from, date_to, customer, urgent_only)
+    return _order_page(conn, where, params, page_size, after)
+
+
+def dispatch_queue(conn, page_size, after=None, **filters):
+    # Filters: date_from, date_to, customer, urgent_only, product, open_only
+    where, params = _order_filters(**filters)
+    return _order_page(conn, where, params, page_size, after)
+
+
+def dispatch_queue_count(conn, **filters):
+    where, params = _order_filters(**filters)
+    return conn.execute(
+        f"SELECT COUNT(*) FROM orders o WHERE {' AND '.join(where) or '1'}", params
+    ).fetchone()[0]
+
+
+def product_names(conn):
+    return [row[0] for row in conn.execute("SELECT product_name FROM rollup_product ORDER BY product_name")]
+
+
+def original_lines(conn, order_ids):
+    # 'Original' line items for a batch of orders in one IN (...) query.
+    rows = []
+    if len(order_ids):
+        placeholders = ", ".join("?" * len(order_ids))
+        rows = conn.execute(f'''
+            SELECT order_id, product_name, quantity, unit, price_inr, price_usd
+            FROM order_products
+            WHERE order_id IN ({placeholders}) AND status = 'Original'
+            ORDER BY order_id, order_product_id
+        ''', [int(i) for i in order_ids]).fetchall()
+    df = pd.DataFrame(rows, columns=LINE_COLUMNS)
+    df['Total INR'] = df['Qty'] * df['Price INR']
+    df['Total USD'] = df['Qty'] * df['Price USD']
+    return df
+
+
+# --- Reports page (reads the trigger-maintained rollups, see rollups.py) ---
+
+def demand_extremes(conn):
+    # ((product, total_kg) with the highest and lowest non-zero Original demand)
+    highest = conn.execute('''
+        SELECT product_name, original_qty FROM rollup_product
+        WHERE original_lines > 0
+        ORDER BY original_qty DESC LIMIT 1
+    ''').fetchone()
+    lowest = conn.execute('''
+        SELECT product_name, original_qty FROM rollup_product
+        WHERE original_lines > 0 AND original_qty > 0
+        ORDER BY original_qty ASC LIMIT 1
+    ''').fetchone()
+    return highest, lowest
+
+
+def daily_product_demand(conn):
+    # Per (order date, product) demand from rollup_daily. Loaded once per
+    # database change; the chart's date range and top-N are applied to it
+    # in memory by demand_chart_data().
+    rows = conn.execute('''
+        SELECT day, product_name,
+               original_qty + dispatched_qty,
+               original_amount_inr + dispatched_amount_inr
+        FROM rollup_daily
+        ORDER BY day, product_name
+    ''').fetchall()
+    return pd.DataFrame(rows, columns=["Date", "Product", "Total KG", "Amount (INR)"])
+
+
+def demand_chart_data(daily, measure, date_from=None, date_to=None, top_n=None):
+    # -> Product / Value rows for the demand chart, largest first
+    if date_from:
+        daily = daily[daily["Date"] >= str(date_from)]
+    if date_to:
+        daily = daily[daily["Date"] <= str(date_to)]
+    totals = daily.groupby("Product")[measure].sum()
+    totals = totals[totals != 0].sort_values(ascending=False)
+    if top_n:
+        totals = totals.head(top_n)
+    return totals.rename("Value").reset_index()
+
+
+OPEN_ORDER_COLUMNS = ["Order ID", "Customer", "Order No", "Order Date", "Status",
+                      "Ordered Qty", "Dispatched Qty", "Last Dispatch"]
+
+
+def open_orders(conn):
+    # Orders not yet fully dispatched, newest first, with their stored
+    # fulfilment totals (no line aggregation)
+    rows = conn.execute('''
+        SELECT order_id, customer_name, order_no, order_date, fulfilment_status,
+               ordered_qty, dispatched_qty, last_dispatch_at
+        FROM orders
+        WHERE fulfilment_status <> 'complete'
+        ORDER BY IFNULL(order_date, '') DESC, order_id DESC
+    ''').fetchall()
+    return pd.DataFrame(rows, columns=OPEN_ORDER_COLUMNS)
+
+
+def dispatch_summary(conn):
+    # Whole history: the rollups also count archived orders (see archive.py)
+    archive.history(conn)
+    rows = conn.execute('''
+        SELECT r.order_id, o.customer_name, r.product_name, r.dispatched_qty,
+               r.dispatched_qty * IFNULL(r.original_price_inr, 0)
+        FROM rollup_order_product r
+        JOIN all_orders o ON o.order_id = r.order_id
+        WHERE r.dispatched_lines > 0
+        ORDER BY r.order_id, r.product_name
+    ''').fetchall()
+    return pd.DataFrame(rows, columns=["Order ID", "Customer", "Product", "Dispatched KG", "Total Amount"])
@@ -0,0 +1,135 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import db
+
+# --- Read query result cache ---
+# Streamlit reruns every page top to bottom on each click. Read queries go
+# through cached(), which keeps their results per database "generation"
+# (see db.ConnectionPool.generation) and only runs the query again once
+# something has been committed. Entries are evicted least recently used
+# first, by count and by approximate size.
+#
+#   rows = querycache.cached(queries.daily_product_demand)
+#   page = querycache.cached(queries.dispatch_queue, 25, after=cursor, customer="x")
+
+MAX_ENTRIES = 256
+MAX_BYTES = 64 * 1024 * 1024
+
+
+def _freeze(value):
+    # Hashable form of query arguments (order id lists, filter dicts)
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+def _is_frame(value):
+    # DataFrame / Series, without importing pandas into pages that don't use it
+    return hasattr(value, "memory_usage") and hasattr(value, "copy")
+
+
+def _size(value):
+    if _is_frame(value):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def _copy(value):
+    # Callers get their own DataFrames so page code can't modify the cache
+    if _is_frame(value):
+        return value.copy()
+    if isinstance(value, tuple):
+        return tuple(_copy(v) for v in value)
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+class QueryCache:
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (generation, value, size)
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, fn, args, kwargs, path=db.ORDERS_DB):
+        pool = db.get_pool(path)
+        key = (os.path.abspath(path), fn.__module__, fn.__qualname__, _freeze(args), _freeze(kwargs))
+        # Read before running the query, so a stored result is never older
+        # than the generation it is filed under.
+        generation = pool.generation()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == generation:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _copy(entry[1])
+            self.misses += 1
+
+        with pool.read() as conn:
+            value = fn(conn, *args, **kwargs)
+        self._put(key, generation, value)
+        return _copy(value)
+
+    def _put(self, key, generation, value):
+        size = _size(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[2]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (generation, value, size)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# One cache per server process, shared by all sessions
+_cache = QueryCache()
+
+
+def cached(fn, *args, path=db.ORDERS_DB, **kwargs):
+    # fn(conn, *args, **kwargs) from the cache, or run on a pooled read
+    # connection if the database changed since it was stored
+    return _cache.get(fn, args, kwargs, path)
+
+
+def stats():
+    return _cache.stats()
+
+
+def clear():
+    _cache.clear()
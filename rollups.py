@@ -0,0 +1,251 @@
+import argparse
+
+import db
+
+# --- Pre-aggregated rollups of order lines and dispatches for Reports ---
+# Three tables are kept current by triggers on order_products and
+# dispatch_events (installed by migrations 006 and 011):
+#   rollup_product        one row per product
+#   rollup_order_product  one row per (order, product), with the line price
+#   rollup_daily          one row per (order date, product)
+# Each holds Original / Dispatched line counts, quantities and INR amounts.
+#
+#   python rollups.py        # rebuild all rollups from the order lines
+#                            # (including orders_archive.db, if any)
+
+ROLLUP_TABLES = {
+    "rollup_product": ["product_name"],
+    "rollup_order_product": ["order_id", "product_name"],
+    "rollup_daily": ["day", "product_name"],
+}
+
+MEASURES = [
+    "original_lines", "original_qty", "original_amount_inr",
+    "dispatched_lines", "dispatched_qty", "dispatched_amount_inr",
+]
+
+TRIGGERS = ["trg_rollup_insert", "trg_rollup_delete", "trg_rollup_update",
+            "trg_rollup_event_insert", "trg_rollup_event_delete"]
+
+# archive.move deletes orders the rollups keep counting. It puts a row in
+# archive_in_progress for the length of its transaction (no other
+# connection ever sees it, and a failed batch rolls it back), and the
+# delete triggers skip while it is there.
+NOT_ARCHIVING = "WHEN NOT EXISTS (SELECT 1 FROM archive_in_progress)"
+
+
+def create_tables(conn):
+    conn.execute("CREATE TABLE IF NOT EXISTS archive_in_progress (started_at TEXT)")
+    measure_cols = ",\n".join(f"{m} REAL NOT NULL DEFAULT 0" for m in MEASURES)
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS rollup_product (
+            product_name TEXT NOT NULL PRIMARY KEY,
+            {measure_cols}
+        )
+    ''')
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS rollup_order_product (
+            order_id INTEGER NOT NULL,
+            product_name TEXT NOT NULL,
+            {measure_cols},
+            original_price_inr REAL,
+            PRIMARY KEY (order_id, product_name)
+        )
+    ''')
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS rollup_daily (
+            day TEXT NOT NULL,
+            product_name TEXT NOT NULL,
+            {measure_cols},
+            PRIMARY KEY (day, product_name)
+        )
+    ''')
+
+
+def _key_exprs(row):
+    return {
+        "order_id": f"{row}.order_id",
+        "product_name": f"IFNULL({row}.product_name, '')",
+        "day": f"IFNULL((SELECT order_date FROM orders WHERE order_id = {row}.order_id), '')",
+    }
+
+
+def _measure_exprs(row, sign, status):
+    def when(line_status, value):
+        return f"CASE WHEN {status} = '{line_status}' THEN {sign} * {value} ELSE 0 END"
+    qty = f"IFNULL({row}.quantity, 0)"
+    amount = f"IFNULL({row}.quantity, 0) * IFNULL({row}.price_inr, 0)"
+    return [
+        when("Original", "1"), when("Original", qty), when("Original", amount),
+        when("Dispatched", "1"), when("Dispatched", qty), when("Dispatched", amount),
+    ]
+
+
+def _apply_row(row, sign, inserted=False, event=False):
+    # Statements that add (sign=1) or remove (sign=-1) one order_products
+    # row's contribution to every rollup table. `inserted` marks a freshly
+    # inserted row, which is always the newest line of its order. `event`
+    # marks a dispatch_events row, which counts as Dispatched.
+    keys = _key_exprs(row)
+    values = _measure_exprs(row, sign, "'Dispatched'" if event else f"{row}.status")
+    statements = []
+    for table, key_cols in ROLLUP_TABLES.items():
+        cols = key_cols + MEASURES
+        exprs = [keys[k] for k in key_cols] + values
+        updates = ", ".join(f"{m} = {m} + excluded.{m}" for m in MEASURES)
+        statements.append(f'''
+            INSERT INTO {table} ({", ".join(cols)})
+            VALUES ({", ".join(exprs)})
+            ON CONFLICT ({", ".join(key_cols)}) DO UPDATE SET {updates};
+        ''')
+        # Drop rows that no longer count any line (or never did, e.g. a
+        # status other than Original/Dispatched).
+        match = " AND ".join(f"{k} = {keys[k]}" for k in key_cols)
+        statements.append(f'''
+            DELETE FROM {table}
+            WHERE {match} AND original_lines = 0 AND dispatched_lines = 0;
+        ''')
+    # Dispatch value uses the price on the most recent Original line. A new
+    # Original line is that line, and a new Dispatched line leaves it as is,
+    # so only updates and deletes need the lookup (on bulk inserts it would
+    # rescan every earlier line of the same order and product).
+    if event:
+        return "".join(statements)
+    if inserted:
+        statements.append(f'''
+            UPDATE rollup_order_product
+            SET original_price_inr = {row}.price_inr
+            WHERE {row}.status = 'Original'
+              AND order_id = {keys["order_id"]} AND product_name = {keys["product_name"]};
+        ''')
+        return "".join(statements)
+    statements.append(f'''
+        UPDATE rollup_order_product
+        SET original_price_inr = (
+            SELECT op.price_inr FROM order_products op
+            WHERE op.order_id = {row}.order_id
+              AND op.product_name = {row}.product_name
+              AND op.status = 'Original'
+            ORDER BY op.order_product_id DESC LIMIT 1
+        )
+        WHERE order_id = {keys["order_id"]} AND product_name = {keys["product_name"]};
+    ''')
+    return "".join(statements)
+
+
+def _has_events(conn):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'dispatch_events'"
+    ).fetchone() is not None
+
+
+def create_triggers(conn):
+    for name in TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    conn.execute(f'''
+        CREATE TRIGGER trg_rollup_insert AFTER INSERT ON order_products
+        BEGIN {_apply_row("NEW", 1, inserted=True)} END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER trg_rollup_delete AFTER DELETE ON order_products {NOT_ARCHIVING}
+        BEGIN {_apply_row("OLD", -1)} END
+    ''')
+    # Only the columns the rollups are built from: edit counts and
+    # modified_by/modified_date updates leave the rollups alone
+    conn.execute(f'''
+        CREATE TRIGGER trg_rollup_update
+        AFTER UPDATE OF order_id, product_name, quantity, price_inr, status ON order_products
+        BEGIN {_apply_row("OLD", -1)} {_apply_row("NEW", 1)} END
+    ''')
+    # Dispatches are rows of the dispatch_events ledger (migration 011),
+    # which does not exist yet while the earlier migrations run
+    if _has_events(conn):
+        conn.execute(f'''
+            CREATE TRIGGER trg_rollup_event_insert AFTER INSERT ON dispatch_events
+            BEGIN {_apply_row("NEW", 1, event=True)} END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER trg_rollup_event_delete AFTER DELETE ON dispatch_events {NOT_ARCHIVING}
+            BEGIN {_apply_row("OLD", -1, event=True)} END
+        ''')
+
+
+def rebuild_rollups(conn, history=None):
+    # Full recompute from order_products and dispatch_events (counted as
+    # Dispatched lines); run inside a write transaction. Rollups cover the
+    # archive too (archive.py leaves them alone when it moves orders out),
+    # so when it is attached the recompute reads through the all_* views.
+    if history is None:
+        import archive  # archive imports this module
+
+        history = archive.history(conn)
+    order_products, dispatch_events, orders = (
+        ("all_order_products", "all_dispatch_events", "all_orders") if history
+        else ("order_products", "dispatch_events", "orders"))
+    def sums():
+        return ",\n".join([
+            "SUM(p.status = 'Original')",
+            "SUM(CASE WHEN p.status = 'Original' THEN IFNULL(p.quantity, 0) ELSE 0 END)",
+            "SUM(CASE WHEN p.status = 'Original' THEN IFNULL(p.quantity, 0) * IFNULL(p.price_inr, 0) ELSE 0 END)",
+            "SUM(p.status = 'Dispatched')",
+            "SUM(CASE WHEN p.status = 'Dispatched' THEN IFNULL(p.quantity, 0) ELSE 0 END)",
+            "SUM(CASE WHEN p.status = 'Dispatched' THEN IFNULL(p.quantity, 0) * IFNULL(p.price_inr, 0) ELSE 0 END)",
+        ])
+
+    measures = ", ".join(MEASURES)
+    lines = f"SELECT order_id, product_name, quantity, price_inr, status FROM {order_products}"
+    # (before migration 011 there is no ledger, nor an all_dispatch_events)
+    if _has_events(conn):
+        lines += f'''
+            UNION ALL
+            SELECT order_id, product_name, quantity, price_inr, 'Dispatched' FROM {dispatch_events}
+        '''
+    lines = f"({lines})"
+    filled = "HAVING SUM(p.status = 'Original') + SUM(p.status = 'Dispatched') > 0"
+    for table in ROLLUP_TABLES:
+        conn.execute(f"DELETE FROM {table}")
+
+    conn.execute(f'''
+        INSERT INTO rollup_product (product_name, {measures})
+        SELECT IFNULL(p.product_name, ''), {sums()}
+        FROM {lines} p
+        GROUP BY IFNULL(p.product_name, '')
+        {filled}
+    ''')
+    # Latest Original price per (order, product) in one grouped pass (SQLite
+    # takes the bare price_inr from the MAX(order_product_id) row), rather
+    # than a lookup per group through the history views
+    conn.execute(f'''
+        INSERT INTO rollup_order_product (order_id, product_name, {measures}, original_price_inr)
+        SELECT p.order_id, IFNULL(p.product_name, ''), {sums()}, MAX(op.price_inr)
+        FROM {lines} p
+        LEFT JOIN (
+            SELECT order_id, product_name, price_inr, MAX(order_product_id)
+            FROM {order_products}
+            WHERE status = 'Original'
+            GROUP BY order_id, product_name
+        ) op ON op.order_id = p.order_id AND op.product_name = p.product_name
+        GROUP BY p.order_id, IFNULL(p.product_name, '')
+        {filled}
+    ''')
+    conn.execute(f'''
+        INSERT INTO rollup_daily (day, product_name, {measures})
+        SELECT IFNULL(o.order_date, ''), IFNULL(p.product_name, ''), {sums()}
+        FROM {lines} p
+        LEFT JOIN {orders} o ON o.order_id = p.order_id
+        GROUP BY IFNULL(o.order_date, ''), IFNULL(p.product_name, '')
+        {filled}
+    ''')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the Reports rollup tables")
+    parser.add_argument("--db", default=db.ORDERS_DB, help="database file (default: orders.db)")
+    args = parser.parse_args()
+
+    with db.write_conn(args.db) as conn:
+        create_tables(conn)
+        create_triggers(conn)
+        rebuild_rollups(conn)
+        counts = {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in ROLLUP_TABLES}
+    print("✅ Rollups rebuilt: " + ", ".join(f"{t}={n}" for t, n in counts.items()))
@@ -0,0 +1,330 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+# --- SQL tracing per page render ---
+# Pooled connections (db.py) are TracedConnections: every execute /
+# executemany and the fetches on its cursor are timed with perf_counter and
+# filed under the query text (whitespace collapsed) for the page render
+# running on this thread, and set_trace_callback counts every statement
+# SQLite itself runs (trigger bodies, BEGIN / COMMIT included). Work outside
+# a render (scripts, background threads) is not recorded.
+#
+#   with sqltrace.render("Dispatch"):
+#       show_page("Dispatch")
+#
+# Finished renders are added to process-wide per-page and per-query totals
+# (shown in the Admin "Performance" sidebar panel) and written to a rotating
+# log. A render issuing more than QUERY_BUDGET queries is flagged: a query
+# per row (N+1) shows up here long before it shows up as a slow page.
+#
+#   SQL_TRACE=0                tracing off (plain sqlite3 connections)
+#   SQL_QUERY_BUDGET=40        queries per render before it is flagged
+#   SQL_TRACE_LOG=path         log file (default: logs/sql_trace.log)
+
+ENABLED = os.getenv("SQL_TRACE", "1") != "0"
+QUERY_BUDGET = int(os.getenv("SQL_QUERY_BUDGET", "40"))
+LOG_FILE = os.getenv("SQL_TRACE_LOG", os.path.join("logs", "sql_trace.log"))
+LOG_BYTES = 1024 * 1024
+LOG_BACKUPS = 5
+LOGGED_QUERIES = 5      # slowest queries listed per render in the log
+RECENT_RENDERS = 50
+MAX_QUERY_TEXT = 2000   # longer statements are cut (and filed together)
+
+
+class Query:
+    __slots__ = ("text", "executions", "rows", "seconds", "max_seconds")
+
+    def __init__(self, text):
+        self.text = text
+        self.executions = 0
+        self.rows = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+
+
+class Render:
+
+    def __init__(self, page):
+        self.page = page
+        self.queries = {}   # text -> Query
+        self.statements = 0
+        self.seconds = 0.0
+        self.finished_at = None
+
+    def query(self, sql):
+        text = " ".join(sql.split())[:MAX_QUERY_TEXT]
+        query = self.queries.get(text)
+        if query is None:
+            query = self.queries[text] = Query(text)
+        query.executions += 1
+        return query
+
+    @property
+    def executions(self):
+        return sum(q.executions for q in self.queries.values())
+
+    @property
+    def rows(self):
+        return sum(q.rows for q in self.queries.values())
+
+    @property
+    def sql_seconds(self):
+        return sum(q.seconds for q in self.queries.values())
+
+    @property
+    def flagged(self):
+        return self.executions > QUERY_BUDGET
+
+
+_local = threading.local()
+
+
+def _current():
+    return getattr(_local, "render", None)
+
+
+def _timed(query, started):
+    elapsed = time.perf_counter() - started
+    query.seconds += elapsed
+    if elapsed > query.max_seconds:
+        query.max_seconds = elapsed
+
+
+class TracedCursor(sqlite3.Cursor):
+    _query = None  # Query of the statement last executed within a render
+
+    def execute(self, sql, parameters=()):
+        render = _current()
+        if render is None:
+            self._query = None
+            return super().execute(sql, parameters)
+        self._query = render.query(sql)
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _timed(self._query, started)
+
+    def executemany(self, sql, seq_of_parameters):
+        render = _current()
+        if render is None:
+            self._query = None
+            return super().executemany(sql, seq_of_parameters)
+        self._query = render.query(sql)
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _timed(self._query, started)
+
+    def fetchone(self):
+        if self._query is None:
+            return super().fetchone()
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._query.seconds += time.perf_counter() - started
+        if row is not None:
+            self._query.rows += 1
+        return row
+
+    def fetchmany(self, size=None):
+        if self._query is None:
+            return super().fetchmany(size or self.arraysize)
+        started = time.perf_counter()
+        rows = super().fetchmany(size or self.arraysize)
+        self._query.seconds += time.perf_counter() - started
+        self._query.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        if self._query is None:
+            return super().fetchall()
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._query.seconds += time.perf_counter() - started
+        self._query.rows += len(rows)
+        return rows
+
+    def __next__(self):
+        if self._query is None:
+            return super().__next__()
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        finally:
+            self._query.seconds += time.perf_counter() - started
+        self._query.rows += 1
+        return row
+
+
+class TracedConnection(sqlite3.Connection):
+    # Connection.execute would otherwise run on a plain cursor
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def _statement(_sql):
+    render = _current()
+    if render is not None:
+        render.statements += 1
+
+
+def install(conn):
+    conn.set_trace_callback(_statement)
+
+
+# --- Process-wide totals ---
+
+class PageTotals:
+    __slots__ = ("renders", "executions", "max_executions", "statements", "rows",
+                 "sql_seconds", "seconds", "flagged")
+
+    def __init__(self):
+        self.renders = 0
+        self.executions = 0
+        self.max_executions = 0
+        self.statements = 0
+        self.rows = 0
+        self.sql_seconds = 0.0
+        self.seconds = 0.0
+        self.flagged = 0
+
+
+_pages = {}     # page -> PageTotals
+_queries = {}   # (page, text) -> Query
+_recent = deque(maxlen=RECENT_RENDERS)
+_lock = threading.Lock()
+
+
+def _record(render):
+    with _lock:
+        totals = _pages.get(render.page)
+        if totals is None:
+            totals = _pages[render.page] = PageTotals()
+        executions = render.executions
+        totals.renders += 1
+        totals.executions += executions
+        totals.max_executions = max(totals.max_executions, executions)
+        totals.statements += render.statements
+        totals.rows += render.rows
+        totals.sql_seconds += render.sql_seconds
+        totals.seconds += render.seconds
+        totals.flagged += render.flagged
+        for text, query in render.queries.items():
+            total = _queries.get((render.page, text))
+            if total is None:
+                total = _queries[(render.page, text)] = Query(text)
+            total.executions += query.executions
+            total.rows += query.rows
+            total.seconds += query.seconds
+            total.max_seconds = max(total.max_seconds, query.max_seconds)
+        _recent.append(render)
+
+
+@contextmanager
+def render(page):
+    # Records the queries run on this thread until the block exits (also
+    # through st.rerun / st.stop, which raise)
+    if not ENABLED:
+        yield None
+        return
+    current = Render(page)
+    previous = _current()
+    _local.render = current
+    started = time.perf_counter()
+    try:
+        yield current
+    finally:
+        current.seconds = time.perf_counter() - started
+        current.finished_at = time.time()
+        _local.render = previous
+        _record(current)
+        _log(current)
+
+
+def pages():
+    # -> {page: PageTotals} copies
+    with _lock:
+        result = {}
+        for page, totals in _pages.items():
+            result[page] = copy = PageTotals()
+            for name in PageTotals.__slots__:
+                setattr(copy, name, getattr(totals, name))
+        return result
+
+
+def top_queries(limit=20):
+    # -> [(page, Query)] by total time
+    with _lock:
+        ranked = sorted(_queries.items(), key=lambda item: item[1].seconds, reverse=True)[:limit]
+        return [(page, query) for (page, _), query in ranked]
+
+
+def recent():
+    with _lock:
+        return list(_recent)
+
+
+def reset():
+    with _lock:
+        _pages.clear()
+        _queries.clear()
+        _recent.clear()
+
+
+# --- Rotating log ---
+
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def _get_logger():
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                logger = logging.getLogger("sqltrace")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                folder = os.path.dirname(LOG_FILE)
+                if folder:
+                    os.makedirs(folder, exist_ok=True)
+                handler = RotatingFileHandler(LOG_FILE, maxBytes=LOG_BYTES, backupCount=LOG_BACKUPS,
+                                              encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+                logger.addHandler(handler)
+                _logger = logger
+    return _logger
+
+
+def _log(render):
+    try:
+        logger = _get_logger()
+    except OSError:
+        return  # read-only checkout: keep tracing in memory
+    lines = [f"{render.page}: {render.executions} queries ({len(render.queries)} distinct, "
+             f"{render.statements} statements), {render.rows} rows, "
+             f"{render.sql_seconds * 1000:.1f} ms SQL / {render.seconds * 1000:.1f} ms render"]
+    slowest = sorted(render.queries.values(), key=lambda q: q.seconds, reverse=True)[:LOGGED_QUERIES]
+    for query in slowest:
+        lines.append(f"    {query.executions}x {query.rows} rows {query.seconds * 1000:.1f} ms  {query.text[:200]}")
+    if render.flagged:
+        repeated = max(render.queries.values(), key=lambda q: q.executions)
+        lines[0] += (f" - over the {QUERY_BUDGET} query budget; most repeated: "
+                     f"{repeated.executions}x {repeated.text[:200]}")
+        logger.warning("\n".join(lines))
+    else:
+        logger.info("\n".join(lines))
@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+# The app is a flat set of modules at the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db  # noqa: E402
+from migrations import migrate  # noqa: E402
+
+
+@pytest.fixture
+def orders_db(tmp_path):
+    # Freshly migrated orders.db in a temp directory; pooled connections
+    # are closed afterwards
+    path = str(tmp_path / "orders.db")
+    migrate(path)
+    yield path
+    db.close_all()
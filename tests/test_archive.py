@@ -0,0 +1,39 @@
+import archive
+import db
+import order_service
+
+
+def rollup_rows(path):
+    with db.read_conn(path) as conn:
+        return {table: conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2").fetchall()
+                for table in ["rollup_product", "rollup_order_product", "rollup_daily"]}
+
+
+def schema_version(path):
+    with db.read_conn(path) as conn:
+        return conn.execute("PRAGMA main.schema_version").fetchone()[0]
+
+
+def test_move_keeps_rollups_and_main_schema(orders_db):
+    done, _, _ = order_service.create_order("sales1", "Customer A", "2025-05-17", 0, "", "",
+                                            [("Salt", 10, "Kg", 50.0, 0.0)], path=orders_db)
+    order_service.submit_dispatch(done, [("Salt", 10, "Kg", 0.0, 0.0)], "dispatch1", path=orders_db)
+    still_open, _, _ = order_service.create_order("sales1", "Customer B", "2025-05-18", 0, "", "",
+                                                  [("Salt", 5, "Kg", 50.0, 0.0)], path=orders_db)
+    before = rollup_rows(orders_db)
+    version = schema_version(orders_db)
+
+    assert archive.run(days=-1, path=orders_db) == 1
+    db.close_all()
+
+    assert rollup_rows(orders_db) == before
+    assert schema_version(orders_db) == version
+    with db.read_conn(orders_db) as conn:
+        assert conn.execute("SELECT order_id FROM orders").fetchall() == [(still_open,)]
+        assert conn.execute("SELECT COUNT(*) FROM archive_in_progress").fetchone()[0] == 0
+
+    # outside a move the delete triggers still keep the rollups
+    with db.write_conn(orders_db) as conn:
+        conn.execute("DELETE FROM order_products WHERE order_id = ?", (still_open,))
+        assert conn.execute("SELECT COUNT(*) FROM rollup_order_product WHERE order_id = ?",
+                            (still_open,)).fetchone()[0] == 0
@@ -0,0 +1,105 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Row tables the reset must leave empty: the order data, the dispatch ledger
+# and the trigger-kept rollups
+DATA_TABLES = ["orders", "order_products", "dispatch_events",
+               "rollup_order_product", "rollup_product", "rollup_daily"]
+
+
+def run(script, cwd, *args, answer=None, returncode=0):
+    # Repo scripts work on orders.db in the current directory
+    result = subprocess.run([sys.executable, os.path.join(ROOT, script), *args], cwd=cwd,
+                            input=answer, capture_output=True, text=True)
+    assert result.returncode == returncode, result.stdout + result.stderr
+    return result.stdout
+
+
+def schema(path):
+    conn = sqlite3.connect(path)
+    try:
+        return sorted(conn.execute("SELECT type, name, sql FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'"))
+    finally:
+        conn.close()
+
+
+def count(path, table):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def complete_order_3(path):
+    # create_sample_orders.py dispatches 150 of order 3's 200 Kg
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute('''
+            INSERT INTO dispatch_events (order_product_id, order_id, product_name, quantity, unit,
+                                         price_inr, price_usd, dispatched_by, dispatched_at)
+            SELECT order_product_id, 3, 'Product Z', 50, 'Kg', 0, 0, 'dispatch1', '2025-05-20 10:00:00'
+            FROM order_products WHERE order_id = 3
+        ''')
+    conn.close()
+
+
+def test_reset_twice_on_populated_db(tmp_path):
+    fresh = tmp_path / "fresh"
+    work = tmp_path / "work"
+    fresh.mkdir()
+    work.mkdir()
+    run("init_orders_db.py", fresh)
+    expected = schema(fresh / "orders.db")
+
+    for _ in range(2):
+        # orders, lines and dispatches (fulfilment + rollup triggers fire),
+        # and an archive database next to orders.db
+        run("create_sample_orders.py", work)
+        run("archive.py", work, "--days", "0")
+        assert (work / "orders_archive.db").exists()
+
+        run("init_orders_db.py", work, "--include-archive", answer="yes\n")
+
+        assert schema(work / "orders.db") == expected
+        assert not (work / "orders_archive.db").exists()
+        for table in DATA_TABLES:
+            assert count(work / "orders.db", table) == 0, table
+        assert "✅" in run("fulfilment.py", work)
+
+
+def test_reset_keeps_archive_unless_confirmed(tmp_path):
+    run("create_sample_orders.py", tmp_path)
+    complete_order_3(tmp_path / "orders.db")
+    run("archive.py", tmp_path, "--days", "-1")
+    assert count(tmp_path / "orders_archive.db", "orders") == 1
+
+    run("init_orders_db.py", tmp_path, "--include-archive", answer="no\n", returncode=1)
+    assert count(tmp_path / "orders.db", "orders") == 2
+
+    run("init_orders_db.py", tmp_path)
+    assert count(tmp_path / "orders_archive.db", "orders") == 1
+    assert count(tmp_path / "orders.db", "orders") == 0
+    # new orders carry on after the archived ids and order numbers
+    conn = sqlite3.connect(tmp_path / "orders.db")
+    try:
+        assert conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'orders'").fetchone()[0] == 3
+        assert conn.execute("SELECT next_value FROM order_sequences WHERE name = 'order_no'").fetchone()[0] == 1004
+    finally:
+        conn.close()
+
+
+def test_reset_refuses_while_database_open(tmp_path):
+    run("create_sample_orders.py", tmp_path)
+    conn = sqlite3.connect(tmp_path / "orders.db")
+    try:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("SELECT COUNT(*) FROM orders").fetchone()
+        assert "❌" in run("init_orders_db.py", tmp_path, returncode=1)
+    finally:
+        conn.close()
+    assert count(tmp_path / "orders.db", "orders") == 3
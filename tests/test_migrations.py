@@ -0,0 +1,30 @@
+import sqlite3
+
+import db
+from migrations import migrate
+
+
+def test_dispatch_events_migration_sets_aside_orphan_dispatches(tmp_path):
+    path = str(tmp_path / "orders.db")
+    migrate(path, target=10)
+    db.close_all()
+
+    # Written the way the app did before foreign keys were enforced
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("INSERT INTO orders (order_id, customer_name, order_no) VALUES (1, 'Customer A', 'ORD-0001')")
+        conn.executemany('''
+            INSERT INTO order_products (order_id, product_name, quantity, unit, price_inr, status,
+                                        modified_by, modified_date)
+            VALUES (?, 'Salt', ?, 'Kg', 10, ?, 'dispatch1', '2025-05-20 10:00:00')
+        ''', [(1, 100, 'Original'), (1, 40, 'Dispatched'), (999, 25, 'Dispatched')])
+    conn.close()
+
+    migrate(path)
+    with db.read_conn(path) as conn:
+        assert conn.execute("SELECT order_id, quantity FROM dispatch_events").fetchall() == [(1, 40)]
+        assert conn.execute("SELECT order_id, quantity, status FROM orphan_dispatched_lines").fetchall() == [
+            (999, 25, 'Dispatched')]
+        assert conn.execute("SELECT COUNT(*) FROM order_products WHERE status = 'Dispatched'").fetchone()[0] == 0
+        assert conn.execute("PRAGMA foreign_key_check").fetchall() == []
+    db.close_all()
@@ -0,0 +1,26 @@
+import order_service
+
+
+def line_dispatched(path, order_id):
+    with order_service.db.read_conn(path) as conn:
+        return [row[0] for row in conn.execute(
+            "SELECT dispatched_qty FROM order_products WHERE order_id = ? ORDER BY order_product_id",
+            (order_id,))]
+
+
+def test_dispatch_fills_lines_of_a_product_in_order(orders_db):
+    order_id, _, line_ids = order_service.create_order(
+        "sales1", "Customer A", "2025-05-17", 0, "", "",
+        [("Salt", 10, "Kg", 50.0, 0.0), ("Salt", 6, "Kg", 55.0, 0.0)], path=orders_db)
+
+    events = order_service.submit_dispatch(order_id, [("Salt", 12, "Kg", 0.0, 0.0)], "dispatch1", path=orders_db)
+    assert len(events) == 2
+    assert line_dispatched(orders_db, order_id) == [10, 2]
+    with order_service.db.read_conn(orders_db) as conn:
+        assert conn.execute(
+            "SELECT order_product_id, quantity FROM dispatch_events ORDER BY event_id").fetchall() == [
+            (line_ids[0], 10), (line_ids[1], 2)]
+
+    # more than is left: the first line stays full, the rest goes on the last
+    order_service.submit_dispatch(order_id, [("Salt", 10, "Kg", 0.0, 0.0)], "dispatch1", path=orders_db)
+    assert line_dispatched(orders_db, order_id) == [10, 12]
@@ -0,0 +1,155 @@
+import json
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+import assets
+import auth
+
+# --- Page furniture shared by streamlit_app.py and the page_* modules ---
+
+def show_header():
+    col1, col2 = st.columns([1, 9])
+    with col1:
+        logo = assets.image("logo")
+        if logo:
+            st.image(logo, width=140)
+    with col2:
+        st.markdown("""
+            <div style='display: flex; align-items: center; height: 90px;'>
+                <h1 style='margin: 2; padding-left: 0px;'>Shree Sai Industries</h1>
+            </div>
+        """, unsafe_allow_html=True)
+
+def show_user_profile_photo(placeholder=True):
+    username = st.session_state.get('username', 'user')
+    photo = assets.user_photo(username) or assets.image("default_user")
+    if photo:
+        col1, col2 = st.columns([6, 1.5])
+        with col2:
+            caption = username.capitalize() if assets.user_photo(username) else "No Photo"
+            st.image(photo, caption=caption, width=100)
+    elif placeholder:
+        col1, col2 = st.columns([6, 1.5])
+        with col2:
+            st.info("No profile photo found.")
+
+
+def return_menu_logout(key_prefix):
+    st.markdown("---")
+    if st.button("⬅ Return to Main Menu", key=f"return_main_{key_prefix}"):
+        st.session_state['page'] = 'Main Menu'
+    if st.button("🔒 Logout", key=f"logout_{key_prefix}"):
+        logout()
+
+# --- Login sessions ---
+# The signed token lives in a cookie, which survives a browser reload (that
+# clears session_state); restoring from it skips the login form and bcrypt.
+# Scripts cannot set response headers, so the cookie is written from a
+# same-origin component and cannot be HttpOnly: it is SameSite=Strict (and
+# Secure over https), expires with the session, and there is no
+# "Remember this device".
+def _write_cookie(token, max_age):
+    components.html(f"""<script>
+        const secure = window.parent.location.protocol === "https:" ? "; Secure" : "";
+        window.parent.document.cookie = {json.dumps(f"{auth.SESSION_COOKIE}={token}")}
+            + "; Max-Age={max_age}; Path=/; SameSite=Strict" + secure;
+    </script>""", height=0)
+
+def sync_session_cookie():
+    # Writes (or clears) the cookie queued by start_session / logout; called
+    # at the end of the script so a st.rerun() straight after login or
+    # logout cannot drop it
+    pending = st.session_state.pop('session_cookie', None)
+    if pending is not None:
+        _write_cookie(*pending)
+
+def start_session(username, role):
+    token = auth.create_session(username)
+    st.session_state['session_cookie'] = (token, auth.SESSION_HOURS * 3600)
+    st.session_state['session_token'] = token
+    st.session_state['logged_in'] = True
+    st.session_state['username'] = username
+    st.session_state['role'] = role
+    st.session_state['page'] = 'Main Menu'
+
+def restore_session():
+    legacy = st.query_params.get(auth.LEGACY_SESSION_PARAM)
+    if legacy:
+        auth.end_session(legacy)
+        del st.query_params[auth.LEGACY_SESSION_PARAM]
+    # st.context.cookies is what the browser sent when it connected: after a
+    # logout it still holds the old token, so each token is checked once
+    token = st.context.cookies.get(auth.SESSION_COOKIE)
+    if not token or st.session_state.get('session_cookie_checked') == token:
+        return
+    st.session_state['session_cookie_checked'] = token
+    restored = auth.restore_session(token)
+    if restored:
+        st.session_state['session_token'] = token
+        st.session_state['logged_in'] = True
+        st.session_state['username'], st.session_state['role'] = restored
+    else:
+        st.session_state['session_cookie'] = ("", 0)
+
+def logout():
+    auth.end_session(st.session_state.pop('session_token', None))
+    st.session_state['session_cookie'] = ("", 0)
+    st.session_state['logged_in'] = False
+
+# --- Keyset pager (My Orders, Dispatch queue) ---
+# Keeps the stack of page-start cursors in session_state and goes back to
+# the first page whenever the filters change.
+def pager_cursors(prefix, filters):
+    if st.session_state.get(f'{prefix}_filters') != filters:
+        st.session_state[f'{prefix}_filters'] = filters
+        st.session_state[f'{prefix}_cursors'] = [None]
+    return st.session_state[f'{prefix}_cursors']
+
+def show_pager(prefix, cursors, next_cursor):
+    p1, p2, p3 = st.columns([1, 2, 1])
+    with p1:
+        if len(cursors) > 1 and st.button("⬅ Newer", key=f"{prefix}_prev"):
+            cursors.pop()
+            st.rerun()
+    with p2:
+        st.caption(f"Page {len(cursors)}")
+    with p3:
+        if next_cursor is not None and st.button("Older ➡", key=f"{prefix}_next"):
+            cursors.append(next_cursor)
+            st.rerun()
+
+# --- Admin "Performance" panel (SQL per page render, see sqltrace.py) ---
+def show_performance_panel(trace):
+    import pandas as pd
+    import sqltrace
+
+    with st.sidebar.expander("⏱️ Performance"):
+        if trace is not None:
+            st.caption(f"This render ({trace.page}): {trace.executions} queries, {trace.rows} rows, "
+                       f"{trace.sql_seconds * 1000:.1f} ms SQL / {trace.seconds * 1000:.1f} ms")
+        recent = sqltrace.recent()
+        flagged = sorted({r.page for r in recent if r.flagged})
+        if flagged:
+            st.warning(f"⚠️ Over {sqltrace.QUERY_BUDGET} queries per render: {', '.join(flagged)}")
+
+        pages = sqltrace.pages()
+        if not pages:
+            st.info("No page renders recorded yet.")
+            return
+        st.markdown("**Per page**")
+        st.dataframe(pd.DataFrame([
+            (page, t.renders, t.executions / t.renders, t.max_executions,
+             t.sql_seconds * 1000 / t.renders, t.seconds * 1000 / t.renders, t.flagged)
+            for page, t in sorted(pages.items())
+        ], columns=["Page", "Renders", "Avg Queries", "Max Queries", "Avg SQL ms", "Avg Render ms", "Flagged"]),
+            use_container_width=True)
+
+        st.markdown("**Slowest queries (total time)**")
+        st.dataframe(pd.DataFrame([
+            (page, q.executions, q.rows, q.seconds * 1000, q.max_seconds * 1000, q.text[:120])
+            for page, q in sqltrace.top_queries()
+        ], columns=["Page", "Calls", "Rows", "Total ms", "Max ms", "Query"]), use_container_width=True)
+        st.caption(f"Log: {sqltrace.LOG_FILE}")
+        if st.button("Reset statistics", key="performance_reset"):
+            sqltrace.reset()